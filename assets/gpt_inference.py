@@ -2,14 +2,92 @@ import math
 
 import torch
 from torch import nn
+import torch.nn.functional as F
 from transformers import GPT2PreTrainedModel
 from transformers.modeling_outputs import CausalLMOutputWithCrossAttentions
 import logging
 
+
+class StaticKVCache:
+    """
+    Preallocated key/value buffers for every layer, updated in place.
+
+    Buffers are shaped (batch, heads, max_len, head_dim) and allocated once;
+    decoding writes each new token at the current end instead of growing the
+    cache by concatenation. Indexing a layer returns (key, value) views of
+    the filled part, so code written for legacy tuple caches keeps working.
+    """
+
+    def __init__(self, num_layers, batch_size, num_heads, max_len, head_dim, device, dtype):
+        shape = (batch_size, num_heads, max_len, head_dim)
+        self.keys = [torch.zeros(shape, device=device, dtype=dtype) for _ in range(num_layers)]
+        self.values = [torch.zeros(shape, device=device, dtype=dtype) for _ in range(num_layers)]
+        self.batch_size = batch_size
+        self.max_len = max_len
+        self.length = 0
+        self.slots = torch.arange(max_len, device=device)
+
+    def fits(self, batch_size, device, dtype):
+        """Check whether the buffers can be reused for a new generation"""
+        key = self.keys[0]
+        return self.batch_size == batch_size and key.device == torch.device(device) and key.dtype == dtype
+
+    def reset(self):
+        self.length = 0
+
+    def get_seq_length(self):
+        return self.length
+
+    def update(self, layer, key, value):
+        """Write new key/value states after the filled part and return views up to the new end"""
+        start = self.length
+        end = start + key.shape[-2]
+        if end > self.max_len:
+            raise RuntimeError(f"Static KV cache overflow: {end} > {self.max_len} positions")
+        self.keys[layer][:, :, start:end].copy_(key)
+        self.values[layer][:, :, start:end].copy_(value)
+        return self.keys[layer][:, :, :end], self.values[layer][:, :, :end]
+
+    def update_at(self, layer, key, value, cache_position):
+        """
+        Fixed-shape variant of update(): write one step at cache_position (a
+        1-element device tensor) and return the full buffers, so the caller's
+        shapes never change and the step can be captured in a CUDA graph.
+        """
+        self.keys[layer].index_copy_(2, cache_position, key)
+        self.values[layer].index_copy_(2, cache_position, value)
+        return self.keys[layer], self.values[layer]
+
+    def attention_mask_at(self, cache_position):
+        """Boolean mask over the full buffer allowing slots up to cache_position"""
+        return (self.slots <= cache_position).view(1, 1, 1, self.max_len)
+
+    def advance(self, num_tokens):
+        """Commit tokens written by update() for all layers"""
+        self.length += num_tokens
+
+    def reorder_cache(self, beam_idx):
+        """Reorder batch entries in place for beam search, keeping buffer addresses stable"""
+        end = self.length
+        for buffer in self.keys + self.values:
+            index = beam_idx.to(buffer.device)
+            buffer[:, :, :end].copy_(buffer[:, :, :end].index_select(0, index))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, layer):
+        return self.keys[layer][:, :, :self.length], self.values[layer][:, :, :self.length]
+
+    def __iter__(self):
+        return (self[layer] for layer in range(len(self)))
+
+
 class GPT2InferenceModel(GPT2PreTrainedModel):
     """Override GPT2LMHeadModel to allow for prefix conditioning."""
 
-    def __init__(self, config, gpt, pos_emb, embeddings, norm, linear, kv_cache):
+    def __init__(self, config, gpt, pos_emb, embeddings, norm, linear, kv_cache,
+                 use_static_cache=False, max_cache_len=None, use_cuda_graph=False):
         super().__init__(config)
         self.transformer = gpt
         self.pos_embedding = pos_emb
@@ -18,8 +96,18 @@ class GPT2InferenceModel(GPT2PreTrainedModel):
         self.lm_head = nn.Sequential(norm, linear)
         self.kv_cache = kv_cache
         self.cached_prefix_emb = None
+        self.prefix_len = 0
+        self._expanded_prefix_emb = None
         self.logger = logging.getLogger(__name__)
         self.max_position = config.n_positions - 1
+        # Learned position embeddings expose their table as .emb; resolve it
+        # once so decode steps index the weight directly
+        self._pos_table = getattr(pos_emb, 'emb', None)
+        self.use_static_cache = use_static_cache
+        self.max_cache_len = max_cache_len or config.n_positions
+        self.static_cache = None
+        self.use_cuda_graph = use_cuda_graph
+        self._decode_graph = None
 
     def get_position_embeddings(self, length, device):
         """Safely get position embeddings with bounds checking."""
@@ -43,6 +131,150 @@ class GPT2InferenceModel(GPT2PreTrainedModel):
         if len(prefix_emb.shape) == 4:
             prefix_emb = prefix_emb.squeeze(1)
         self.cached_prefix_emb = prefix_emb
+        self.prefix_len = prefix_emb.shape[1]
+        self._expanded_prefix_emb = None
+
+    def enable_static_cache(self, max_cache_len=None, cuda_graph=False):
+        """
+        Decode with a preallocated StaticKVCache instead of growing tuples.
+        With cuda_graph, single-token steps run the fixed-shape decode_step,
+        captured once per cache as a CUDA graph (eager on CPU).
+        """
+        self.use_static_cache = True
+        self.use_cuda_graph = cuda_graph
+        if max_cache_len is not None:
+            self.max_cache_len = max_cache_len
+        self.static_cache = None
+        self._decode_graph = None
+
+    def _prefix_for_batch(self, batch_size, dtype):
+        """Prefix embedding expanded to the batch size once per generation"""
+        prefix_emb = self._expanded_prefix_emb
+        if prefix_emb is None or prefix_emb.shape[0] != batch_size or prefix_emb.dtype != dtype:
+            prefix_emb = self.cached_prefix_emb
+            if prefix_emb.shape[0] != batch_size:
+                prefix_emb = prefix_emb.repeat_interleave(batch_size // prefix_emb.shape[0], 0)
+            prefix_emb = prefix_emb.to(dtype)
+            self._expanded_prefix_emb = prefix_emb
+        return prefix_emb
+
+    def _decode_embedding(self, input_ids, past_length):
+        """Token + position embedding for a single decode step, without extra allocations"""
+        emb = self.embeddings(input_ids)
+        # Mel positions restart at 0 after the conditioning prefix, matching
+        # the positions used for the prefill
+        position = past_length - self.prefix_len
+        if self._pos_table is not None:
+            if 0 <= position < self._pos_table.weight.shape[0]:
+                emb.add_(self._pos_table.weight[position])
+        elif hasattr(self.pos_embedding, 'get_fixed_embedding'):
+            emb = emb + self.pos_embedding.get_fixed_embedding(position, emb.device)
+        else:
+            # Fallback for other position embedding implementations
+            emb = emb + self.pos_embedding(torch.full_like(input_ids, position))
+        return emb
+
+    def _get_static_cache(self, batch_size, device, dtype):
+        """Reuse the preallocated cache when shapes match, otherwise allocate it"""
+        cache = self.static_cache
+        if cache is None or not cache.fits(batch_size, device, dtype):
+            attn = self.transformer.h[0].attn
+            cache = StaticKVCache(
+                num_layers=len(self.transformer.h),
+                batch_size=batch_size,
+                num_heads=attn.num_heads,
+                max_len=self.max_cache_len,
+                head_dim=attn.head_dim,
+                device=device,
+                dtype=dtype,
+            )
+            self.static_cache = cache
+            self._decode_graph = None
+        cache.reset()
+        if self.use_cuda_graph and cache.slots.is_cuda and self._decode_graph is None:
+            # Capture before the prefill: warmup writes to slot 0, which the
+            # prefill overwrites
+            self._decode_graph = DecodeGraph(self, cache)
+        return cache
+
+    def _static_transformer_forward(self, emb, cache, output_hidden_states=False, cache_position=None):
+        """
+        Run the GPT-2 blocks against a StaticKVCache. Supports a prefill from
+        an empty cache or single-token steps; batches are assumed unpadded,
+        as in XTTS generation. With cache_position the step attends over the
+        whole buffer under a mask and leaves cache.length to the caller.
+        """
+        gpt = self.transformer
+        batch_size, seq_len, _ = emb.shape
+        if cache_position is not None:
+            position_ids = cache_position.view(1, 1)
+            attn_mask = cache.attention_mask_at(cache_position)
+        else:
+            start = cache.length
+            if seq_len != 1 and start != 0:
+                raise ValueError("Static cache only supports prefill from empty or single-token steps")
+            position_ids = torch.arange(start, start + seq_len, device=emb.device).unsqueeze(0)
+            attn_mask = None
+        hidden_states = gpt.drop(emb + gpt.wpe(position_ids))
+        all_hidden_states = (hidden_states,) if output_hidden_states else None
+
+        for layer, block in enumerate(gpt.h):
+            attn = block.attn
+            residual = hidden_states
+            query, key, value = attn.c_attn(block.ln_1(hidden_states)).split(attn.split_size, dim=2)
+            query = query.view(batch_size, seq_len, attn.num_heads, attn.head_dim).transpose(1, 2)
+            key = key.view(batch_size, seq_len, attn.num_heads, attn.head_dim).transpose(1, 2)
+            value = value.view(batch_size, seq_len, attn.num_heads, attn.head_dim).transpose(1, 2)
+            if cache_position is not None:
+                key, value = cache.update_at(layer, key, value, cache_position)
+            else:
+                key, value = cache.update(layer, key, value)
+
+            scale = 1.0 / math.sqrt(attn.head_dim) if attn.scale_attn_weights else 1.0
+            if attn.scale_attn_by_inverse_layer_idx:
+                scale /= float(layer + 1)
+            attn_output = F.scaled_dot_product_attention(
+                query, key, value, attn_mask=attn_mask, is_causal=attn_mask is None and seq_len > 1, scale=scale
+            )
+            attn_output = attn_output.transpose(1, 2).reshape(batch_size, seq_len, attn.embed_dim)
+            hidden_states = residual + attn.resid_dropout(attn.c_proj(attn_output))
+            hidden_states = hidden_states + block.mlp(block.ln_2(hidden_states))
+            if output_hidden_states:
+                all_hidden_states = all_hidden_states + (hidden_states,)
+
+        if cache_position is None:
+            cache.advance(seq_len)
+        hidden_states = gpt.ln_f(hidden_states)
+        if output_hidden_states:
+            # HF convention: the last entry is the final (normed) output
+            all_hidden_states = all_hidden_states[:-1] + (hidden_states,)
+        return hidden_states, all_hidden_states
+
+    def decode_step(self, input_ids, cache_position, mel_position, cache):
+        """
+        Fixed-shape single-token step: every tensor shape and address is the
+        same on each call and positions are device tensors, so the step can
+        be replayed from a CUDA graph. Returns logits of shape (batch, 1, vocab).
+        """
+        emb = self.embeddings(input_ids) + self._pos_table(mel_position).unsqueeze(0)
+        hidden_states, _ = self._static_transformer_forward(emb, cache, cache_position=cache_position)
+        return self.lm_head(hidden_states)
+
+    def _fixed_decode(self, input_ids, cache):
+        """Single-token step through decode_step, replaying the CUDA graph when one is captured"""
+        position = cache.length
+        if self._decode_graph is not None and self._decode_graph.cache is cache:
+            logits = self._decode_graph.replay(input_ids, position, position - self.prefix_len)
+        else:
+            device = input_ids.device
+            logits = self.decode_step(
+                input_ids,
+                torch.tensor([position], device=device),
+                torch.tensor([position - self.prefix_len], device=device),
+                cache,
+            )
+        cache.advance(1)
+        return logits
 
     def prepare_inputs_for_generation(self, input_ids, past_key_values=None, **kwargs):
         token_type_ids = kwargs.get("token_type_ids", None)  # usually None
@@ -98,55 +330,54 @@ class GPT2InferenceModel(GPT2PreTrainedModel):
         return_dict = return_dict if return_dict is not None else self.config.use_return_dict
 
         # assert len(past_key_values) + len(input_ids) == attention_mask.shape[1]
-        # Create embedding
         try:
+            prefix_len = self.prefix_len
+            static_cache = None
+            if self.use_static_cache and self.kv_cache and not output_attentions:
+                if isinstance(past_key_values, StaticKVCache):
+                    static_cache = past_key_values
+                elif past_key_values is None and (attention_mask is None or bool(attention_mask.all())):
+                    # Padded batches fall back to the dynamic cache
+                    static_cache = self._get_static_cache(
+                        input_ids.shape[0], input_ids.device, self.embeddings.weight.dtype
+                    )
+
             # Create embedding
-            prefix_len = self.cached_prefix_emb.shape[1]
-            
             if input_ids.shape[1] != 1:
                 # Multi-token case
                 gen_inputs = input_ids[:, prefix_len:]
                 gen_emb = self.embeddings(gen_inputs)
                 gen_emb = gen_emb + self.pos_embedding(gen_emb)
-                
-                # Handle batch size mismatches
-                if self.cached_prefix_emb.shape[0] != gen_emb.shape[0]:
-                    prefix_emb = self.cached_prefix_emb.repeat_interleave(
-                        gen_emb.shape[0] // self.cached_prefix_emb.shape[0], 0
-                    )
-                else:
-                    prefix_emb = self.cached_prefix_emb
-                
-                prefix_emb = prefix_emb.to(gen_emb.dtype)
+                prefix_emb = self._prefix_for_batch(gen_emb.shape[0], gen_emb.dtype)
                 emb = torch.cat([prefix_emb, gen_emb], dim=1)
             else:
-                # Single token case
-                emb = self.embeddings(input_ids)
-                
-                # Calculate current position based on past_key_values
-                if past_key_values is not None:
-                    position = past_key_values[0][0].size(-2)  # Get position from KV cache
+                # Single token case: position comes from the KV cache length
+                if past_key_values is None:
+                    past_length = prefix_len
+                elif isinstance(past_key_values, StaticKVCache):
+                    past_length = past_key_values.length
                 else:
-                    position = prefix_len  # Start after prefix
-                
-                # Create position tensor directly
-                pos_tensor = torch.zeros(
-                    (emb.shape[0], emb.shape[1], emb.shape[2]),
-                    device=emb.device,
-                    dtype=emb.dtype
-                )
-                
-                # Add position embedding directly from the position embedding layer's weight
-                if hasattr(self.pos_embedding, 'emb'):
-                    if position < self.pos_embedding.emb.weight.shape[0]:
-                        pos_tensor += self.pos_embedding.emb.weight[position]
+                    past_length = past_key_values[0][0].size(-2)
+                emb = self._decode_embedding(input_ids, past_length)
+
+            if static_cache is not None:
+                fixed_shape = self.use_cuda_graph and self._pos_table is not None
+                if fixed_shape and input_ids.shape[1] == 1 and not output_hidden_states:
+                    lm_logits = self._fixed_decode(input_ids, static_cache)
+                    all_hidden_states = None
                 else:
-                    # Fallback for other position embedding implementations
-                    pos_tensor += self.pos_embedding(
-                        torch.zeros_like(input_ids) + position
+                    hidden_states, all_hidden_states = self._static_transformer_forward(
+                        emb, static_cache, output_hidden_states=bool(output_hidden_states)
                     )
-                
-                emb = emb + pos_tensor
+                    lm_logits = self.lm_head(hidden_states)
+                if not return_dict:
+                    return (lm_logits, static_cache)
+                return CausalLMOutputWithCrossAttentions(
+                    loss=None,
+                    logits=lm_logits,
+                    past_key_values=static_cache,
+                    hidden_states=all_hidden_states,
+                )
 
             # Process through transformer
             transformer_outputs = self.transformer(
@@ -184,8 +415,9 @@ class GPT2InferenceModel(GPT2PreTrainedModel):
             self.logger.error(
                 f"State - input_ids: {input_ids.shape}, "
                 f"prefix_len: {prefix_len}, "
-                f"position: {position if 'position' in locals() else 'N/A'}, "
-                f"past_key_values: {past_key_values[0][0].shape if past_key_values is not None else 'None'}"
+                f"past_length: {past_length if 'past_length' in locals() else 'N/A'}, "
+                f"past_key_values: {past_key_values[0][0].shape if past_key_values else 'None'}, "
+                f"static_cache: {self.use_static_cache}"
             )
             raise
 
@@ -197,7 +429,43 @@ class GPT2InferenceModel(GPT2PreTrainedModel):
         :meth:`~transformers.PreTrainedModel.beam_search` or :meth:`~transformers.PreTrainedModel.beam_sample` is
         called. This is required to match :obj:`past_key_values` with the correct beam_idx at every generation step.
         """
+        if isinstance(past, StaticKVCache):
+            past.reorder_cache(beam_idx)
+            return past
         return tuple(
             tuple(past_state.index_select(0, beam_idx.to(past_state.device)) for past_state in layer_past)
             for layer_past in past
         )
+
+
+class DecodeGraph:
+    """
+    CUDA graph of GPT2InferenceModel.decode_step bound to one StaticKVCache.
+    Inputs are copied into static buffers before each replay; the returned
+    logits are cloned since the next replay overwrites the output buffer.
+    """
+
+    def __init__(self, model, cache, warmup_steps=3):
+        device = cache.slots.device
+        self.cache = cache
+        self.input_ids = torch.zeros((cache.batch_size, 1), dtype=torch.long, device=device)
+        self.cache_position = torch.zeros(1, dtype=torch.long, device=device)
+        self.mel_position = torch.zeros(1, dtype=torch.long, device=device)
+
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(warmup_steps):
+                model.decode_step(self.input_ids, self.cache_position, self.mel_position, cache)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.logits = model.decode_step(self.input_ids, self.cache_position, self.mel_position, cache)
+
+    def replay(self, input_ids, cache_position, mel_position):
+        self.input_ids.copy_(input_ids)
+        self.cache_position.fill_(cache_position)
+        self.mel_position.fill_(mel_position)
+        self.graph.replay()
+        return self.logits.clone()
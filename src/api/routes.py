@@ -1,13 +1,17 @@
 # src/api/routes.py
-from flask import Flask, request, jsonify, send_from_directory, render_template
+from flask import Flask, request, jsonify, send_from_directory, render_template, make_response
 from flask_cors import cross_origin
 import logging
+import math
 import os
-from collections import deque
 import time
-from werkzeug.utils import secure_filename
-from core.error_handlers import TTSBaseError, CudaError
-import requests
+from werkzeug.exceptions import NotFound
+from core.error_handlers import (
+    TTSBaseError, CudaError, EngineUnavailableError, EngineOverloadedError, RequestCancelledError, handle_tts_error
+)
+from core.cancellation import CancellationToken
+from core.scheduler import PRIORITIES, INTERACTIVE
+from core.batch_synthesis import parse_manifest
 
 def register_routes(app: Flask, tts_manager):
     @app.route("/", methods=["GET"])
@@ -18,8 +22,22 @@ def register_routes(app: Flask, tts_manager):
     @app.route("/recover", methods=["GET"])
     @cross_origin(origin='*')
     def recover():
-        tts_manager.reinitialize()
-        return jsonify({"success": True})
+        # ?engine=xtts rebuilds one engine in the background; without it only
+        # engines with an open circuit breaker are rebuilt. ?full=true keeps
+        # the old rebuild-everything behaviour.
+        if request.args.get("full", "").lower() == "true":
+            tts_manager.reinitialize()
+            return jsonify({"success": True, "recovering": "all"})
+
+        engine = request.args.get("engine")
+        if engine:
+            try:
+                started = tts_manager.recover_engine(engine)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            return jsonify({"success": True, "recovering": [engine] if started else []}), 202
+
+        return jsonify({"success": True, "recovering": tts_manager.recover_open_engines()}), 202
 
     @app.route("/voices", methods=["GET"])
     @cross_origin(origin='*')
@@ -46,6 +64,11 @@ def register_routes(app: Flask, tts_manager):
             voice_id = data.get("voice_id")
             session_id = data.get("session_id")
             target_language = data.get("target_language")
+            # The client sets final when the input is finished (Enter), so an
+            # unterminated last sentence is spoken too
+            final = bool(data.get("final", False))
+            # bulk requests only run while no interactive request is waiting
+            priority = data.get("priority", INTERACTIVE)
 
             if not text or not session_id:
                 return jsonify({
@@ -54,56 +77,108 @@ def register_routes(app: Flask, tts_manager):
                     "needs_audio": False
                 })
                 
-            if session_id not in tts_manager.speech_queue:
-                tts_manager.speech_queue[session_id] = deque()
-                
-            tts_manager.speech_queue[session_id].append(text)
-            
-            text_to_synthesize = tts_manager.speech_queue[session_id].popleft()
-            
-            if target_language is not None and target_language.strip() != '':
-                text_to_synthesize = tts_manager.translator.translate_text(
-                    text_to_synthesize, 
-                    target_language
-                )
+            if target_language is not None and target_language.strip() == '':
+                target_language = None
+
+            if priority not in PRIORITIES:
+                return jsonify({
+                    "success": False,
+                    "message": f"priority must be one of: {', '.join(PRIORITIES)}",
+                    "needs_audio": False
+                }), 400
+
+            # Work still running past the deadline is dropped by the engines
+            deadlines = tts_manager.config.deadlines
+            deadline_seconds = data.get("deadline_seconds")
+            if deadline_seconds is None:
+                deadline_seconds = deadlines.default_seconds
+            else:
+                try:
+                    deadline_seconds = float(deadline_seconds)
+                except (TypeError, ValueError):
+                    deadline_seconds = float("nan")
+                if not (math.isfinite(deadline_seconds) and deadline_seconds > 0):
+                    return jsonify({
+                        "success": False,
+                        "message": "deadline_seconds must be a positive number",
+                        "needs_audio": False
+                    }), 400
+            deadline_seconds = min(deadline_seconds, deadlines.max_seconds)
+            token = CancellationToken.with_timeout(deadline_seconds)
 
             start_time = time.time()
             try:
-                filename = tts_manager.synthesize_speech(
-                    text=text_to_synthesize,
+                results, superseded = tts_manager.speak_realtime(
+                    text=text,
                     voice_id=voice_id,
-                    session_id=session_id
+                    session_id=session_id,
+                    target_language=target_language,
+                    final=final,
+                    token=token,
+                    priority=priority,
+                    # Fair share per API key when one is sent, otherwise per session
+                    flow=request.headers.get("X-API-Key") or session_id
                 )
             except CudaError as e:
+                # The manager has opened this engine's breaker and is rebuilding it
                 logging.error(f"CUDA error detected: {e}")
-                # Make a request to the restart endpoint
-                try:
-                    requests.post('http://localhost:5000/restart')
-                except:
-                    pass
-                return jsonify({
+                retry_after = (e.details or {}).get("retry_after", tts_manager.config.recovery.open_seconds)
+                response = jsonify({
                     "success": False,
                     "error": str(e),
                     "error_type": "cuda",
-                    "requires_restart": True,
-                    "message": "Server is restarting due to CUDA error. Please retry in a few seconds."
-                }), 503
+                    "engine": e.model_name,
+                    "requires_restart": False,
+                    "message": f"{e.model_name} is recovering from a CUDA error. Please retry in a few seconds."
+                })
+                response.headers['Retry-After'] = str(max(1, int(retry_after)))
+                return response, 503
+            except EngineUnavailableError as e:
+                # Loading or recovering engine, or admission control predicting too long a wait
+                response = jsonify({
+                    "success": False,
+                    "error": e.message,
+                    "error_type": "overloaded" if isinstance(e, EngineOverloadedError) else "engine_unavailable",
+                    "engine": e.engine,
+                    "retry_after": e.retry_after
+                })
+                response.headers['Retry-After'] = str(max(1, int(e.retry_after)))
+                return response, 503
+            except RequestCancelledError as e:
+                logging.info(f"Realtime request for session {session_id} stopped: {e.reason}")
+                response, status_code = handle_tts_error(e)
+                return jsonify(response), status_code
 
-            if not filename:
+            segments = [
+                {
+                    "seq": segment.seq,
+                    "text": segment.text,
+                    "file_path": f"/audio/{result.filename}",
+                    "served_by": result.served_by()
+                }
+                for segment, result in results
+                if result.filename
+            ]
+            if not segments:
                 return jsonify({
                     "success": False,
                     "message": "No new complete sentence to process",
-                    "needs_audio": False
+                    "needs_audio": False,
+                    "superseded": superseded
                 })
 
             generation_time = time.time() - start_time
-            audio_url = f"/audio/{filename}"
 
+            # Segments play in seq order; superseded seqs were replaced by an edit.
+            # file_path/served_by describe the last segment for older clients.
             return jsonify({
                 "success": True,
-                "file_path": audio_url,
+                "segments": segments,
+                "superseded": superseded,
+                "file_path": segments[-1]["file_path"],
                 "message": "Audio generated successfully",
                 "needs_audio": True,
+                "served_by": segments[-1]["served_by"],
                 "timing_info": {
                     "total_generation_time": generation_time
                 }
@@ -147,28 +222,106 @@ def register_routes(app: Flask, tts_manager):
                 "error": str(e)
             }), 500
 
+    @app.route("/batch", methods=["POST"])
+    @cross_origin(origin='*')
+    def submit_batch():
+        # Body: a JSONL manifest ({"id", "text", "voice_id"} per line).
+        # ?job_id=<id> resumes an earlier job, ?archive=true also builds a zip
+        try:
+            items = parse_manifest(
+                request.get_data(as_text=True).splitlines(),
+                tts_manager.config.batch.max_items
+            )
+            job = tts_manager.batch_jobs.submit(
+                items,
+                job_id=request.args.get("job_id"),
+                archive=request.args.get("archive", "false").lower() == "true"
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        return jsonify({
+            "success": True,
+            "job_id": job.job_id,
+            "status_url": f"/batch/{job.job_id}",
+            "items": len(items)
+        }), 202
+
+    @app.route("/batch/<job_id>", methods=["GET", "DELETE"])
+    @cross_origin(origin='*')
+    def batch_status(job_id):
+        job = tts_manager.batch_jobs.get(job_id)
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": "Batch job not found"
+            }), 404
+        if request.method == "DELETE":
+            job.cancel()
+        return jsonify({"success": True, **job.get_status()})
+
+    @app.route("/batch/<job_id>/archive", methods=["GET"])
+    @cross_origin(origin='*')
+    def batch_archive(job_id):
+        job = tts_manager.batch_jobs.get(job_id)
+        if job is None or not job.get_status()["archive"]:
+            return jsonify({
+                "success": False,
+                "error": "Batch archive not found"
+            }), 404
+        return send_from_directory(
+            str(job.archive_path.parent),
+            job.archive_path.name,
+            mimetype='application/zip',
+            as_attachment=True
+        )
+
     @app.route('/audio/<path:filename>')
     def serve_audio(filename):
         try:
-            filename = secure_filename(os.path.basename(filename))
-            audio_dir = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                tts_manager.config.directories.audio_output_dir
-            )
-            
-            if not os.path.exists(os.path.join(audio_dir, filename)):
+            # Resolve <bucket>/<file> directly; send_from_directory does the
+            # existence check, so there is no separate stat here
+            audio_path = tts_manager.storage.resolve(filename)
+            if audio_path is None:
                 return jsonify({
                     "success": False,
                     "error": "Audio file not found"
                 }), 404
-                
-            return send_from_directory(
-                audio_dir,
-                filename,
+
+            serving = tts_manager.config.audio_serving
+            if serving.x_accel_redirect_prefix:
+                # nginx serves the file itself (sendfile, Range, conditionals)
+                relative = audio_path.relative_to(tts_manager.storage.root).as_posix()
+                response = make_response("")
+                response.headers['X-Accel-Redirect'] = f"{serving.x_accel_redirect_prefix.rstrip('/')}/{relative}"
+                response.headers['Content-Type'] = 'audio/wav'
+                if serving.as_attachment:
+                    response.headers['Content-Disposition'] = f'attachment; filename="{audio_path.name}"'
+                return response
+
+            # conditional=True answers Range (206) and If-None-Match /
+            # If-Modified-Since (304); the body goes through wsgi.file_wrapper,
+            # which production WSGI servers implement with sendfile
+            response = send_from_directory(
+                str(audio_path.parent),
+                audio_path.name,
                 mimetype='audio/wav',
-                as_attachment=True
+                as_attachment=serving.as_attachment,
+                conditional=True,
+                etag=True,
+                max_age=serving.max_age_seconds
             )
+            # Audio files are written once and never modified
+            response.cache_control.immutable = True
+            return response
         
+        except NotFound:
+            return jsonify({
+                "success": False,
+                "error": "Audio file not found"
+            }), 404
         except Exception as e:
             logging.error(f"Error serving audio file: {e}")
             return jsonify({
@@ -176,11 +329,69 @@ def register_routes(app: Flask, tts_manager):
                 "error": str(e)
             }), 500
 
+    @app.route("/metrics", methods=["GET"])
+    @cross_origin(origin='*')
+    def get_metrics():
+        return jsonify({
+            "engines": tts_manager.get_metrics(),
+            "realtime": tts_manager.realtime_sessions.get_status(),
+            "latency": tts_manager.latency.get_status(),
+            "timestamp": time.time()
+        })
+
+    @app.route("/estimate", methods=["GET"])
+    @cross_origin(origin='*')
+    def estimate():
+        # ?voice_id=<id>&text=<text> (or &chars=<n>) [&priority=bulk]
+        voice_id = request.args.get("voice_id")
+        priority = request.args.get("priority", INTERACTIVE)
+        try:
+            chars = int(request.args.get("chars", len(request.args.get("text", ""))))
+        except ValueError:
+            chars = -1
+        if not voice_id or chars <= 0 or priority not in PRIORITIES:
+            return jsonify({
+                "success": False,
+                "error": f"voice_id and text (or chars > 0) are required, priority one of: {', '.join(PRIORITIES)}"
+            }), 400
+        return jsonify({"success": True, **tts_manager.estimate_latency(voice_id, chars, priority)})
+
+    @app.route("/ready", methods=["GET"])
+    @cross_origin(origin='*')
+    def ready():
+        # 200 once every local engine is serving (or ?engine=xtts is), 503 while loading
+        readiness = tts_manager.get_readiness()
+        engine = request.args.get("engine")
+        if engine:
+            if engine not in readiness["engines"]:
+                return jsonify({
+                    "success": False,
+                    "error": f"Unknown engine: {engine}"
+                }), 400
+            is_ready = readiness["engines"][engine]["state"] == "ready"
+        else:
+            is_ready = readiness["ready"]
+        response = jsonify({**readiness, "ready": is_ready, "timestamp": time.time()})
+        if not is_ready:
+            response.headers['Retry-After'] = str(max(1, int(tts_manager.config.startup.loading_retry_after_seconds)))
+            return response, 503
+        return response
+
     @app.route("/health", methods=["GET"])
     @cross_origin(origin='*')
     def health_check():
+        # The process is alive while engines load; "starting" / "degraded" say why /ready is 503
+        readiness = tts_manager.get_readiness()
+        states = [info["state"] for info in readiness["engines"].values()]
+        if readiness["ready"]:
+            status = "healthy"
+        elif "failed" in states:
+            status = "degraded"
+        else:
+            status = "starting"
         return jsonify({
-            "status": "healthy",
+            "status": status,
+            "engines": {engine: info["state"] for engine, info in readiness["engines"].items()},
             "available_voices": len(tts_manager.get_voices()),
             "timestamp": time.time()
         })
@@ -0,0 +1,68 @@
+# src/batch_synthesize.py
+"""
+Render a JSONL manifest ({"id", "text", "voice_id"} per line) offline.
+
+Only the engines the manifest uses are loaded. Outputs land in
+<output>/<id>.wav with results.jsonl and manifest.json next to them;
+running the same command again resumes after a crash, skipping items
+already rendered and retrying failed ones.
+
+    python src/batch_synthesize.py prompts.jsonl --output ivr_catalog --archive
+"""
+import os
+os.environ["COQUI_TOS_AGREED"] = "1"
+os.environ["ACCEPT_TOS"] = "1"
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.ConfigLoader import ConfigLoader
+from core.cpu_profile import apply_cpu_profile
+from core.batch_synthesis import BatchJob, parse_manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a JSONL manifest of prompts to audio files")
+    parser.add_argument("manifest", help="JSONL file with id, text and voice_id per line")
+    parser.add_argument("--output", required=True, help="Output directory (reused to resume)")
+    parser.add_argument("--config", default="src/config.yaml")
+    parser.add_argument("--archive", action="store_true", help="Also write <output>.zip")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Requests in flight per engine (default: batch.concurrency)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    config = ConfigLoader.load_config(args.config)
+    with open(args.manifest, encoding="utf-8") as f:
+        items = parse_manifest(f, config.batch.max_items)
+
+    from core.tts_manager import ENGINE_SERVICES, TTSManager
+    # Load only what the manifest needs, all of it before the first item
+    config.startup.engines = sorted({
+        engine for prefix, (engine, _) in ENGINE_SERVICES.items()
+        if any(item.voice_id.startswith(prefix) for item in items)
+    })
+    config.startup.background = False
+    ConfigLoader.ensure_directories(config)
+    apply_cpu_profile(config)
+    tts_manager = TTSManager(config)
+
+    output_dir = Path(args.output).resolve()
+    concurrency = args.concurrency if args.concurrency is not None else config.batch.concurrency
+    job = BatchJob(output_dir.name, items, output_dir, tts_manager, concurrency, args.archive)
+    try:
+        job.run()
+    except KeyboardInterrupt:
+        job.cancel()
+    finally:
+        tts_manager.cleanup_service.stop()
+
+    status = job.get_status()
+    print(json.dumps(status, indent=2))
+    sys.exit(0 if status["state"] == "completed" and status["failed"] == 0 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Concurrent download throughput benchmark for /audio/<path>.
+
+Generates one audio file through /generate-realtime (or uses --audio-path),
+then measures full downloads, random Range requests and conditional
+re-fetches (If-None-Match) at increasing concurrency levels.
+
+    python src/benchmarks/bench_audio_download.py --base-url https://127.0.0.1:5000
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+import aiohttp
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BENCH_CONFIG = {
+    'concurrency_levels': [1, 8, 32, 64],
+    'requests_per_level': 200,
+    'range_size': 64 * 1024,
+    'timeout': 30,
+    'voice_id': 'kokoro_af_heart',
+    'text': "This is a reasonably long sentence used to produce an audio file for the download benchmark."
+}
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def create_audio_file(session: aiohttp.ClientSession, base_url: str) -> str:
+    """Generate one file to download and return its /audio path"""
+    async with session.post(f"{base_url}/generate-realtime", json={
+        'text': BENCH_CONFIG['text'],
+        'voice_id': BENCH_CONFIG['voice_id'],
+        'session_id': f"bench_download_{int(time.time() * 1000)}"
+    }) as response:
+        data = await response.json()
+        if not data.get('success'):
+            raise RuntimeError(f"Could not generate benchmark audio: {data}")
+        return data['file_path']
+
+async def fetch(session: aiohttp.ClientSession, url: str, mode: str,
+                size: int, etag: str) -> Dict:
+    headers = {}
+    if mode == 'range':
+        start = random.randint(0, max(0, size - BENCH_CONFIG['range_size']))
+        headers['Range'] = f"bytes={start}-{start + BENCH_CONFIG['range_size'] - 1}"
+    elif mode == 'conditional':
+        headers['If-None-Match'] = etag
+
+    start_time = time.time()
+    async with session.get(url, headers=headers) as response:
+        body = await response.read()
+        return {
+            'status': response.status,
+            'bytes': len(body),
+            'latency': time.time() - start_time
+        }
+
+async def run_level(session: aiohttp.ClientSession, url: str, mode: str,
+                    concurrency: int, size: int, etag: str) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            return await fetch(session, url, mode, size, etag)
+
+    start_time = time.time()
+    results = await asyncio.gather(*[limited() for _ in range(BENCH_CONFIG['requests_per_level'])])
+    elapsed = time.time() - start_time
+
+    latencies = [r['latency'] for r in results]
+    total_bytes = sum(r['bytes'] for r in results)
+    statuses = {}
+    for r in results:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(results),
+        'elapsed': elapsed,
+        'requests_per_second': len(results) / elapsed,
+        'throughput_mb_s': total_bytes / elapsed / (1024 * 1024),
+        'p50_latency': percentile(latencies, 50),
+        'p99_latency': percentile(latencies, 99),
+        'statuses': statuses
+    }
+
+async def main(base_url: str, audio_path: str = None):
+    connector = aiohttp.TCPConnector(ssl=False, limit=0)
+    timeout = aiohttp.ClientTimeout(total=BENCH_CONFIG['timeout'])
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        if audio_path is None:
+            audio_path = await create_audio_file(session, base_url)
+        url = f"{base_url}{audio_path}"
+
+        async with session.get(url) as response:
+            body = await response.read()
+            etag = response.headers.get('ETag', '')
+            logger.info(
+                f"File {audio_path}: {len(body)} bytes, ETag={etag}, "
+                f"Accept-Ranges={response.headers.get('Accept-Ranges')}"
+            )
+
+        results = []
+        for mode in ['full', 'range', 'conditional']:
+            for concurrency in BENCH_CONFIG['concurrency_levels']:
+                result = await run_level(session, url, mode, concurrency, len(body), etag)
+                results.append(result)
+                logger.info(
+                    f"{mode:<12} c={concurrency:<3} {result['requests_per_second']:8.1f} req/s "
+                    f"{result['throughput_mb_s']:8.2f} MB/s p50={result['p50_latency']*1000:.1f}ms "
+                    f"p99={result['p99_latency']*1000:.1f}ms statuses={result['statuses']}"
+                )
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"audio_download_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({'config': BENCH_CONFIG, 'audio_path': audio_path, 'results': results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent /audio downloads")
+    parser.add_argument('--base-url', default='https://127.0.0.1:5000')
+    parser.add_argument('--audio-path', default=None, help="Existing /audio/<path> to download")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.audio_path))
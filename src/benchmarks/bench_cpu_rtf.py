@@ -0,0 +1,109 @@
+"""
+CPU real-time factor (RTF) per local engine.
+
+Loads each engine on CPU with the CPU profile on and off, synthesizes the
+same texts and reports RTF = synthesis time / audio duration (lower is
+better, < 1 means faster than real time).
+
+    python src/benchmarks/bench_cpu_rtf.py --engines kokoro xtts --threads 8
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ["COQUI_TOS_AGREED"] = "1"
+
+import sys
+import json
+import time
+import argparse
+import logging
+import importlib
+import dataclasses
+from pathlib import Path
+from datetime import datetime
+
+import soundfile as sf
+
+src_dir = Path(__file__).parent.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(src_dir.parent))
+from config.ConfigLoader import ConfigLoader
+from core.cpu_profile import apply_cpu_profile
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ENGINES = {
+    "xtts": ("services.XttsService", "XttsService", "xtts_en_female",
+             "The quick brown fox jumps over the lazy dog."),
+    "vixtts": ("services.ViXttsService", "ViXttsService", "vixtts_female",
+               "Xin chào, đây là một bài kiểm tra hệ thống."),
+    "indic": ("services.IndicService", "IndicService", "indic_hi_divya",
+              "नमस्ते, यह एक परीक्षण वाक्य है।"),
+    "kokoro": ("services.KokoroService", "KokoroService", "kokoro_af_heart",
+               "The quick brown fox jumps over the lazy dog."),
+}
+
+def run_engine(config, engine: str, runs: int):
+    module_name, class_name, voice_id, text = ENGINES[engine]
+    service_class = getattr(importlib.import_module(module_name), class_name)
+
+    start_time = time.time()
+    service = service_class(config)
+    init_time = time.time() - start_time
+
+    synth_time = 0.0
+    audio_seconds = 0.0
+    for run in range(runs):
+        start_time = time.time()
+        filename = service.synthesize(text, voice_id, f"bench_cpu_{engine}_{run}")
+        synth_time += time.time() - start_time
+        audio_path = service.storage.resolve(filename)
+        audio_seconds += sf.info(str(audio_path)).duration
+        audio_path.unlink()
+
+    return {
+        "init_time": init_time,
+        "mean_latency": synth_time / runs,
+        "audio_seconds": audio_seconds / runs,
+        "real_time_factor": synth_time / audio_seconds if audio_seconds else None,
+    }
+
+def main(engines, runs: int, threads: int, config_path: str):
+    config = ConfigLoader.load_config(config_path)
+    config = dataclasses.replace(
+        config,
+        cpu_profile=dataclasses.replace(config.cpu_profile, num_threads=threads)
+    )
+    applied = apply_cpu_profile(config)
+
+    results = {}
+    for engine in engines:
+        for profile_enabled in (False, True):
+            label = f"{engine}/{'cpu_profile' if profile_enabled else 'baseline'}"
+            run_config = dataclasses.replace(
+                config,
+                cpu_profile=dataclasses.replace(config.cpu_profile, enabled=profile_enabled)
+            )
+            try:
+                results[label] = run_engine(run_config, engine, runs)
+                logger.info(f"{label}: {json.dumps(results[label])}")
+            except Exception as e:
+                logger.error(f"{label} failed: {e}")
+                results[label] = {"error": str(e)}
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"cpu_rtf_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"engines": engines, "runs": runs, "threads": applied, "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure CPU real-time factor per engine")
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads, 0 = default")
+    parser.add_argument('--config', default="src/config.yaml")
+    args = parser.parse_args()
+    main(args.engines, args.runs, args.threads, args.config)
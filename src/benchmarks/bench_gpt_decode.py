@@ -0,0 +1,153 @@
+"""
+Decode-step micro-benchmark for GPT2InferenceModel (assets/gpt_inference.py).
+
+Builds a small randomly initialised GPT-2 wired the way XTTS wires it
+(conditioning prefix, learned mel position embeddings, null wpe), runs a
+prefill followed by single-token decode steps on CPU and reports decode
+tokens/second and per-step latency. Pass --module to time another copy of
+gpt_inference.py, e.g. the previous revision:
+
+    git show HEAD~1:assets/gpt_inference.py > /tmp/gpt_inference_old.py
+    python src/benchmarks/bench_gpt_decode.py --module /tmp/gpt_inference_old.py
+    python src/benchmarks/bench_gpt_decode.py --static-cache
+    python src/benchmarks/bench_gpt_decode.py --static-cache --fixed-shape
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import sys
+import json
+import time
+import argparse
+import logging
+import functools
+import importlib.util
+from pathlib import Path
+from datetime import datetime
+
+import torch
+from torch import nn
+from transformers import GPT2Config, GPT2Model
+
+src_dir = Path(__file__).parent.parent
+project_root = src_dir.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(project_root))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LearnedPositionEmbeddings(nn.Module):
+    """Same interface as the XTTS mel position embeddings"""
+
+    def __init__(self, seq_len, model_dim):
+        super().__init__()
+        self.emb = nn.Embedding(seq_len, model_dim)
+
+    def forward(self, x):
+        return self.emb(torch.arange(0, x.shape[1], device=x.device))
+
+    def get_fixed_embedding(self, ind, dev):
+        return self.emb(torch.tensor([ind], device=dev)).unsqueeze(0)
+
+def null_position_embeddings(range, dim):
+    return torch.zeros((range.shape[0], range.shape[1], dim), device=range.device)
+
+def load_inference_class(module_path: Path):
+    spec = importlib.util.spec_from_file_location("bench_gpt_inference", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.GPT2InferenceModel
+
+def build_model(inference_class, layers: int, dim: int, heads: int, vocab: int, max_len: int):
+    config = GPT2Config(
+        vocab_size=vocab, n_positions=max_len, n_embd=dim, n_layer=layers, n_head=heads,
+        use_cache=True
+    )
+    gpt = GPT2Model(config)
+    # XTTS replaces the built-in positional embeddings
+    del gpt.wpe
+    gpt.wpe = functools.partial(null_position_embeddings, dim=dim)
+    del gpt.wte
+    model = inference_class(
+        config, gpt, LearnedPositionEmbeddings(max_len, dim), nn.Embedding(vocab, dim),
+        nn.LayerNorm(dim), nn.Linear(dim, vocab), kv_cache=True
+    )
+    return model.eval()
+
+@torch.inference_mode()
+def run_decode(model, prefix_len: int, steps: int, batch_size: int, dim: int):
+    model.store_prefix_emb(torch.randn(1, prefix_len, dim))
+    input_ids = torch.zeros(batch_size, prefix_len + 1, dtype=torch.long)
+
+    start_time = time.perf_counter()
+    outputs = model(input_ids=input_ids, use_cache=True, return_dict=True)
+    prefill_time = time.perf_counter() - start_time
+
+    past = outputs.past_key_values
+    next_token = outputs.logits[:, -1:].argmax(-1)
+    start_time = time.perf_counter()
+    for _ in range(steps):
+        outputs = model(input_ids=next_token, past_key_values=past, use_cache=True, return_dict=True)
+        past = outputs.past_key_values
+        next_token = outputs.logits[:, -1:].argmax(-1)
+    decode_time = time.perf_counter() - start_time
+    return prefill_time, decode_time
+
+def main(args):
+    torch.manual_seed(args.seed)
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    module_path = Path(args.module) if args.module else project_root / "assets" / "gpt_inference.py"
+    inference_class = load_inference_class(module_path)
+
+    model = build_model(inference_class, args.layers, args.dim, args.heads, args.vocab,
+                        args.prefix_len + args.steps + 2)
+    if args.static_cache:
+        # On CPU the fixed-shape step runs eagerly, which shows its cost
+        # without the CUDA graph
+        model.enable_static_cache(cuda_graph=args.fixed_shape)
+
+    run_decode(model, args.prefix_len, min(args.steps, 16), args.batch_size, args.dim)
+    prefill_times, decode_times = [], []
+    for _ in range(args.runs):
+        prefill_time, decode_time = run_decode(model, args.prefix_len, args.steps, args.batch_size, args.dim)
+        prefill_times.append(prefill_time)
+        decode_times.append(decode_time)
+
+    decode_time = min(decode_times)
+    results = {
+        "prefill_ms": min(prefill_times) * 1000,
+        "step_ms": decode_time / args.steps * 1000,
+        "tokens_per_second": args.steps * args.batch_size / decode_time,
+    }
+    logger.info(
+        f"{module_path.name} static_cache={args.static_cache} fixed_shape={args.fixed_shape}: "
+        f"{json.dumps(results)}"
+    )
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"gpt_decode_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"config": vars(args), "module": str(module_path), "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure GPT2InferenceModel decode tokens/s on CPU")
+    parser.add_argument('--module', default=None, help="gpt_inference.py to load (defaults to assets/)")
+    parser.add_argument('--static-cache', action='store_true')
+    parser.add_argument('--fixed-shape', action='store_true', help="use the graph-capturable decode step")
+    parser.add_argument('--layers', type=int, default=6)
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--heads', type=int, default=8)
+    parser.add_argument('--vocab', type=int, default=1026)
+    parser.add_argument('--prefix-len', type=int, default=64)
+    parser.add_argument('--steps', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads, 0 = default")
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,93 @@
+"""
+Import-time profile of the API modules (python -X importtime).
+
+Imports each module in a fresh interpreter, parses the -X importtime
+report and records the cumulative import time, the slowest modules by
+self time, and whether any heavy engine library was pulled in. Engine
+libraries (torch, TTS, kokoro, parler_tts, transformers, boto3, google
+cloud) must only load when an engine is initialized, so importing
+core.tts_manager or the routes stays cheap for tests and tooling.
+
+Exits non-zero when the budget is exceeded or a heavy library is
+imported, so it can run as a regression check:
+
+    python src/benchmarks/bench_import_time.py --budget-ms 1000
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+src_dir = Path(__file__).parent.parent
+project_root = src_dir.parent
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = ["torch", "TTS", "kokoro", "parler_tts", "transformers", "boto3", "google.cloud"]
+
+def profile_import(module: str) -> dict:
+    """Import module in a new interpreter; returns per-module (self_us, cumulative_us)"""
+    code = (
+        "import sys, json\n"
+        f"import {module}\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(src_dir), str(project_root)]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(src_dir), env=env, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return {"timings": timings, "loaded": json.loads(result.stdout.splitlines()[-1])}
+
+def main(args):
+    results = {}
+    failed = False
+    for module in args.modules:
+        runs = [profile_import(module) for _ in range(args.runs)]
+        totals = sorted(run["timings"][module][1] / 1000 for run in runs)
+        slowest = sorted(runs[0]["timings"].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        heavy = [
+            name for name in HEAVY_MODULES
+            if any(loaded == name or loaded.startswith(name + ".") for loaded in runs[0]["loaded"])
+        ]
+        results[module] = {
+            "cumulative_ms_min": totals[0],
+            "cumulative_ms_median": totals[len(totals) // 2],
+            "heavy_modules": heavy,
+            "slowest_self_ms": {name: self_us / 1000 for name, (self_us, _) in slowest}
+        }
+        logger.info(f"{module}: {totals[0]:.0f} ms (min of {args.runs}), heavy modules: {heavy or 'none'}")
+        if totals[0] > args.budget_ms:
+            logger.error(f"{module} import takes {totals[0]:.0f} ms, budget is {args.budget_ms:.0f} ms")
+            failed = True
+        if heavy:
+            logger.error(f"{module} imports engine libraries at load time: {', '.join(heavy)}")
+            failed = True
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"import_time_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile module import time and catch eager engine imports")
+    parser.add_argument('--modules', nargs='+', default=["core.tts_manager", "api.routes"])
+    parser.add_argument('--budget-ms', type=float, default=1000.0, help="cumulative import time allowed per module")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="slowest modules to record")
+    args = parser.parse_args()
+    sys.exit(main(args))
@@ -0,0 +1,140 @@
+"""
+Per-request IPC overhead of process-isolated engines (core/engine_worker.py).
+
+Runs a stand-in engine that returns noise of a given length in a worker
+process and measures round trip minus generation time for three ways of
+getting the audio back to the API process:
+
+    shm     EngineWorker: shared-memory buffer, only metadata on the pipe
+    pickle  the array pickled through the pipe
+    file    the worker writes a WAV, the API process reads it back
+
+    python src/benchmarks/bench_ipc_overhead.py --seconds 2 10 30
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import soundfile as sf
+
+src_dir = Path(__file__).parent.parent
+project_root = src_dir.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(project_root))
+
+from core.engine_worker import EngineWorker
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 24000
+
+class NoiseService:
+    """Stand-in engine: voice 'noise_<seconds>' returns that much float32 noise"""
+
+    def __init__(self, config, device=None):
+        self.device = device
+        self.rng = np.random.default_rng(0)
+
+    def get_supported_languages(self):
+        return []
+
+    def get_voices(self):
+        return {}
+
+    def generate_audio(self, text, voice_id):
+        seconds = float(voice_id.split("_")[1])
+        return self.rng.standard_normal(int(seconds * SAMPLE_RATE), dtype=np.float32), SAMPLE_RATE
+
+def _baseline_worker(conn, mode: str, output_dir: str):
+    """Worker loop for the pickle/file baselines"""
+    service = NoiseService(None)
+    conn.send("ready")
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        start_time = time.perf_counter()
+        audio, sample_rate = service.generate_audio("", message)
+        generate_time = time.perf_counter() - start_time
+        if mode == "pickle":
+            conn.send((audio, sample_rate, generate_time))
+        else:
+            path = os.path.join(output_dir, f"{time.time_ns()}.wav")
+            sf.write(path, audio, sample_rate, subtype="FLOAT")
+            conn.send((path, sample_rate, generate_time))
+
+def measure_baseline(mode: str, seconds: float, runs: int):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as output_dir:
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_baseline_worker, args=(child_conn, mode, output_dir), daemon=True)
+        process.start()
+        parent_conn.recv()
+        overheads = []
+        for _ in range(runs + 1):
+            start_time = time.perf_counter()
+            parent_conn.send(f"noise_{seconds}")
+            payload, _, generate_time = parent_conn.recv()
+            if mode == "file":
+                path = payload
+                payload, _ = sf.read(path, dtype="float32")
+                os.remove(path)
+            overheads.append(time.perf_counter() - start_time - generate_time)
+        parent_conn.send(None)
+        process.join(timeout=10)
+    return overheads[1:]
+
+def measure_shared_memory(seconds: float, runs: int):
+    worker = EngineWorker("noise", f"{NoiseService.__module__}:NoiseService", start_timeout=120)
+    try:
+        worker.generate_audio("", f"noise_{seconds}")
+        worker._ipc_overhead.clear()
+        for _ in range(runs):
+            worker.generate_audio("", f"noise_{seconds}")
+        return list(worker._ipc_overhead)
+    finally:
+        worker.shutdown()
+
+def main(args):
+    results = {}
+    for seconds in args.seconds:
+        results[str(seconds)] = {}
+        for mode in args.modes:
+            if mode == "shm":
+                overheads = measure_shared_memory(seconds, args.runs)
+            else:
+                overheads = measure_baseline(mode, seconds, args.runs)
+            overheads = sorted(overheads)
+            results[str(seconds)][mode] = {
+                "mean_ms": 1000 * sum(overheads) / len(overheads),
+                "p50_ms": 1000 * overheads[len(overheads) // 2],
+                "max_ms": 1000 * overheads[-1]
+            }
+            logger.info(f"{seconds}s clip, {mode}: {json.dumps(results[str(seconds)][mode])}")
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"ipc_overhead_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-request IPC overhead of engine worker processes")
+    parser.add_argument('--seconds', type=float, nargs='+', default=[2.0, 10.0, 30.0], help="clip lengths")
+    parser.add_argument('--modes', nargs='+', default=["shm", "pickle", "file"], choices=["shm", "pickle", "file"])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    main(args)
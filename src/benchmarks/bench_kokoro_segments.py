@@ -0,0 +1,122 @@
+"""
+Kokoro on CPU with multi-paragraph inputs: the stock KPipeline loop
+(G2P and model strictly alternating per segment) versus KokoroService
+with G2P overlapped with inference (config.kokoro.overlap_g2p).
+
+Also reports G2P alone and model alone, which bound what the overlap can
+save: at best the total drops from g2p + model to max(g2p, model), and
+the overlapped path again with every piece already in the phoneme cache
+(config.kokoro.cache_enabled), where G2P costs next to nothing.
+
+    python src/benchmarks/bench_kokoro_segments.py --paragraphs 1 4 16 --threads 8
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import sys
+import json
+import time
+import argparse
+import logging
+import dataclasses
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+src_dir = Path(__file__).parent.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(src_dir.parent))
+from config.ConfigLoader import ConfigLoader
+from core.cpu_profile import apply_cpu_profile
+from core.phoneme_cache import PhonemeCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PARAGRAPH = (
+    "The quick brown fox jumps over the lazy dog while the early train leaves the station. "
+    "Please listen carefully, as our menu options have recently changed. "
+    "For billing questions, press one; for technical support, press two."
+)
+
+def _timed(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    return float(np.median(times))
+
+def run(service, voice: str, paragraphs: int, runs: int):
+    from kokoro import KPipeline
+    text = "\n\n".join([PARAGRAPH] * paragraphs)
+    lang_code = voice[0]
+    pipeline = service.pipelines[lang_code]
+    speed = service.config.kokoro_speed
+
+    def stock():
+        # What KokoroService.generate_audio did before: one loop, G2P then model per segment
+        np.concatenate([audio for _, _, audio in pipeline(text, voice=voice, speed=speed, split_pattern=r'\n+')])
+
+    phonemes = [ps for _, ps in service.phonemize(lang_code, text)]
+    pack = pipeline.load_voice(voice).to(service.model.device)
+
+    def model_only():
+        for ps in phonemes:
+            KPipeline.infer(service.model, ps, pack, speed)
+
+    def overlapped():
+        service.generate_audio(text, f"kokoro_{voice}")
+
+    stock()  # warm up
+    result = {
+        "chars": len(text),
+        "segments": len(phonemes),
+        "stock_pipeline": _timed(stock, runs),
+        "g2p_only": _timed(lambda: service.phonemize(lang_code, text), runs),
+        "model_only": _timed(model_only, runs),
+        "overlapped": _timed(overlapped, runs),
+    }
+    service.phoneme_cache = PhonemeCache()
+    overlapped()  # fills the cache
+    result["overlapped_cached"] = _timed(overlapped, runs)
+    service.phoneme_cache = None
+    return result
+
+def main(paragraph_counts, runs: int, threads: int, voice: str, config_path: str):
+    config = ConfigLoader.load_config(config_path)
+    config = dataclasses.replace(
+        config,
+        cpu_profile=dataclasses.replace(config.cpu_profile, num_threads=threads),
+        # Uncached unless a measurement installs a cache itself
+        kokoro=dataclasses.replace(config.kokoro, overlap_g2p=True, cache_enabled=False)
+    )
+    applied = apply_cpu_profile(config)
+    from services.KokoroService import KokoroService
+    service = KokoroService(config, device="cpu")
+
+    results = {}
+    for paragraphs in paragraph_counts:
+        result = run(service, voice, paragraphs, runs)
+        result["speedup"] = result["stock_pipeline"] / result["overlapped"]
+        results[str(paragraphs)] = result
+        logger.info(f"{paragraphs} paragraphs: {json.dumps(result)}")
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"kokoro_segments_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"voice": voice, "runs": runs, "threads": applied, "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kokoro segment pipeline: stock loop vs overlapped G2P")
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads, 0 = default")
+    parser.add_argument('--voice', default="af_heart")
+    parser.add_argument('--config', default="src/config.yaml")
+    args = parser.parse_args()
+    main(args.paragraphs, args.runs, args.threads, args.voice, args.config)
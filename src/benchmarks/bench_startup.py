@@ -0,0 +1,87 @@
+"""
+Cold-start time of TTSManager with engines loaded one after another versus
+concurrently (config.startup.max_workers).
+
+Each run builds a fresh manager in a new process with background loading
+off, so the measured time is "process start to every engine ready". Model
+downloads should already be in the local cache, otherwise the first run
+measures the network.
+
+    python src/benchmarks/bench_startup.py --max-workers 1 4
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ["COQUI_TOS_AGREED"] = "1"
+
+import sys
+import json
+import time
+import argparse
+import logging
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+
+src_dir = Path(__file__).parent.parent
+project_root = src_dir.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(project_root))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _cold_start(config_path: str, max_workers: int, queue):
+    from config.ConfigLoader import ConfigLoader
+    from core.cpu_profile import apply_cpu_profile
+    start_time = time.time()
+    from core.tts_manager import TTSManager
+    import_seconds = time.time() - start_time
+
+    config = ConfigLoader.load_config(config_path)
+    config.startup.max_workers = max_workers
+    config.startup.background = False
+    apply_cpu_profile(config)
+    manager = TTSManager(config)
+    queue.put({
+        "import_seconds": import_seconds,
+        "total_seconds": time.time() - start_time,
+        "engines": {engine: report["seconds"] for engine, report in manager.startup_report.items()}
+    })
+
+def measure(config_path: str, max_workers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_cold_start, args=(config_path, max_workers, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main(args):
+    results = {}
+    for max_workers in args.max_workers:
+        runs = [measure(args.config, max_workers) for _ in range(args.runs)]
+        totals = sorted(run["total_seconds"] for run in runs)
+        results[str(max_workers)] = {
+            "total_seconds_min": totals[0],
+            "total_seconds_median": totals[len(totals) // 2],
+            "sum_of_engine_seconds": sum(runs[0]["engines"].values()),
+            "runs": runs
+        }
+        logger.info(f"max_workers={max_workers}: all engines ready in {totals[0]:.1f}s (min of {args.runs})")
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"startup_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure TTSManager cold start, sequential vs concurrent engine loading")
+    parser.add_argument('--config', default=str(src_dir / 'config.yaml'))
+    parser.add_argument('--max-workers', type=int, nargs='+', default=[1, 4], help="engine loader threads")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    main(args)
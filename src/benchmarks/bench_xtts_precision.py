@@ -0,0 +1,130 @@
+"""
+Accuracy / latency comparison of XTTS inference settings on CPU.
+
+Loads the XTTS model once per setting (fp32 baseline, bf16 autocast, int8
+dynamic quantization, optionally torch.compile), synthesizes the same texts
+with a fixed seed and reports latency, real-time factor and how far each
+output is from the baseline, the first setting given (log-mel L1 distance,
+duration ratio).
+
+    python src/benchmarks/bench_xtts_precision.py --settings fp32 int8 bf16
+"""
+import os
+# Force CPU before torch is imported anywhere
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ["COQUI_TOS_AGREED"] = "1"
+
+import sys
+import json
+import time
+import argparse
+import logging
+import dataclasses
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import torch
+
+src_dir = Path(__file__).parent.parent
+sys.path.append(str(src_dir))
+sys.path.append(str(src_dir.parent))
+from config.ConfigLoader import ConfigLoader
+from core.constants import XTTS_SAMPLE_RATE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BENCH_TEXTS = [
+    "Hello, this is a test of the TTS system.",
+    "The quick brown fox jumps over the lazy dog.",
+    "This is a longer sentence to test the system's performance with varying text lengths.",
+]
+
+SETTINGS = {
+    "fp32": {"precision": "fp32", "compile": False},
+    "bf16": {"precision": "bf16", "compile": False},
+    "int8": {"precision": "int8", "compile": False},
+    "fp32-compile": {"precision": "fp32", "compile": True},
+    "int8-compile": {"precision": "int8", "compile": True},
+}
+
+def log_mel(wav: np.ndarray) -> torch.Tensor:
+    """Log-magnitude spectrogram used to compare outputs"""
+    signal = torch.as_tensor(wav, dtype=torch.float32)
+    spec = torch.stft(signal, n_fft=1024, hop_length=256, window=torch.hann_window(1024), return_complex=True)
+    return torch.log(spec.abs() + 1e-5)
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Mean L1 distance between log spectrograms over the shared length"""
+    ref, cand = log_mel(reference), log_mel(candidate)
+    frames = min(ref.shape[-1], cand.shape[-1])
+    return float((ref[..., :frames] - cand[..., :frames]).abs().mean())
+
+def run_setting(config, name: str, seed: int, runs: int):
+    from services.XttsService import XttsService
+
+    config = dataclasses.replace(
+        config,
+        inference=dataclasses.replace(config.inference, **SETTINGS[name])
+    )
+    start_time = time.time()
+    service = XttsService(config)
+    init_time = time.time() - start_time
+
+    gpt_cond_latent, speaker_embedding = service.model.get_conditioning_latents(
+        audio_path=service.speakers["female"]
+    )
+    outputs, latencies = [], []
+    for text in BENCH_TEXTS:
+        for run in range(runs):
+            torch.manual_seed(seed)
+            start_time = time.time()
+            out = service.model.inference(text, "en", gpt_cond_latent, speaker_embedding, temperature=0.75)
+            latencies.append(time.time() - start_time)
+            if run == 0:
+                outputs.append(np.asarray(out["wav"]))
+
+    audio_seconds = sum(len(wav) for wav in outputs) / XTTS_SAMPLE_RATE * runs
+    del service
+    return {
+        "init_time": init_time,
+        "mean_latency": float(np.mean(latencies)),
+        "real_time_factor": float(np.sum(latencies) / audio_seconds),
+    }, outputs
+
+def main(settings, seed: int, runs: int, config_path: str):
+    torch.set_num_threads(os.cpu_count())
+    config = ConfigLoader.load_config(config_path)
+
+    results = {}
+    baseline = None
+    for name in settings:
+        logger.info(f"Running setting {name}")
+        metrics, outputs = run_setting(config, name, seed, runs)
+        if baseline is None:
+            baseline = outputs
+        metrics["spectral_distance"] = float(np.mean([
+            spectral_distance(ref, cand) for ref, cand in zip(baseline, outputs)
+        ]))
+        metrics["duration_ratio"] = float(
+            sum(len(w) for w in outputs) / sum(len(w) for w in baseline)
+        )
+        results[name] = metrics
+        logger.info(f"{name}: {json.dumps(metrics)}")
+
+    output_dir = Path.cwd() / 'test_results'
+    output_dir.mkdir(exist_ok=True)
+    output_file = output_dir / f"xtts_precision_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({"settings": settings, "seed": seed, "runs": runs, "results": results}, f, indent=2)
+    logger.info(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare XTTS precision/compile settings on CPU")
+    parser.add_argument('--settings', nargs='+', default=["fp32", "bf16", "int8"], choices=list(SETTINGS))
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--runs', type=int, default=2)
+    parser.add_argument('--config', default="src/config.yaml")
+    args = parser.parse_args()
+    main(args.settings, args.seed, args.runs, args.config)
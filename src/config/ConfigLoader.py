@@ -1,7 +1,7 @@
 import yaml
 import os
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, List
 from pathlib import Path
 import logging
 
@@ -11,6 +11,184 @@ class CleanupConfig:
     min_free_space_mb: int = 1000
     cleanup_interval_minutes: int = 30
 
+@dataclass
+class AudioServingConfig:
+    as_attachment: bool = True
+    max_age_seconds: int = 3600
+    use_x_sendfile: bool = False
+    x_accel_redirect_prefix: str = ""
+
+@dataclass
+class InferenceConfig:
+    precision: str = "fp32"  # fp32 | fp16 | bf16 | int8 (CPU only)
+    compile: bool = False
+    compile_mode: str = "default"
+    inference_mode: bool = True
+    static_kv_cache: bool = False  # preallocated KV cache in the patched GPT2InferenceModel
+    cuda_graph: bool = False  # replay decode steps from a CUDA graph (needs static_kv_cache)
+    continuous_batching: bool = False  # share GPT decode steps across concurrent XTTS requests
+    max_batch_size: int = 8
+    batch_timeout_seconds: float = 300.0  # per sentence in the decode batch, 0 = only the request deadline
+    pipeline_vocoder: bool = False  # vocode XTTS latent chunks while the GPT is still generating
+    pipeline_chunk_frames: int = 20
+    pipeline_context_frames: int = 8
+    pipeline_overlap_samples: int = 1024
+
+@dataclass
+class KokoroConfig:
+    # Phonemize the next segment in a background thread while the model
+    # synthesizes the current one
+    overlap_g2p: bool = True
+    g2p_threads: int = 4
+    # LRU of G2P results per language: whole text pieces and single
+    # out-of-lexicon words
+    cache_enabled: bool = True
+    cache_sentence_entries: int = 10000
+    cache_word_entries: int = 50000
+    # JSON file the cache is loaded from and saved to; relative to src/, "" = memory only
+    cache_path: str = ""
+    cache_save_interval_seconds: float = 300.0
+
+@dataclass
+class CpuProfileConfig:
+    enabled: bool = True  # applies to engines that run on CPU
+    quantize: bool = False  # opt-in: int8 changes audio quality
+    num_threads: int = 0  # 0 = torch default, or the pinned node's core count
+    interop_threads: int = 0
+    numa_pinning: bool = False
+    numa_node: int = -1  # -1 = worker index modulo node count
+
+@dataclass
+class GenerationConfig:
+    enabled: bool = True
+    tokens_per_char: float = 3.0  # mel-token budget per input character
+    min_new_tokens: int = 60  # budget floor for very short inputs
+    language_tokens_per_char: Dict[str, float] = field(
+        default_factory=lambda: {"zh-cn": 10.0, "ja": 8.0, "ko": 6.0}
+    )
+    stop_threshold: float = 0.6  # force the stop token once its probability reaches this, 0 = off
+    max_retries: int = 1  # retries for generations that exhaust their budget
+    retry_temperature_scale: float = 0.7
+
+@dataclass
+class PlacementConfig:
+    # engine (xtts, vixtts, indic, kokoro) -> devices, one replica per entry;
+    # unlisted engines get a single replica on the default device
+    engines: Dict[str, List[str]] = field(default_factory=dict)
+
+@dataclass
+class FallbackConfig:
+    enabled: bool = True
+    # Reroute when the primary engine's expected queue wait exceeds this
+    latency_budget_seconds: float = 10.0
+    # Primary voice_id -> voice_id on another engine, used when the primary
+    # is over its latency budget, its breaker is open or it fails
+    voices: Dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class DeadlineConfig:
+    # Synthesis requests are abandoned after this long (0 = no deadline)
+    default_seconds: float = 120.0
+    # Upper bound for a deadline_seconds sent by the client
+    max_seconds: float = 600.0
+
+@dataclass
+class SchedulerConfig:
+    enabled: bool = True
+    # Credit (estimated seconds of synthesis) a session earns per round
+    quantum_seconds: float = 1.0
+    # Starting seconds-per-character estimate per engine, refined from
+    # observed request times with this smoothing factor
+    seconds_per_char: Dict[str, float] = field(default_factory=lambda: {
+        "xtts": 0.05, "vixtts": 0.05, "indic": 0.08, "kokoro": 0.005
+    })
+    rate_alpha: float = 0.2
+    # engine -> concurrent requests; defaults to one per replica
+    # (max_batch_size per replica for XTTS with continuous batching)
+    concurrency: Dict[str, int] = field(default_factory=dict)
+
+@dataclass
+class LatencyConfig:
+    # Weight each older sample keeps per new one (0.98 ~ the last 50 requests)
+    decay: float = 0.98
+    # Decayed samples before a voice's own fit replaces its engine's
+    min_voice_samples: float = 5.0
+    # Load-test results the estimator starts from; relative to src/, "" = none
+    seed_results_dir: str = "../test_results"
+    seed_weight: float = 0.2
+
+@dataclass
+class AdmissionConfig:
+    enabled: bool = True
+    # priority -> longest predicted queue wait accepted (0 = no limit);
+    # requests over it get 503 with Retry-After (or their fallback voice)
+    max_queue_seconds: Dict[str, float] = field(default_factory=lambda: {"interactive": 30.0, "bulk": 0.0})
+    # Reject a queued request at once when it is predicted to miss its deadline
+    reject_past_deadline: bool = True
+
+@dataclass
+class BatchConfig:
+    # Job outputs go to <output_dir>/<job id>; relative to src/ unless absolute
+    output_dir: str = "batch_output"
+    # Requests in flight per engine, 0 = twice the engine's scheduler capacity
+    concurrency: int = 0
+    max_items: int = 100000
+
+@dataclass
+class RealtimeConfig:
+    # Typing sessions without an update for this long are dropped
+    session_idle_seconds: float = 1800.0
+
+@dataclass
+class StartupConfig:
+    # Local engines to load; the others are never imported and their voices are not offered
+    engines: List[str] = field(default_factory=lambda: ["xtts", "vixtts", "indic", "kokoro"])
+    # Engines load concurrently in this many threads (1 = one after another)
+    max_workers: int = 4
+    # Serve HTTP while engines load; requests for loading engines are rejected or rerouted
+    background: bool = True
+    # How long a request for a still-loading engine waits for it (0 = reject at once)
+    wait_for_engine_seconds: float = 0.0
+    # Retry-After sent when an engine is still loading
+    loading_retry_after_seconds: float = 10.0
+
+@dataclass
+class WarmupConfig:
+    # Synthetic requests per engine and language before an engine is marked ready
+    enabled: bool = True
+    runs: int = 2  # per language; the first pays the cold cost, later ones show warm latency
+    languages_per_engine: int = 0  # 0 = every language the engine offers
+    # Concurrent warmup requests per size, when continuous batching is on
+    batch_sizes: List[int] = field(default_factory=lambda: [2, 4, 8])
+    text: str = "Hello, this is a short warmup sentence."
+    texts: Dict[str, str] = field(default_factory=dict)  # language name -> text
+
+@dataclass
+class WeightCacheConfig:
+    # Convert checkpoints to safetensors once and memory-map them on later loads
+    enabled: bool = True
+    # Relative to src/ unless absolute
+    cache_dir: str = "weight_cache"
+
+@dataclass
+class RecoveryConfig:
+    # Consecutive CUDA failures that open an engine's circuit breaker
+    failure_threshold: int = 1
+    # How long an open breaker refuses requests before letting a probe through
+    open_seconds: float = 30.0
+    # Minimum seconds between rebuilds of the same engine
+    cooldown_seconds: float = 60.0
+
+@dataclass
+class WorkerConfig:
+    # Run engines in their own processes; audio comes back through shared memory
+    enabled: bool = False
+    engines: List[str] = field(default_factory=lambda: ["xtts", "vixtts", "indic", "kokoro"])
+    start_timeout_seconds: float = 900.0
+    request_timeout_seconds: float = 300.0
+    max_restarts: int = 3
+    buffer_mb: int = 16
+
 @dataclass
 class ModelConfig:
     xtts_base_model: str
@@ -21,6 +199,7 @@ class ModelConfig:
 class DirectoryConfig:
     audio_output_dir: str
     vietnamese_model_dir: str
+    audio_bucket_minutes: int = 10
 
 @dataclass
 class PathConfig:
@@ -47,6 +226,24 @@ class AppConfig:
     reference_audio_paths: ReferenceAudioConfig
     kokoro_speed: float
     cleanup: CleanupConfig
+    audio_serving: AudioServingConfig = field(default_factory=AudioServingConfig)
+    inference: InferenceConfig = field(default_factory=InferenceConfig)
+    kokoro: KokoroConfig = field(default_factory=KokoroConfig)
+    cpu_profile: CpuProfileConfig = field(default_factory=CpuProfileConfig)
+    generation: GenerationConfig = field(default_factory=GenerationConfig)
+    placement: PlacementConfig = field(default_factory=PlacementConfig)
+    workers: WorkerConfig = field(default_factory=WorkerConfig)
+    recovery: RecoveryConfig = field(default_factory=RecoveryConfig)
+    fallback: FallbackConfig = field(default_factory=FallbackConfig)
+    weight_cache: WeightCacheConfig = field(default_factory=WeightCacheConfig)
+    startup: StartupConfig = field(default_factory=StartupConfig)
+    warmup: WarmupConfig = field(default_factory=WarmupConfig)
+    realtime: RealtimeConfig = field(default_factory=RealtimeConfig)
+    deadlines: DeadlineConfig = field(default_factory=DeadlineConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
+    latency: LatencyConfig = field(default_factory=LatencyConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
 
 class ConfigLoader:
     @staticmethod
@@ -61,8 +258,25 @@ class ConfigLoader:
             flask=FlaskConfig(**config_dict['flask']),
             reference_audio_paths=ReferenceAudioConfig(**config_dict['reference_audio_paths']),
             kokoro_speed=config_dict['kokoro_speed'],
-            cleanup=CleanupConfig(**config_dict.get('cleanup', {}))  # Use defaults if not specified
-        
+            cleanup=CleanupConfig(**config_dict.get('cleanup', {})),  # Use defaults if not specified
+            audio_serving=AudioServingConfig(**config_dict.get('audio_serving', {})),
+            inference=InferenceConfig(**config_dict.get('inference', {})),
+            kokoro=KokoroConfig(**config_dict.get('kokoro', {})),
+            cpu_profile=CpuProfileConfig(**config_dict.get('cpu_profile', {})),
+            generation=GenerationConfig(**config_dict.get('generation', {})),
+            placement=PlacementConfig(**config_dict.get('placement', {})),
+            workers=WorkerConfig(**config_dict.get('workers', {})),
+            recovery=RecoveryConfig(**config_dict.get('recovery', {})),
+            fallback=FallbackConfig(**config_dict.get('fallback', {})),
+            weight_cache=WeightCacheConfig(**config_dict.get('weight_cache', {})),
+            startup=StartupConfig(**config_dict.get('startup', {})),
+            warmup=WarmupConfig(**config_dict.get('warmup', {})),
+            realtime=RealtimeConfig(**config_dict.get('realtime', {})),
+            deadlines=DeadlineConfig(**config_dict.get('deadlines', {})),
+            scheduler=SchedulerConfig(**config_dict.get('scheduler', {})),
+            batch=BatchConfig(**config_dict.get('batch', {})),
+            latency=LatencyConfig(**config_dict.get('latency', {})),
+            admission=AdmissionConfig(**config_dict.get('admission', {}))
         )
 
     @staticmethod
@@ -0,0 +1,102 @@
+# src/core/audio_storage.py
+import os
+import re
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import numpy as np
+import soundfile as sf
+from werkzeug.utils import secure_filename
+
+BUCKET_FORMAT = "%Y%m%d%H%M"
+BUCKET_PATTERN = re.compile(r"^\d{12}$")
+
+class AudioStorage:
+    """
+    Time-bucketed layout for generated audio files.
+
+    Files are written to <root>/<bucket>/<filename>, where the bucket is the
+    UTC start time of a fixed-length window (e.g. 202502131420). Lookups
+    resolve a relative path directly, and cleanup can drop a whole bucket
+    directory once its window is older than the retention period.
+    """
+
+    def __init__(self, root: str, bucket_minutes: int = 10):
+        self.root = Path(root)
+        self.bucket_seconds = max(1, int(bucket_minutes * 60))
+        self.logger = logging.getLogger(__name__)
+        self._known_buckets = set()
+        self._lock = threading.Lock()
+
+    def bucket_for(self, timestamp: float) -> str:
+        """Get the bucket name for a timestamp"""
+        start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        return datetime.fromtimestamp(start, tz=timezone.utc).strftime(BUCKET_FORMAT)
+
+    def bucket_end(self, bucket: str) -> float:
+        """Get the timestamp at which a bucket stops receiving files"""
+        start = datetime.strptime(bucket, BUCKET_FORMAT).replace(tzinfo=timezone.utc)
+        return start.timestamp() + self.bucket_seconds
+
+    def _ensure_bucket(self, bucket: str) -> Path:
+        """Create a bucket directory once per process"""
+        path = self.root / bucket
+        if bucket not in self._known_buckets:
+            path.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._known_buckets.add(bucket)
+        return path
+
+    def new_output_path(self, session_id: str, timestamp: Optional[float] = None) -> Tuple[str, Path]:
+        """
+        Allocate the path for a new audio file.
+
+        Returns:
+            (relative filename used in /audio/<path> URLs, absolute path)
+        """
+        now = time.time() if timestamp is None else timestamp
+        bucket = self.bucket_for(now)
+        filename = f"realtime_{session_id}_{int(now * 10000000)}.wav"
+        return f"{bucket}/{filename}", self._ensure_bucket(bucket) / filename
+
+    @staticmethod
+    def write(path: Path, audio: np.ndarray, sample_rate: int, subtype: Optional[str] = None) -> None:
+        """Write audio samples as a WAV file (PCM_16 unless subtype says otherwise)"""
+        sf.write(str(path), audio, sample_rate, subtype=subtype)
+
+    def resolve(self, relative_path: str) -> Optional[Path]:
+        """
+        Map a relative filename back to its absolute path without scanning.
+        Returns None for anything that is not <bucket>/<file> or a legacy
+        flat <file> name.
+        """
+        parts = relative_path.strip("/").split("/")
+        filename = parts[-1]
+        if not filename or secure_filename(filename) != filename:
+            return None
+        if len(parts) == 1:
+            return self.root / filename
+        if len(parts) == 2 and BUCKET_PATTERN.match(parts[0]):
+            return self.root / parts[0] / filename
+        return None
+
+    def expired_buckets(self, cutoff: float) -> List[Path]:
+        """List bucket directories whose whole window ended before cutoff"""
+        if not self.root.exists():
+            return []
+        expired = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.is_dir() or not BUCKET_PATTERN.match(entry.name):
+                    continue
+                if self.bucket_end(entry.name) <= cutoff:
+                    expired.append(Path(entry.path))
+        return expired
+
+    def forget_bucket(self, bucket: str) -> None:
+        """Drop a removed bucket from the created-directory cache"""
+        with self._lock:
+            self._known_buckets.discard(bucket)
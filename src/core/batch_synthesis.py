@@ -0,0 +1,296 @@
+# src/core/batch_synthesis.py
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.cancellation import CancellationToken
+from core.error_handlers import RequestCancelledError
+from core.scheduler import BULK
+
+logger = logging.getLogger(__name__)
+
+# Item and job ids become file and directory names
+SAFE_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$')
+
+RESULTS_FILE = "results.jsonl"
+SUMMARY_FILE = "manifest.json"
+
+@dataclass
+class BatchItem:
+    id: str
+    text: str
+    voice_id: str
+
+def parse_manifest(lines: Iterable[str], max_items: int = 0) -> List[BatchItem]:
+    """
+    Items of a JSONL manifest: one {"id", "text", "voice_id"} object per
+    line; id defaults to the line number. Raises ValueError for malformed
+    lines, unsafe or duplicate ids and manifests over max_items.
+    """
+    items = []
+    seen = set()
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Manifest line {number} is not valid JSON: {e}")
+        if not isinstance(entry, dict) or not entry.get("text") or not entry.get("voice_id"):
+            raise ValueError(f"Manifest line {number} needs text and voice_id")
+        item_id = str(entry.get("id", number))
+        if not SAFE_ID.match(item_id):
+            raise ValueError(f"Manifest line {number}: id {item_id!r} is not a safe file name")
+        if item_id in seen:
+            raise ValueError(f"Manifest line {number}: duplicate id {item_id!r}")
+        seen.add(item_id)
+        items.append(BatchItem(item_id, entry["text"], entry["voice_id"]))
+        if max_items and len(items) > max_items:
+            raise ValueError(f"Manifest has more than {max_items} items")
+    if not items:
+        raise ValueError("Manifest has no items")
+    return items
+
+class BatchJob:
+    """
+    Renders a manifest into output_dir/<item id>.<ext>.
+
+    Items are grouped by engine and, within an engine, ordered by voice so
+    a voice's conditioning is reused across consecutive requests. Every
+    engine gets enough concurrent requests to keep all its replicas (and
+    batch slots) busy, at bulk priority so interactive traffic still goes
+    first. Each finished item is appended to results.jsonl, which doubles
+    as the checkpoint: running the same job again skips items already
+    rendered and retries the failed ones.
+    """
+
+    def __init__(self, job_id: str, items: List[BatchItem], output_dir: Path, tts_manager,
+                 concurrency: int = 0, archive: bool = False):
+        """
+        Args:
+            concurrency: Requests in flight per engine, 0 = twice the engine's scheduler capacity
+            archive: Also pack the outputs and results into output_dir.zip
+        """
+        self.job_id = job_id
+        self.items = items
+        self.output_dir = Path(output_dir)
+        self.tts_manager = tts_manager
+        self.concurrency = concurrency
+        self.archive = archive
+        self.token = CancellationToken()
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.counts = {"total": len(items), "done": 0, "failed": 0, "skipped": 0}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._results: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def archive_path(self) -> Path:
+        # Not with_suffix: job ids may contain dots ("v1.2" and "v1.3" would share "v1.zip")
+        return self.output_dir.with_name(self.output_dir.name + ".zip")
+
+    def _load_checkpoint(self) -> Dict[str, Dict]:
+        """Results of an earlier run whose audio is still in place"""
+        path = self.output_dir / RESULTS_FILE
+        if not path.exists():
+            return {}
+        done = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut off by the crash we are resuming from
+                    continue
+                if result.get("status") == "ok" and (self.output_dir / result["file"]).exists():
+                    done[result["id"]] = result
+        return done
+
+    def run(self):
+        """Render every item not yet rendered; blocks until the job finishes or is cancelled"""
+        self.started_at = time.time()
+        self.state = "running"
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._results = self._load_checkpoint()
+            pending = [item for item in self.items if item.id not in self._results]
+            self.counts["skipped"] = len(self.items) - len(pending)
+
+            groups: Dict[str, List[BatchItem]] = {}
+            for item in sorted(pending, key=lambda item: item.voice_id):
+                groups.setdefault(self.tts_manager.engine_for_voice(item.voice_id), []).append(item)
+
+            with open(self.output_dir / RESULTS_FILE, "a", encoding="utf-8") as checkpoint:
+                # Engines run side by side, each with its own request window
+                executors = [
+                    ThreadPoolExecutor(max_workers=self._engine_concurrency(engine),
+                                       thread_name_prefix=f"batch-{engine}")
+                    for engine in groups
+                ]
+                try:
+                    futures = [
+                        executor.submit(self._render, item, checkpoint)
+                        for executor, group in zip(executors, groups.values())
+                        for item in group
+                    ]
+                    wait(futures)
+                except BaseException:
+                    # Interrupted (Ctrl-C): stop the remaining items instead of waiting for them
+                    self.token.cancel()
+                    raise
+                finally:
+                    for executor in executors:
+                        executor.shutdown(wait=True)
+
+            self._write_results()
+            if self.archive:
+                self._write_archive()
+            self.state = "cancelled" if self.token.cancelled else "completed"
+        except KeyboardInterrupt:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Batch {self.job_id} failed: {e}")
+            self.state = "failed"
+            self.error = str(e)
+            raise
+        finally:
+            self.finished_at = time.time()
+            logger.info(f"Batch {self.job_id} {self.state}: {self.counts}")
+
+    def _engine_concurrency(self, engine: str) -> int:
+        if self.concurrency > 0:
+            return self.concurrency
+        # Two per slot, so the next request is already queued when one finishes
+        return 2 * self.tts_manager.scheduler.capacity(engine)
+
+    def _render(self, item: BatchItem, checkpoint):
+        if self.token.cancelled:
+            return
+        start_time = time.time()
+        result = {"id": item.id, "voice_id": item.voice_id}
+        try:
+            filename = self.tts_manager.synthesize_speech(
+                item.text, item.voice_id, f"batch-{self.job_id}", self.token,
+                priority=BULK, flow=f"batch:{self.job_id}"
+            )
+            source = self.tts_manager.storage.resolve(filename) if filename else None
+            if source is None:
+                raise RuntimeError("Engine produced no audio")
+            target = f"{item.id}{source.suffix}"
+            shutil.move(str(source), str(self.output_dir / target))
+            # synthesize_speech indexed it for cleanup; it no longer lives in the audio directory
+            self.tts_manager.cleanup_service.forget(source)
+            result.update(status="ok", file=target)
+        except RequestCancelledError:
+            # The job was cancelled; the item is left for a resumed run
+            return
+        except Exception as e:
+            logger.warning(f"Batch {self.job_id} item {item.id} failed: {e}")
+            result.update(status="failed", error=str(e))
+        result["seconds"] = round(time.time() - start_time, 3)
+
+        with self._lock:
+            self._results[item.id] = result
+            self.counts["done" if result["status"] == "ok" else "failed"] += 1
+            checkpoint.write(json.dumps(result, ensure_ascii=False) + "\n")
+            checkpoint.flush()
+
+    def _write_results(self):
+        """Rewrite the checkpoint in manifest order and add the job summary"""
+        path = self.output_dir / RESULTS_FILE
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for item in self.items:
+                if item.id in self._results:
+                    f.write(json.dumps(self._results[item.id], ensure_ascii=False) + "\n")
+        os.replace(temp_path, path)
+        with open(self.output_dir / SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.get_status(), f, indent=2)
+
+    def _write_archive(self):
+        temp_path = self.archive_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as archive:
+            for result in self._results.values():
+                if result["status"] == "ok":
+                    archive.write(self.output_dir / result["file"], result["file"])
+            archive.write(self.output_dir / RESULTS_FILE, RESULTS_FILE)
+            archive.write(self.output_dir / SUMMARY_FILE, SUMMARY_FILE)
+        os.replace(temp_path, self.archive_path)
+
+    def cancel(self):
+        """Stop the job; items in flight stop at their next checkpoint"""
+        self.token.cancel()
+
+    def get_status(self) -> Dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "error": self.error,
+            **self.counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(self.counts["done"] / elapsed, 3) if elapsed else 0.0,
+            "output_dir": str(self.output_dir),
+            "archive": str(self.archive_path) if self.archive and self.state == "completed" else None
+        }
+
+class BatchJobStore:
+    """Batch jobs submitted over the API, each rendered in a background thread"""
+
+    def __init__(self, tts_manager, config, base_dir: Path):
+        """
+        Args:
+            config: BatchConfig
+            base_dir: Directory a relative config.output_dir is resolved against
+        """
+        self.tts_manager = tts_manager
+        self.config = config
+        output_dir = Path(config.output_dir)
+        self.output_dir = output_dir if output_dir.is_absolute() else Path(base_dir) / output_dir
+        self._jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, items: List[BatchItem], job_id: Optional[str] = None, archive: bool = False) -> BatchJob:
+        """
+        Start a job. Passing the id of an earlier job resumes it from its
+        checkpoint. Raises ValueError for an unsafe id or a job still running.
+        """
+        job_id = job_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        if not SAFE_ID.match(job_id):
+            raise ValueError(f"Job id {job_id!r} is not a safe directory name")
+        with self._lock:
+            existing = self._jobs.get(job_id)
+            if existing is not None and existing.state in ("pending", "running"):
+                raise ValueError(f"Batch {job_id} is still running")
+            job = BatchJob(job_id, items, self.output_dir / job_id, self.tts_manager,
+                           self.config.concurrency, archive)
+            self._jobs[job_id] = job
+        thread = threading.Thread(target=self._run, args=(job,), name=f"batch-{job_id}", daemon=True)
+        thread.start()
+        return job
+
+    @staticmethod
+    def _run(job: BatchJob):
+        try:
+            job.run()
+        except Exception:
+            # Already logged and recorded on the job
+            pass
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
@@ -0,0 +1,99 @@
+# src/core/cancellation.py
+import time
+import threading
+import contextlib
+import contextvars
+from typing import Optional
+
+from core.error_handlers import RequestCancelledError
+
+class CancellationToken:
+    """
+    Cancellation flag and optional deadline for one request.
+
+    A token is cancelled when cancel() is called on it or on its parent,
+    when its deadline passes, or when the optional shared flag (a
+    multiprocessing Event, so a worker process can see cancellations made
+    by the manager) is set. Engines poll it at their checkpoints; nothing
+    is interrupted preemptively.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, parent: Optional["CancellationToken"] = None,
+                 flag=None):
+        """
+        Args:
+            deadline: time.monotonic() value after which the request is abandoned
+            parent: Token whose cancellation (and deadline) this one inherits
+            flag: Event-like object; the token counts as cancelled while it is set
+        """
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+        self.deadline = deadline
+        self.parent = parent
+        self.flag = flag
+        self._reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def with_timeout(cls, seconds: Optional[float], parent: Optional["CancellationToken"] = None) -> "CancellationToken":
+        """Token that expires seconds from now; no deadline for None or <= 0"""
+        deadline = time.monotonic() + seconds if seconds and seconds > 0 else None
+        return cls(deadline=deadline, parent=parent)
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._reason is None:
+                self._reason = reason
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Why the token is cancelled (cancelled, superseded, deadline, ...), or None"""
+        if self._reason is not None:
+            return self._reason
+        if self.parent is not None and self.parent.reason is not None:
+            return self.parent.reason
+        if self.flag is not None and self.flag.is_set():
+            return "cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """Raise RequestCancelledError if the request should stop now"""
+        reason = self.reason
+        if reason is not None:
+            message = "Request deadline exceeded" if reason == "deadline" else f"Request {reason}"
+            raise RequestCancelledError(message, reason=reason)
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "cancellation_token", default=None
+)
+
+def current_token() -> Optional[CancellationToken]:
+    """Token of the request the calling thread is serving, if any"""
+    return _current_token.get()
+
+def check_cancelled():
+    """Checkpoint for engines: raises RequestCancelledError when the current request was abandoned"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+@contextlib.contextmanager
+def bind_token(token: Optional[CancellationToken]):
+    """Make token the current request's token for the calling thread"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
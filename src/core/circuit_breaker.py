@@ -0,0 +1,114 @@
+# src/core/circuit_breaker.py
+import time
+import logging
+import threading
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Per-engine circuit breaker.
+
+    closed: requests flow; failure_threshold consecutive failures open it.
+    open: requests are refused (fast-fail or reroute) for open_seconds.
+    half_open: one probe request is let through; success closes the
+    breaker, failure opens it again.
+
+    A successful rebuild of the engine closes the breaker via reset().
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 1, open_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name: Engine name, for logging
+            failure_threshold: Consecutive failures that open the breaker
+            open_seconds: How long an open breaker refuses requests before probing
+            clock: Time source (monotonic seconds)
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Whether a request may go to the engine now; claims the probe slot when half open"""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Give back a claimed probe slot without a verdict (the request never reached the engine)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        if self._state != OPEN:
+            self.times_opened += 1
+            logger.warning(f"{self.name} circuit opened after {self._failures} failures")
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def reset(self):
+        """Close the breaker after the engine was rebuilt"""
+        self.record_success()
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "retry_after": max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+                if self._state == OPEN else 0.0
+            }
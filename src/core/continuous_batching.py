@@ -0,0 +1,404 @@
+# src/core/continuous_batching.py
+import math
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import torch
+import torch.nn.functional as F
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BatchRequest:
+    """One sequence to decode; prefix_emb is the (1, prefix_len, dim) conditioning prefix"""
+    prefix_emb: torch.Tensor
+    start_token: int
+    stop_token: int
+    max_new_tokens: int
+    temperature: float = 1.0
+    top_k: int = 0
+    top_p: float = 1.0
+    repetition_penalty: float = 1.0
+    do_sample: bool = True
+    logits_processor: Optional[Callable] = None  # HF-style (input_ids, scores) -> scores
+    payload: Any = None
+    future: Future = field(default_factory=Future)
+    tokens: List[int] = field(default_factory=list)
+    latents: List[torch.Tensor] = field(default_factory=list)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+
+    @property
+    def prefix_len(self) -> int:
+        return self.prefix_emb.shape[1]
+
+@dataclass
+class GenerationResult:
+    """Completed sequence handed to the vocoder stage"""
+    codes: torch.Tensor  # (1, num_tokens), includes the stop token when one was produced
+    latents: torch.Tensor  # (1, num_tokens, dim), final-normed hidden state of each input token
+    payload: Any
+    stopped: bool
+    queue_time: float
+    decode_time: float
+
+class ContinuousBatcher:
+    """
+    Iteration-level scheduler for the XTTS GPT stage.
+
+    Every active request owns one slot of a preallocated key/value buffer.
+    Between decode steps waiting requests are prefilled into free slots and
+    finished ones leave, so short requests never wait for the longest one in
+    the batch. Active slots are kept contiguous (a finished slot is filled
+    by the last one) and a single batched step decodes one token for all of
+    them, masking each slot to its own length and using its own mel
+    position. Completed sequences go to the vocoder callable on a separate
+    thread, whose return value resolves the request's future.
+    """
+
+    def __init__(self,
+                 model,
+                 max_batch_size: int = 8,
+                 max_seq_len: Optional[int] = None,
+                 vocoder: Optional[Callable[[GenerationResult], Any]] = None,
+                 device: Optional[str] = None):
+        """
+        Args:
+            model: GPT2InferenceModel (transformer, embeddings, pos_embedding.emb, lm_head)
+            max_batch_size: Number of decode slots
+            max_seq_len: Prefix + generated tokens per slot; defaults to n_positions
+            vocoder: Optional callable turning a GenerationResult into the request's result
+            device: Device for the KV buffers; defaults to the model's device
+        """
+        self.model = model
+        self.gpt = model.transformer
+        self.max_batch_size = max_batch_size
+        self.max_seq_len = max_seq_len or model.config.n_positions
+        self.vocoder = vocoder
+        self.logger = logging.getLogger(__name__)
+
+        weight = model.embeddings.weight
+        self.device = torch.device(device) if device is not None else weight.device
+        attn = self.gpt.h[0].attn
+        self.num_heads = attn.num_heads
+        self.head_dim = attn.head_dim
+        shape = (max_batch_size, self.num_heads, self.max_seq_len, self.head_dim)
+        self.keys = [torch.zeros(shape, device=self.device, dtype=weight.dtype) for _ in self.gpt.h]
+        self.values = [torch.zeros(shape, device=self.device, dtype=weight.dtype) for _ in self.gpt.h]
+        self.slot_positions = torch.arange(self.max_seq_len, device=self.device)
+
+        self.active: List[BatchRequest] = []
+        self.lengths: List[int] = []
+        self.waiting: Deque[BatchRequest] = deque()
+        self.condition = threading.Condition()
+        self.is_running = False
+        self.worker_thread: Optional[threading.Thread] = None
+        self.vocoder_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vocoder")
+        self.stats: Dict = {
+            "steps": 0,
+            "tokens": 0,
+            "completed": 0,
+            "failed": 0
+        }
+
+    def submit(self, prefix_emb: torch.Tensor, start_token: int, stop_token: int,
+               max_new_tokens: int, **sampling) -> Future:
+        """
+        Queue a sequence for decoding. sampling accepts temperature, top_k,
+        top_p, repetition_penalty, do_sample, logits_processor and payload
+        (passed through to the vocoder). Returns a Future with the vocoder output, or the
+        GenerationResult when no vocoder is set.
+        """
+        if prefix_emb.dim() == 4:
+            prefix_emb = prefix_emb.squeeze(1)
+        if prefix_emb.shape[1] + 1 >= self.max_seq_len:
+            raise ValueError(f"Prefix of {prefix_emb.shape[1]} tokens does not fit in {self.max_seq_len} positions")
+        request = BatchRequest(
+            prefix_emb=prefix_emb.to(self.device),
+            start_token=start_token,
+            stop_token=stop_token,
+            max_new_tokens=max_new_tokens,
+            **sampling
+        )
+        with self.condition:
+            self.waiting.append(request)
+            self.condition.notify()
+        return request.future
+
+    def start(self):
+        """Run the scheduling loop on a background thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.worker_thread = threading.Thread(target=self._run_loop, daemon=True, name="continuous-batcher")
+        self.worker_thread.start()
+
+    def stop(self):
+        self.is_running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.worker_thread:
+            self.worker_thread.join(timeout=5)
+        self.vocoder_executor.shutdown(wait=True)
+
+    def is_alive(self) -> bool:
+        """Whether the background loop is still decoding submitted requests"""
+        return self.worker_thread is not None and self.worker_thread.is_alive()
+
+    def _run_loop(self):
+        try:
+            while self.is_running:
+                with self.condition:
+                    while self.is_running and not self.waiting and not self.active:
+                        self.condition.wait()
+                if not self.is_running:
+                    break
+                self.step()
+        finally:
+            # Nothing decodes after this: fail what is left instead of leaving callers waiting
+            error = RuntimeError("Continuous batcher stopped")
+            with self.condition:
+                waiting = list(self.waiting)
+                self.waiting.clear()
+            for request in waiting:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            self._fail_all(error)
+
+    def run_until_idle(self):
+        """Drive the scheduler from the calling thread until all queued work is decoded"""
+        while self.waiting or self.active:
+            self.step()
+
+    @torch.inference_mode()
+    def step(self) -> int:
+        """One scheduling iteration: admit, decode one token for every slot, retire. Returns active count"""
+        try:
+            self._admit()
+            # Requests can finish on their prefill token
+            self._retire()
+            if self.active:
+                self._decode_step()
+                self._retire()
+        except Exception as e:
+            self.logger.error(f"Continuous batching step failed: {e}")
+            self._fail_all(e)
+        return len(self.active)
+
+    def _admit(self):
+        """Prefill waiting requests into free slots"""
+        while len(self.active) < self.max_batch_size:
+            with self.condition:
+                if not self.waiting:
+                    return
+                request = self.waiting.popleft()
+            if request.future.cancelled():
+                continue
+            try:
+                self._prefill(request, len(self.active))
+            except Exception as e:
+                self.stats["failed"] += 1
+                request.future.set_exception(e)
+
+    def _mel_embedding(self, tokens: torch.Tensor, mel_positions: torch.Tensor) -> torch.Tensor:
+        return self.model.embeddings(tokens) + self.model.pos_embedding.emb(mel_positions)
+
+    def _attention(self, block, layer: int, hidden_states: torch.Tensor, rows: torch.Tensor,
+                   positions: torch.Tensor, attn_mask: Optional[torch.Tensor], span: int):
+        """Self-attention for one block, writing the new key/values at (rows, positions)"""
+        attn = block.attn
+        batch_size, seq_len, _ = hidden_states.shape
+        query, key, value = attn.c_attn(block.ln_1(hidden_states)).split(attn.split_size, dim=2)
+        query = query.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        key = key.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        value = value.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+
+        if seq_len == 1:
+            self.keys[layer][rows, :, positions] = key[:, :, 0]
+            self.values[layer][rows, :, positions] = value[:, :, 0]
+        else:
+            self.keys[layer][rows, :, positions] = key[0].transpose(0, 1)
+            self.values[layer][rows, :, positions] = value[0].transpose(0, 1)
+        first, last = int(rows[0]), int(rows[-1]) + 1
+        key = self.keys[layer][first:last, :, :span]
+        value = self.values[layer][first:last, :, :span]
+
+        scale = 1.0 / math.sqrt(self.head_dim) if attn.scale_attn_weights else 1.0
+        if attn.scale_attn_by_inverse_layer_idx:
+            scale /= float(layer + 1)
+        attn_output = F.scaled_dot_product_attention(
+            query, key, value, attn_mask=attn_mask, is_causal=attn_mask is None, scale=scale
+        )
+        attn_output = attn_output.transpose(1, 2).reshape(batch_size, seq_len, attn.embed_dim)
+        return attn.resid_dropout(attn.c_proj(attn_output))
+
+    def _run_blocks(self, emb, rows, positions, attn_mask, span):
+        hidden_states = self.gpt.drop(emb + self.gpt.wpe(positions.view(emb.shape[0], -1)))
+        for layer, block in enumerate(self.gpt.h):
+            hidden_states = hidden_states + self._attention(
+                block, layer, hidden_states, rows, positions, attn_mask, span
+            )
+            hidden_states = hidden_states + block.mlp(block.ln_2(hidden_states))
+        return self.gpt.ln_f(hidden_states)
+
+    def _project(self, hidden_states: torch.Tensor):
+        """Final norm (the latent handed to the vocoder) and logits"""
+        norm, linear = self.model.lm_head[0], self.model.lm_head[1]
+        latents = norm(hidden_states)
+        return latents, linear(latents)
+
+    def _prefill(self, request: BatchRequest, slot: int):
+        """Run prefix + start token for a new request into the given slot"""
+        request.started_at = time.time()
+        start = torch.tensor([[request.start_token]], device=self.device)
+        start_emb = self._mel_embedding(start, torch.zeros(1, dtype=torch.long, device=self.device))
+        emb = torch.cat([request.prefix_emb.to(start_emb.dtype), start_emb], dim=1)
+        seq_len = emb.shape[1]
+
+        positions = torch.arange(seq_len, device=self.device)
+        rows = torch.full((seq_len,), slot, device=self.device)
+        hidden_states = self._run_blocks(emb, rows, positions, None, seq_len)
+        latents, logits = self._project(hidden_states[:, -1])
+
+        self.active.append(request)
+        self.lengths.append(seq_len)
+        request.latents.append(latents[0])
+        request.tokens.append(self._sample(request, logits[0]))
+
+    def _decode_step(self):
+        """Decode one token for every active slot in a single batched forward pass"""
+        count = len(self.active)
+        lengths = torch.tensor(self.lengths, device=self.device)
+        prefix_lens = torch.tensor([r.prefix_len for r in self.active], device=self.device)
+        tokens = torch.tensor([[r.tokens[-1]] for r in self.active], device=self.device)
+
+        # Each slot sees its own filled part plus the token being written
+        span = max(self.lengths) + 1
+        attn_mask = (self.slot_positions[:span].unsqueeze(0) <= lengths.unsqueeze(1)).view(count, 1, 1, span)
+        emb = self._mel_embedding(tokens, (lengths - prefix_lens).unsqueeze(1))
+        rows = torch.arange(count, device=self.device)
+        hidden_states = self._run_blocks(emb, rows, lengths, attn_mask, span)
+        latents, logits = self._project(hidden_states[:, 0])
+
+        for index, request in enumerate(self.active):
+            self.lengths[index] += 1
+            request.latents.append(latents[index])
+            request.tokens.append(self._sample(request, logits[index]))
+
+        self.stats["steps"] += 1
+        self.stats["tokens"] += count
+
+    def _sample(self, request: BatchRequest, logits: torch.Tensor) -> int:
+        logits = logits.float()
+        if request.repetition_penalty != 1.0 and request.tokens:
+            seen = torch.tensor(request.tokens, device=logits.device)
+            score = logits.gather(0, seen)
+            score = torch.where(score < 0, score * request.repetition_penalty, score / request.repetition_penalty)
+            logits = logits.scatter(0, seen, score)
+        if request.logits_processor is not None:
+            input_ids = torch.tensor([request.tokens], device=logits.device)
+            logits = request.logits_processor(input_ids, logits.unsqueeze(0))[0]
+        if not request.do_sample or request.temperature <= 0:
+            return int(logits.argmax())
+
+        logits = logits / request.temperature
+        if request.top_k > 0:
+            threshold = torch.topk(logits, min(request.top_k, logits.shape[-1])).values[-1]
+            logits = logits.masked_fill(logits < threshold, float("-inf"))
+        if request.top_p < 1.0:
+            sorted_logits, sorted_indices = torch.sort(logits, descending=True)
+            cumulative = sorted_logits.softmax(-1).cumsum(-1)
+            remove = cumulative > request.top_p
+            remove[1:] = remove[:-1].clone()
+            remove[0] = False
+            logits = logits.masked_fill(remove.scatter(0, sorted_indices, remove), float("-inf"))
+        return int(torch.multinomial(logits.softmax(-1), 1))
+
+    def _is_finished(self, index: int) -> bool:
+        request = self.active[index]
+        return (
+            request.tokens[-1] == request.stop_token
+            or len(request.tokens) >= request.max_new_tokens
+            or self.lengths[index] + 1 >= self.max_seq_len
+            or request.future.cancelled()
+        )
+
+    def _retire(self):
+        """Hand finished requests to the vocoder and compact the active slots"""
+        index = 0
+        while index < len(self.active):
+            if not self._is_finished(index):
+                index += 1
+                continue
+            request = self.active[index]
+            last = len(self.active) - 1
+            if index != last:
+                # Move the last slot into the freed one so active slots stay contiguous
+                length = self.lengths[last]
+                for buffer in self.keys + self.values:
+                    buffer[index, :, :length] = buffer[last, :, :length]
+                self.active[index] = self.active[last]
+                self.lengths[index] = length
+            self.active.pop()
+            self.lengths.pop()
+            self._complete(request)
+
+    def _complete(self, request: BatchRequest):
+        if request.future.cancelled():
+            return
+        now = time.time()
+        result = GenerationResult(
+            codes=torch.tensor([request.tokens], device=self.device),
+            latents=torch.stack(request.latents).unsqueeze(0),
+            payload=request.payload,
+            stopped=request.tokens[-1] == request.stop_token,
+            queue_time=request.started_at - request.submitted_at,
+            decode_time=now - request.started_at
+        )
+        self.stats["completed"] += 1
+        if self.vocoder is None:
+            request.future.set_result(result)
+            return
+
+        def run_vocoder():
+            try:
+                request.future.set_result(self.vocoder(result))
+            except Exception as e:
+                self.logger.error(f"Vocoder stage failed: {e}")
+                request.future.set_exception(e)
+
+        self.vocoder_executor.submit(run_vocoder)
+
+    def _fail_all(self, error: Exception):
+        for request in self.active:
+            if not request.future.done():
+                request.future.set_exception(error)
+        self.stats["failed"] += len(self.active)
+        self.active.clear()
+        self.lengths.clear()
+
+    def get_status(self) -> Dict:
+        steps = self.stats["steps"]
+        return {
+            **self.stats,
+            "active": len(self.active),
+            "waiting": len(self.waiting),
+            # One token per active slot per step
+            "mean_batch_size": self.stats["tokens"] / steps if steps else 0.0
+        }
+
+def build_xtts_prefix(gpt, cond_latents: torch.Tensor, text_tokens: torch.Tensor) -> torch.Tensor:
+    """
+    Conditioning prefix for one XTTS request, built the same way as
+    GPT.compute_embeddings: conditioning latents followed by the text
+    tokens wrapped in start/stop text tokens, with text positions added.
+    """
+    text_inputs = F.pad(text_tokens, (0, 1), value=gpt.stop_text_token)
+    text_inputs = F.pad(text_inputs, (1, 0), value=gpt.start_text_token)
+    text_emb = gpt.text_embedding(text_inputs) + gpt.text_pos_embedding(text_inputs)
+    return torch.cat([cond_latents, text_emb], dim=1)
@@ -0,0 +1,117 @@
+# src/core/cpu_profile.py
+import os
+import sys
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import torch
+from torch import nn
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.model_optimizer import quantize_int8
+
+logger = logging.getLogger(__name__)
+
+NUMA_SYSFS_DIR = Path("/sys/devices/system/node")
+
+def is_cpu_device(device: str) -> bool:
+    return not str(device).startswith("cuda")
+
+def cpu_profile_active(config, device: str) -> bool:
+    """The CPU profile applies to every engine that ends up running on CPU"""
+    return config.cpu_profile.enabled and is_cpu_device(device)
+
+def select_precision(config, device: str) -> str:
+    """Precision for XTTS models, switching to int8 under the CPU profile"""
+    if cpu_profile_active(config, device) and config.cpu_profile.quantize:
+        return "int8"
+    return config.inference.precision
+
+def quantize_for_cpu(module: nn.Module, config, device: str, name: str) -> nn.Module:
+    """Dynamically quantize a module's linear layers when it runs under the CPU profile"""
+    if not (cpu_profile_active(config, device) and config.cpu_profile.quantize):
+        return module
+    try:
+        module = quantize_int8(module)
+        logger.info(f"Applied int8 dynamic quantization to {name}")
+    except Exception as e:
+        logger.warning(f"int8 quantization failed for {name}, keeping fp32: {e}")
+    return module
+
+def parse_cpulist(cpulist: str) -> List[int]:
+    """Parse a sysfs cpulist such as '0-3,8-11'"""
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+def numa_nodes() -> Dict[int, List[int]]:
+    """Map NUMA node id -> CPU ids, empty when the topology is unavailable"""
+    nodes = {}
+    if not NUMA_SYSFS_DIR.exists():
+        return nodes
+    for node_dir in sorted(NUMA_SYSFS_DIR.glob("node[0-9]*")):
+        try:
+            cpus = parse_cpulist((node_dir / "cpulist").read_text())
+        except OSError:
+            continue
+        if cpus:
+            nodes[int(node_dir.name[4:])] = cpus
+    return nodes
+
+def apply_cpu_profile(config, worker_index: Optional[int] = None) -> Dict:
+    """
+    Configure torch threading and NUMA pinning for this worker process.
+    Must run before any model is loaded, since torch fixes the interop
+    thread pool on first use.
+
+    Args:
+        config: AppConfig
+        worker_index: Index of this worker; defaults to the TTS_WORKER_INDEX env var
+    Returns:
+        Dict describing the applied settings
+    """
+    profile = config.cpu_profile
+    applied = {"numa_node": None, "cpus": None}
+    if not profile.enabled:
+        return applied
+
+    if worker_index is None:
+        worker_index = int(os.getenv("TTS_WORKER_INDEX", "0"))
+
+    if profile.numa_pinning and hasattr(os, "sched_setaffinity"):
+        nodes = numa_nodes()
+        if nodes:
+            node_ids = sorted(nodes)
+            node = profile.numa_node if profile.numa_node >= 0 else node_ids[worker_index % len(node_ids)]
+            cpus = nodes.get(node)
+            if cpus:
+                os.sched_setaffinity(0, cpus)
+                applied.update({"numa_node": node, "cpus": cpus})
+                logger.info(f"Worker {worker_index} pinned to NUMA node {node} ({len(cpus)} CPUs)")
+
+    num_threads = profile.num_threads
+    if num_threads <= 0 and applied["cpus"]:
+        # Use exactly the cores of the pinned node
+        num_threads = len(applied["cpus"])
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    if profile.interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(profile.interop_threads)
+        except RuntimeError as e:
+            logger.warning(f"Could not set interop threads (set too late?): {e}")
+
+    applied.update({
+        "num_threads": torch.get_num_threads(),
+        "interop_threads": torch.get_num_interop_threads()
+    })
+    logger.info(f"CPU profile applied: {applied}")
+    return applied
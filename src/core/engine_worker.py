@@ -0,0 +1,464 @@
+# src/core/engine_worker.py
+import os
+import sys
+import time
+import pickle
+import logging
+import importlib
+import itertools
+import threading
+import traceback
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.error_handlers import EngineWorkerError, RequestCancelledError
+from core.cancellation import CancellationToken, bind_token, current_token
+
+logger = logging.getLogger(__name__)
+
+_worker_ids = itertools.count()
+
+def _load_service_class(spec: str):
+    """Resolve a 'package.module:ClassName' spec"""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+class _SharedAudio:
+    """Worker-side view of the manager's shared-memory audio buffers"""
+
+    def __init__(self):
+        self.shm = None
+
+    def write(self, name: str, audio: np.ndarray) -> None:
+        if self.shm is None or self.shm.name != name:
+            if self.shm is not None:
+                self.shm.close()
+            self.shm = shared_memory.SharedMemory(name=name)
+        np.ndarray(audio.shape, dtype=audio.dtype, buffer=self.shm.buf)[...] = audio
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+def _worker_main(conn, service_spec: str, config, device: Optional[str], worker_index: int, cancel_event=None):
+    """
+    Worker process: build one service and answer synthesis requests from
+    the pipe. Audio goes back through the shared-memory buffer named in
+    each request; only its shape, dtype and timings cross the pipe.
+    The manager sets cancel_event to abandon the request in progress.
+    """
+    logging.basicConfig(level=logging.INFO)
+    shared = _SharedAudio()
+    try:
+        if config is not None:
+            from core.cpu_profile import apply_cpu_profile
+            apply_cpu_profile(config, worker_index=worker_index)
+        if device and str(device).startswith("cuda:"):
+            import torch
+            torch.cuda.set_device(torch.device(device))
+        service = _load_service_class(service_spec)(config, device=device)
+        conn.send(("ready", {
+            "pid": os.getpid(),
+            "device": getattr(service, "device", device),
+            "languages": service.get_supported_languages(),
+            "voices": service.get_voices(),
+            "audio_subtype": getattr(service, "audio_subtype", None),
+            "load_timings": getattr(service, "load_timings", {})
+        }))
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}", traceback.format_exc()))
+        return
+
+    pending = None
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "metrics":
+            metrics = {}
+            generation_control = getattr(service, "generation_control", None)
+            if generation_control is not None:
+                metrics["generation"] = generation_control.get_metrics()
+            batcher = getattr(service, "batcher", None)
+            if batcher is not None:
+                metrics["batching"] = batcher.get_status()
+            phoneme_cache = getattr(service, "phoneme_cache", None)
+            if phoneme_cache is not None:
+                metrics["phoneme_cache"] = phoneme_cache.get_status()
+            conn.send(("metrics", metrics))
+            continue
+
+        if kind == "synthesize":
+            _, request_id, text, voice_id, buffer_name, capacity, timeout = message
+            start_time = time.perf_counter()
+            token = CancellationToken.with_timeout(timeout)
+            token.flag = cancel_event
+            try:
+                with bind_token(token):
+                    audio, sample_rate = service.generate_audio(text, voice_id)
+                audio = np.ascontiguousarray(np.asarray(audio))
+            except Exception as e:
+                try:
+                    # Only send exceptions the manager can rebuild
+                    pickle.loads(pickle.dumps(e))
+                except Exception:
+                    e = EngineWorkerError(f"{type(e).__name__}: {e}", details={"traceback": traceback.format_exc()})
+                conn.send(("error", request_id, e))
+                continue
+            pending = (request_id, audio, sample_rate, time.perf_counter() - start_time)
+            if audio.nbytes > capacity:
+                # Ask the manager for a bigger buffer before writing
+                conn.send(("resize", request_id, audio.nbytes))
+                continue
+        elif kind == "write":
+            _, request_id, buffer_name = message
+            if pending is None or pending[0] != request_id:
+                conn.send(("error", request_id, EngineWorkerError("No pending audio to write")))
+                continue
+        else:
+            continue
+
+        request_id, audio, sample_rate, generate_time = pending
+        pending = None
+        copy_start = time.perf_counter()
+        shared.write(buffer_name, audio)
+        conn.send(("done", request_id, audio.shape, audio.dtype.str, sample_rate, {
+            "generate": generate_time,
+            "copy": time.perf_counter() - copy_start
+        }))
+
+    shared.close()
+    # Let the service flush state (e.g. the Kokoro phoneme cache) before the process exits
+    shutdown = getattr(service, "shutdown", None)
+    if shutdown is not None:
+        shutdown()
+
+class EngineWorker:
+    """
+    Manager-side handle for one engine replica running in its own process.
+
+    The worker process builds the service (placed on its device, with the
+    CPU profile applied) and serves one request at a time over a pipe.
+    Generated audio is not pickled back: the worker copies it into a
+    shared-memory buffer owned by this handle, and the handle writes the
+    WAV file (or copies the samples out) straight from that buffer. The
+    buffer is reused across requests and only grows when a clip does not
+    fit.
+
+    A worker that dies or hangs is replaced in the background without
+    touching any other engine; the request it was serving fails with
+    EngineWorkerError. After max_restarts consecutive failed restarts the
+    worker stays down until the manager rebuilds it.
+    """
+
+    def __init__(self,
+                 engine: str,
+                 service_spec: str,
+                 config=None,
+                 device: Optional[str] = None,
+                 storage=None,
+                 start_timeout: float = 900.0,
+                 request_timeout: float = 300.0,
+                 max_restarts: int = 3,
+                 buffer_bytes: int = 16 * 1024 * 1024):
+        """
+        Args:
+            engine: Engine name, for logging and errors
+            service_spec: 'module:ClassName' of the service to run
+            config: AppConfig passed to the service
+            device: Device the worker places the service on
+            storage: AudioStorage used by synthesize() to write files
+            start_timeout: Seconds to wait for the service to load
+            request_timeout: Seconds before a request is abandoned and the worker replaced
+            max_restarts: Consecutive restarts tried before giving up
+            buffer_bytes: Initial size of the shared audio buffer
+        """
+        self.engine = engine
+        self.service_spec = service_spec
+        self.config = config
+        self.device = device
+        self.storage = storage
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self.max_restarts = max_restarts
+        self.worker_index = next(_worker_ids)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._buffer = shared_memory.SharedMemory(create=True, size=max(1, buffer_bytes))
+        # Set to make the worker's engine checkpoints abandon the current request
+        self._cancel_event = self._context.Event()
+        self.process = None
+        self.conn = None
+        self.info: Dict = {}
+        self.state = "starting"
+        self.restarts = 0
+        self._failed_restarts = 0
+        self.requests = 0
+        self._ipc_overhead = deque(maxlen=1000)
+        self._metrics: Dict = {}
+
+        with self._lock:
+            self._start()
+
+    # Service interface
+
+    @property
+    def languages(self) -> List[str]:
+        return self.info.get("languages", [])
+
+    @property
+    def audio_subtype(self) -> Optional[str]:
+        return self.info.get("audio_subtype")
+
+    @property
+    def load_timings(self) -> Dict[str, float]:
+        return self.info.get("load_timings", {})
+
+    def get_supported_languages(self):
+        return self.languages
+
+    def get_voices(self):
+        return self.info.get("voices", {})
+
+    def generate_audio(self, text: str, voice_id: str) -> Tuple[np.ndarray, int]:
+        with self._lock:
+            shape, dtype, sample_rate = self._request(text, voice_id)
+            return self._view(shape, dtype).copy(), sample_rate
+
+    def synthesize(self, text: str, voice_id: str, session_id: str) -> str:
+        with self._lock:
+            shape, dtype, sample_rate = self._request(text, voice_id)
+            output_filename, output_path = self.storage.new_output_path(session_id)
+            # Written straight from shared memory, no intermediate copy
+            self.storage.write(output_path, self._view(shape, dtype), sample_rate, self.audio_subtype)
+            return output_filename
+
+    # Process management
+
+    def _start(self):
+        """Spawn the worker process and wait for its service to load. Caller holds the lock."""
+        self.state = "starting"
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.service_spec, self.config, self.device, self.worker_index, self._cancel_event),
+            name=f"tts-{self.engine}-{self.worker_index}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.process, self.conn = process, parent_conn
+
+        if not parent_conn.poll(self.start_timeout):
+            self._kill()
+            self.state = "failed"
+            raise EngineWorkerError(f"{self.engine} worker did not start within {self.start_timeout}s", engine=self.engine)
+        try:
+            message = parent_conn.recv()
+        except EOFError:
+            message = ("failed", f"worker exited with code {process.exitcode}", "")
+        if message[0] != "ready":
+            self._kill()
+            self.state = "failed"
+            raise EngineWorkerError(
+                f"{self.engine} worker failed to start: {message[1]}",
+                engine=self.engine,
+                details={"traceback": message[2]}
+            )
+        self.info = message[1]
+        self.state = "ready"
+        logger.info(f"{self.engine} worker {self.worker_index} ready (pid {self.info['pid']}, {self.info['device']})")
+
+    def _kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+
+    def _restart(self):
+        """Replace a dead worker. Caller holds the lock."""
+        self._kill()
+        while True:
+            if self._failed_restarts >= self.max_restarts:
+                self.state = "failed"
+                logger.error(f"{self.engine} worker {self.worker_index} gave up after {self.max_restarts} failed restarts")
+                return
+            self.restarts += 1
+            try:
+                self._start()
+                self._failed_restarts = 0
+                logger.info(f"{self.engine} worker {self.worker_index} restarted")
+                return
+            except EngineWorkerError as e:
+                self._failed_restarts += 1
+                logger.error(f"Restarting {self.engine} worker {self.worker_index} failed: {e.message}")
+
+    def _restart_in_background(self):
+        self.state = "restarting"
+
+        def restart():
+            with self._lock:
+                # A request may have replaced the worker while this thread waited for the lock
+                if self.state == "ready" and self.process is not None and self.process.is_alive():
+                    return
+                self._restart()
+
+        threading.Thread(target=restart, daemon=True, name=f"tts-{self.engine}-restart").start()
+
+    def _ensure_running(self):
+        if self.state == "failed":
+            raise EngineWorkerError(f"{self.engine} worker is down", engine=self.engine)
+        if self.process is None or not self.process.is_alive():
+            logger.warning(f"{self.engine} worker {self.worker_index} is not running, restarting")
+            self._restart()
+            if self.state != "ready":
+                raise EngineWorkerError(f"{self.engine} worker is down", engine=self.engine)
+
+    # Requests
+
+    def _request(self, text: str, voice_id: str) -> Tuple[tuple, str, int]:
+        """Run one request in the worker. Caller holds the lock. Returns (shape, dtype, sample rate)."""
+        token = current_token()
+        if token is not None:
+            # Requests abandoned while queued for this worker never reach it
+            token.check()
+        self._ensure_running()
+        request_id = next(self._request_ids)
+        start_time = time.perf_counter()
+        deadline = time.monotonic() + self.request_timeout
+        self._cancel_event.clear()
+        self.conn.send((
+            "synthesize", request_id, text, voice_id, self._buffer.name, self._buffer.size,
+            token.remaining() if token is not None else None
+        ))
+
+        while True:
+            message = self._receive(deadline, token)
+            kind = message[0]
+            if message[1] != request_id:
+                continue
+            if kind == "resize":
+                self._grow_buffer(message[2])
+                self.conn.send(("write", request_id, self._buffer.name))
+            elif kind == "error":
+                if isinstance(message[2], RequestCancelledError) and token is not None:
+                    # Report why the manager cancelled (deadline vs cancel), not just that it did
+                    token.check()
+                raise message[2]
+            elif kind == "done":
+                _, _, shape, dtype, sample_rate, timings = message
+                break
+
+        self.requests += 1
+        round_trip = time.perf_counter() - start_time
+        self._ipc_overhead.append(round_trip - timings["generate"])
+        return tuple(shape), dtype, sample_rate
+
+    def _receive(self, deadline: float, token: Optional[CancellationToken] = None):
+        """Wait for the next reply, replacing the worker if it dies or runs past the deadline"""
+        while True:
+            try:
+                if self.conn.poll(0.1):
+                    return self.conn.recv()
+            except (EOFError, OSError):
+                pass
+            if token is not None and token.cancelled and not self._cancel_event.is_set():
+                # The worker stops at its next checkpoint and answers with RequestCancelledError
+                self._cancel_event.set()
+            if not self.process.is_alive():
+                exitcode = self.process.exitcode
+                self._restart_in_background()
+                raise EngineWorkerError(
+                    f"{self.engine} worker exited with code {exitcode} during synthesis",
+                    engine=self.engine,
+                    details={"exitcode": exitcode}
+                )
+            if time.monotonic() > deadline:
+                self._kill()
+                self._restart_in_background()
+                raise EngineWorkerError(
+                    f"{self.engine} worker did not answer within {self.request_timeout}s",
+                    engine=self.engine
+                )
+
+    def _grow_buffer(self, nbytes: int):
+        old = self._buffer
+        self._buffer = shared_memory.SharedMemory(create=True, size=max(nbytes, 2 * old.size))
+        old.close()
+        old.unlink()
+        logger.info(f"{self.engine} worker {self.worker_index} audio buffer grown to {self._buffer.size} bytes")
+
+    def _view(self, shape: tuple, dtype: str) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._buffer.buf)
+
+    # Status
+
+    def get_metrics(self) -> Dict:
+        """
+        Generation/batching metrics reported by the service inside the worker.
+        A busy or unresponsive worker is not waited for: the last metrics it
+        reported are returned instead.
+        """
+        if not self._lock.acquire(blocking=False):
+            return self._metrics
+        try:
+            if self.state != "ready" or self.conn is None:
+                return self._metrics
+            self.conn.send(("metrics",))
+            # A reply arriving after the timeout is skipped by the next request (no request id)
+            if self.conn.poll(5):
+                message = self.conn.recv()
+                if message[0] == "metrics":
+                    self._metrics = message[1]
+        except (EOFError, OSError):
+            # Dead workers are replaced by the next request, not by a metrics poll
+            pass
+        finally:
+            self._lock.release()
+        return self._metrics
+
+    def get_status(self) -> Dict:
+        overhead = sorted(self._ipc_overhead)
+        status = {
+            "pid": self.info.get("pid"),
+            "state": self.state,
+            "restarts": self.restarts,
+            "requests": self.requests,
+            "buffer_bytes": self._buffer.size if self._buffer is not None else 0
+        }
+        if overhead:
+            status["ipc_overhead_ms"] = {
+                "mean": 1000 * sum(overhead) / len(overhead),
+                "p50": 1000 * overhead[len(overhead) // 2],
+                "p95": 1000 * overhead[min(len(overhead) - 1, int(len(overhead) * 0.95))]
+            }
+        return status
+
+    def shutdown(self):
+        with self._lock:
+            if self.conn is not None and self.process is not None and self.process.is_alive():
+                try:
+                    self.conn.send(("stop",))
+                    self.process.join(timeout=5)
+                except (OSError, BrokenPipeError):
+                    pass
+            self._kill()
+            self.state = "stopped"
+            if self._buffer is not None:
+                self._buffer.close()
+                self._buffer.unlink()
+                self._buffer = None
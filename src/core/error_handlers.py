@@ -61,6 +61,36 @@ class CudaError(TTSBaseError):
         ]
         return any(keyword in error_str for keyword in cuda_keywords)
 
+class EngineWorkerError(TTSBaseError):
+    """Errors from an engine running in a worker process"""
+    def __init__(self, message: str, engine: str = None, details: dict = None):
+        super().__init__(message, details)
+        self.engine = engine
+
+class RequestCancelledError(TTSBaseError):
+    """A request was cancelled (client gone, session cleared, superseded) or ran past its deadline"""
+    def __init__(self, message: str, reason: str = "cancelled", details: dict = None):
+        super().__init__(message, details)
+        self.reason = reason
+
+    def __reduce__(self):
+        # Keeps the reason when the error comes back from an engine worker process
+        return (type(self), (self.message, self.reason, self.details))
+
+class EngineUnavailableError(TTSBaseError):
+    """An engine's circuit breaker is open while it recovers"""
+    def __init__(self, message: str, engine: str = None, retry_after: float = 0.0, details: dict = None):
+        super().__init__(message, details)
+        self.engine = engine
+        self.retry_after = retry_after
+
+class EngineOverloadedError(EngineUnavailableError):
+    """Admission control turned a request away: its predicted wait is over the limit or past its deadline"""
+    def __init__(self, message: str, engine: str = None, retry_after: float = 0.0,
+                 predicted_seconds: float = 0.0, details: dict = None):
+        super().__init__(message, engine, retry_after, details)
+        self.predicted_seconds = predicted_seconds
+
 
 def handle_tts_error(error: TTSBaseError) -> tuple:
     """
@@ -81,6 +111,31 @@ def handle_tts_error(error: TTSBaseError) -> tuple:
         })
         return base_response, 503
     
+    if isinstance(error, EngineOverloadedError):
+        base_response.update({
+            "error_type": "overloaded",
+            "engine": error.engine,
+            "retry_after": error.retry_after,
+            "predicted_seconds": error.predicted_seconds
+        })
+        return base_response, 503
+
+    if isinstance(error, EngineUnavailableError):
+        base_response.update({
+            "error_type": "engine_unavailable",
+            "engine": error.engine,
+            "retry_after": error.retry_after
+        })
+        return base_response, 503
+
+    if isinstance(error, RequestCancelledError):
+        base_response.update({
+            "error_type": "cancelled",
+            "reason": error.reason
+        })
+        # 504 when the deadline passed, 499 (client closed request) otherwise
+        return base_response, 504 if error.reason == "deadline" else 499
+
     if isinstance(error, PollyError):
         base_response.update({
             "error_type": "polly",
@@ -109,6 +164,13 @@ def handle_tts_error(error: TTSBaseError) -> tuple:
         })
         return base_response, 503
         
+    elif isinstance(error, EngineWorkerError):
+        base_response.update({
+            "error_type": "engine_worker",
+            "engine": error.engine
+        })
+        return base_response, 503
+
     elif isinstance(error, IndicParlerError):
         base_response.update({
             "error_type": "indic_parler",
@@ -1,10 +1,12 @@
 # src/core/file_cleanup.py
+import os
 import time
 import logging
 import shutil
+import heapq
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import schedule
 import threading
 
@@ -13,7 +15,8 @@ class AudioFileCleanup:
                  directory: str,
                  max_age_hours: int = 24,
                  min_free_space_mb: int = 1000,
-                 cleanup_interval_minutes: int = 30):
+                 cleanup_interval_minutes: int = 30,
+                 storage=None):
         """
         Initialize the audio file cleanup service.
         
@@ -22,8 +25,10 @@ class AudioFileCleanup:
             max_age_hours: Maximum age of files before deletion (default 24 hours)
             min_free_space_mb: Minimum free space to maintain in MB (default 1GB)
             cleanup_interval_minutes: How often to run cleanup (default 30 minutes)
+            storage: Optional AudioStorage; expired time buckets are dropped whole
         """
         self.directory = Path(directory)
+        self.storage = storage
         self.max_age_hours = max_age_hours
         self.min_free_space_bytes = min_free_space_mb * 1024 * 1024
         self.cleanup_interval_minutes = cleanup_interval_minutes
@@ -38,15 +43,13 @@ class AudioFileCleanup:
             "errors": 0
         }
 
-    def get_file_age_hours(self, filepath: Path) -> float:
-        """Calculate file age in hours"""
-        try:
-            mtime = filepath.stat().st_mtime
-            age = time.time() - mtime
-            return age / 3600
-        except Exception as e:
-            self.logger.error(f"Error getting age for {filepath}: {e}")
-            return float('inf')
+        # Expiry index: min-heap of (created_at, path) fed by register_file,
+        # with byte accounting so cleanup never has to scan the directory.
+        self._index: List[Tuple[float, str]] = []
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._index_lock = threading.Lock()
+        self.tracked_bytes = 0
+        self._reconciled = False
 
     def get_free_space(self) -> int:
         """Get free space in bytes for the directory's filesystem"""
@@ -59,24 +62,176 @@ class AudioFileCleanup:
             self.logger.error(f"Error getting free space: {e}")
             return 0
 
-    def should_delete_file(self, filepath: Path) -> bool:
-        """Determine if a file should be deleted based on age and pattern"""
-        try:
-            # Only process .wav files
-            if filepath.suffix != '.wav':
-                return False
-                
-            # Check if file starts with realtime_ prefix
-            if not filepath.stem.startswith('realtime_'):
-                return False
-                
-            # Check file age
-            age_hours = self.get_file_age_hours(filepath)
-            return age_hours >= self.max_age_hours
-            
-        except Exception as e:
-            self.logger.error(f"Error checking file {filepath}: {e}")
-            return False
+    def is_managed_file(self, filepath: Path) -> bool:
+        """Check whether a file is a generated realtime audio file"""
+        return filepath.suffix == '.wav' and filepath.stem.startswith('realtime_')
+
+    def register_file(self, filepath, size: Optional[int] = None,
+                      created_at: Optional[float] = None) -> None:
+        """
+        Add a newly written audio file to the expiry index.
+
+        Args:
+            filepath: Path of the written audio file
+            size: File size in bytes (stat'ed once if not given)
+            created_at: Creation timestamp (defaults to the file's mtime)
+        """
+        path = Path(filepath)
+        if not self.is_managed_file(path):
+            return
+
+        if size is None or created_at is None:
+            try:
+                stat = path.stat()
+            except OSError as e:
+                self.logger.error(f"Error registering file {path}: {e}")
+                return
+            size = stat.st_size if size is None else size
+            created_at = stat.st_mtime if created_at is None else created_at
+
+        key = str(path)
+        with self._index_lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self.tracked_bytes -= previous[1]
+            self._entries[key] = (created_at, size)
+            self.tracked_bytes += size
+            heapq.heappush(self._index, (created_at, key))
+
+    def forget(self, filepath) -> None:
+        """Drop a file from the index, e.g. after it was moved out of the audio directory"""
+        with self._index_lock:
+            entry = self._entries.pop(str(Path(filepath)), None)
+            if entry is not None:
+                # Its heap entry is skipped as stale when it reaches the top
+                self.tracked_bytes -= entry[1]
+
+    def _pop_entry(self) -> Optional[Tuple[str, int]]:
+        """Pop the top of the index. Caller holds the lock and checks it is non-empty."""
+        created_at, key = heapq.heappop(self._index)
+        entry = self._entries.get(key)
+        # Heap entries superseded by a later re-registration are stale
+        if entry is None or entry[0] != created_at:
+            return None
+        del self._entries[key]
+        self.tracked_bytes -= entry[1]
+        return key, entry[1]
+
+    def _pop_expired(self, cutoff: float) -> List[Tuple[str, int]]:
+        """Remove and return all indexed files created before cutoff"""
+        expired = []
+        with self._index_lock:
+            while self._index and self._index[0][0] < cutoff:
+                entry = self._pop_entry()
+                if entry is not None:
+                    expired.append(entry)
+        return expired
+
+    def _pop_oldest(self, bytes_needed: int) -> List[Tuple[str, int]]:
+        """Remove and return the oldest indexed files until bytes_needed is covered"""
+        victims = []
+        freed = 0
+        with self._index_lock:
+            while self._index and freed < bytes_needed:
+                entry = self._pop_entry()
+                if entry is not None:
+                    victims.append(entry)
+                    freed += entry[1]
+        return victims
+
+    def reconcile_index(self) -> None:
+        """Index files already on disk. Runs once, when the service starts."""
+        if self._reconciled:
+            return
+        self._reconciled = True
+
+        if not self.directory.exists():
+            return
+
+        indexed = 0
+        for filepath in self._iter_audio_files():
+            try:
+                if not self.is_managed_file(filepath):
+                    continue
+                stat = filepath.stat()
+                self.register_file(filepath, size=stat.st_size, created_at=stat.st_mtime)
+                indexed += 1
+            except Exception as e:
+                self.logger.error(f"Error indexing file {filepath}: {e}")
+
+        self.logger.info(f"Reconciled cleanup index: {indexed} existing files")
+
+    def _iter_audio_files(self):
+        """Yield files in the audio directory and one level of bucket directories"""
+        for entry in self.directory.iterdir():
+            if entry.is_dir():
+                yield from entry.iterdir()
+            else:
+                yield entry
+
+    def _scan_oldest(self, bytes_needed: int) -> List[Tuple[str, int]]:
+        """
+        Oldest .wav files on disk, found by scanning the directory, until
+        bytes_needed is covered. Only used under space pressure once the
+        index has nothing left, e.g. for audio written outside the manager.
+        """
+        files = []
+        for filepath in self._iter_audio_files():
+            try:
+                if filepath.suffix == '.wav':
+                    stat = filepath.stat()
+                    files.append((stat.st_mtime, str(filepath), stat.st_size))
+            except OSError:
+                continue
+        victims = []
+        freed = 0
+        for _, key, size in sorted(files):
+            if freed >= bytes_needed:
+                break
+            victims.append((key, size))
+            freed += size
+        return victims
+
+    def _drop_expired_buckets(self, cutoff: float) -> Tuple[set, int]:
+        """Remove whole time-bucket directories that are past the cutoff"""
+        dropped = set()
+        errors = 0
+        if self.storage is None:
+            return dropped, errors
+        for bucket in self.storage.expired_buckets(cutoff):
+            try:
+                shutil.rmtree(bucket)
+                self.storage.forget_bucket(bucket.name)
+                dropped.add(str(bucket))
+                self.logger.info(f"Dropped expired bucket: {bucket}")
+            except Exception as e:
+                self.logger.error(f"Error dropping bucket {bucket}: {e}")
+                errors += 1
+        return dropped, errors
+
+    def _delete_files(self, files: List[Tuple[str, int]], reason: str,
+                      dropped_buckets: Optional[set] = None) -> Tuple[int, int, int]:
+        """Unlink indexed files, returning (files_deleted, space_freed, errors)"""
+        files_deleted = 0
+        space_freed = 0
+        errors = 0
+        for key, size in files:
+            if dropped_buckets and os.path.dirname(key) in dropped_buckets:
+                # Already removed together with its bucket directory
+                files_deleted += 1
+                space_freed += size
+                continue
+            try:
+                Path(key).unlink()
+                files_deleted += 1
+                space_freed += size
+                self.logger.debug(f"Deleted file ({reason}): {key}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.logger.error(f"Error deleting file {key}: {e}")
+                errors += 1
+        return files_deleted, space_freed, errors
 
     def cleanup_files(self) -> None:
         """Perform the file cleanup operation"""
@@ -85,48 +240,41 @@ class AudioFileCleanup:
                 self.logger.warning(f"Directory {self.directory} does not exist")
                 return
 
-            files_deleted = 0
-            space_freed = 0
-            errors = 0
-
-            # First pass: Delete old files
-            for filepath in self.directory.iterdir():
-                try:
-                    if self.should_delete_file(filepath):
-                        size = filepath.stat().st_size
-                        filepath.unlink()
-                        files_deleted += 1
-                        space_freed += size
-                        self.logger.info(f"Deleted old file: {filepath}")
-                except Exception as e:
-                    self.logger.error(f"Error deleting file {filepath}: {e}")
-                    errors += 1
-
-            # Second pass: If we're still low on space, delete more files
+            # First pass: Drop expired buckets whole, then delete the remaining
+            # expired files, O(expired) via the index
+            cutoff = time.time() - self.max_age_hours * 3600
+            dropped_buckets, bucket_errors = self._drop_expired_buckets(cutoff)
+            files_deleted, space_freed, errors = self._delete_files(
+                self._pop_expired(cutoff), "expired", dropped_buckets
+            )
+            errors += bucket_errors
+
+            # Second pass: If we're still low on space, delete the oldest files
             free_space = self.get_free_space()
             if free_space < self.min_free_space_bytes:
                 self.logger.warning(
                     f"Low on space ({free_space / (1024*1024):.2f}MB free), "
                     f"minimum required: {self.min_free_space_bytes / (1024*1024):.2f}MB"
                 )
-                files = sorted(
-                    [f for f in self.directory.iterdir() if f.suffix == '.wav'],
-                    key=lambda x: x.stat().st_mtime
+                deleted, freed, failed = self._delete_files(
+                    self._pop_oldest(self.min_free_space_bytes - free_space),
+                    "space constraints"
                 )
-                
-                for filepath in files:
-                    try:
-                        if self.get_free_space() >= self.min_free_space_bytes:
-                            break
-                            
-                        size = filepath.stat().st_size
-                        filepath.unlink()
-                        files_deleted += 1
-                        space_freed += size
-                        self.logger.info(f"Deleted file due to space constraints: {filepath}")
-                    except Exception as e:
-                        self.logger.error(f"Error deleting file {filepath}: {e}")
-                        errors += 1
+                files_deleted += deleted
+                space_freed += freed
+                errors += failed
+                free_space += freed
+
+                if free_space < self.min_free_space_bytes:
+                    # Index exhausted: fall back to any .wav in the directory, oldest first
+                    deleted, freed, failed = self._delete_files(
+                        self._scan_oldest(self.min_free_space_bytes - free_space),
+                        "space constraints, unindexed"
+                    )
+                    files_deleted += deleted
+                    space_freed += freed
+                    errors += failed
+                    free_space += freed
 
             # Update stats
             self.cleanup_stats.update({
@@ -139,7 +287,8 @@ class AudioFileCleanup:
             self.logger.info(
                 f"Cleanup completed: {files_deleted} files deleted, "
                 f"{space_freed / (1024*1024):.2f}MB freed, {errors} errors. "
-                f"Free space: {self.get_free_space() / (1024*1024):.2f}MB"
+                f"Free space: {free_space / (1024*1024):.2f}MB, "
+                f"tracked: {len(self._entries)} files"
             )
 
         except Exception as e:
@@ -160,8 +309,9 @@ class AudioFileCleanup:
         def run_scheduler():
             self.is_running = True
             schedule.every(self.cleanup_interval_minutes).minutes.do(self._cleanup_job)
-            
-            # Run initial cleanup
+
+            # Pick up files left over from a previous run, then clean up
+            self.reconcile_index()
             self._cleanup_job()
             
             while self.is_running:
@@ -190,5 +340,7 @@ class AudioFileCleanup:
             "last_cleanup": self.last_cleanup,
             "directory": str(self.directory),
             "free_space_mb": self.get_free_space() / (1024*1024),
+            "tracked_files": len(self._entries),
+            "tracked_bytes": self.tracked_bytes,
             "stats": self.cleanup_stats
         }
@@ -0,0 +1,160 @@
+# src/core/generation_control.py
+import logging
+import functools
+import threading
+from typing import Callable, Dict, List
+
+import torch
+from transformers import LogitsProcessor, StoppingCriteria, StoppingCriteriaList
+
+from core.cancellation import CancellationToken, check_cancelled, current_token
+
+logger = logging.getLogger(__name__)
+
+class StopTokenMonitor(LogitsProcessor):
+    """
+    Counts decode steps of one generation and forces the stop token once
+    its probability reaches stop_threshold, instead of leaving the sampler
+    to skip past it and ramble on to the length limit.
+    """
+
+    def __init__(self, stop_token: int, stop_threshold: float = 0.0):
+        self.stop_token = stop_token
+        self.stop_threshold = stop_threshold
+        self.steps = 0
+        self.forced_stop = False
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        self.steps += 1
+        if self.stop_threshold <= 0:
+            return scores
+        stop_probs = scores.float().softmax(-1)[:, self.stop_token]
+        force = stop_probs >= self.stop_threshold
+        if force.any():
+            # Only rows whose top choice isn't already the stop token count as forced
+            if (scores[force].argmax(-1) != self.stop_token).any():
+                self.forced_stop = True
+            scores = scores.clone()
+            scores[force] = float("-inf")
+            scores[force, self.stop_token] = 0.0
+        return scores
+
+class CancellationStoppingCriteria(StoppingCriteria):
+    """Ends generation at the next decode step once the request's token is cancelled"""
+
+    def __init__(self, token: CancellationToken):
+        self.token = token
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.token.cancelled, dtype=torch.bool, device=input_ids.device)
+
+def cancellation_criteria() -> StoppingCriteriaList:
+    """stopping_criteria for generate() in the current request; empty outside one"""
+    token = current_token()
+    return StoppingCriteriaList([CancellationStoppingCriteria(token)] if token is not None else [])
+
+class GenerationControl:
+    """
+    Mel-token length control for XTTS-style generation: a text-length-aware
+    max_new_tokens budget, stop-token forcing and a runaway guard that
+    retries generations which exhaust their budget with a cooler
+    temperature. Keeps counters of how often each mechanism fires.
+    """
+
+    def __init__(self, config, max_tokens: int, stop_token: int):
+        """
+        Args:
+            config: GenerationConfig
+            max_tokens: Model maximum for generated mel tokens
+            stop_token: Stop (end of audio) token id
+        """
+        self.config = config
+        self.max_tokens = max_tokens
+        self.stop_token = stop_token
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {
+            "requests": 0,
+            "budget_hits": 0,
+            "forced_stops": 0,
+            "retries": 0,
+            "recovered": 0,
+            "truncated": 0,
+            "generated_tokens": 0
+        }
+
+    def token_budget(self, text: str, language: str) -> int:
+        """Maximum mel tokens for text; the model maximum when length control is disabled"""
+        if not self.config.enabled:
+            return self.max_tokens
+        per_char = self.config.language_tokens_per_char.get(language, self.config.tokens_per_char)
+        budget = max(self.config.min_new_tokens, int(per_char * len(text.strip())))
+        return min(budget, self.max_tokens)
+
+    def new_monitor(self) -> StopTokenMonitor:
+        threshold = self.config.stop_threshold if self.config.enabled else 0.0
+        return StopTokenMonitor(self.stop_token, threshold)
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.metrics[key] += value
+
+    def run(self, generate: Callable, text: str, language: str, **sampling):
+        """
+        Run generate(max_new_tokens=..., monitor=..., **sampling) under the
+        token budget. A generation that uses the whole budget is treated as
+        a runaway and retried up to max_retries times with the temperature
+        scaled down; the last attempt's output is returned either way.
+        """
+        budget = self.token_budget(text, language)
+        max_retries = self.config.max_retries if self.config.enabled else 0
+        self._count("requests")
+
+        attempt = 0
+        while True:
+            monitor = self.new_monitor()
+            output = generate(max_new_tokens=budget, monitor=monitor, **sampling)
+            # A cancelled generation stopped early; its output is not wanted
+            check_cancelled()
+            self._count("generated_tokens", monitor.steps)
+            if monitor.forced_stop:
+                self._count("forced_stops")
+
+            if monitor.steps < budget:
+                if attempt:
+                    self._count("recovered")
+                return output
+
+            self._count("budget_hits")
+            if attempt >= max_retries:
+                self._count("truncated")
+                logger.warning(
+                    f"Generation hit its {budget}-token budget after {attempt + 1} attempts "
+                    f"({len(text)} chars, {language}), returning truncated output"
+                )
+                return output
+
+            attempt += 1
+            self._count("retries")
+            if "temperature" in sampling:
+                sampling = {**sampling, "temperature": sampling["temperature"] * self.config.retry_temperature_scale}
+            logger.info(f"Runaway generation ({budget} tokens for {len(text)} chars), retry {attempt}/{max_retries}")
+
+    def run_sentences(self, generate: Callable, sentences: List[str], language: str, **sampling) -> List:
+        """
+        run() for each sentence of a split text, with generate(sentence,
+        max_new_tokens=..., monitor=..., **sampling). Each sentence is its
+        own generation, so each gets its own budget, monitor and retries
+        instead of the whole text being held to one model-capped budget.
+        """
+        return [
+            self.run(functools.partial(generate, sentence), sentence, language, **sampling)
+            for sentence in sentences
+        ]
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            metrics = dict(self.metrics)
+        requests = metrics["requests"]
+        for key in ("budget_hits", "forced_stops", "retries", "truncated"):
+            metrics[f"{key}_rate"] = metrics[key] / requests if requests else 0.0
+        return metrics
@@ -0,0 +1,152 @@
+# src/core/latency_estimator.py
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class DecayedRegression:
+    """
+    Online least-squares fit of seconds = overhead + rate * chars where
+    every new sample multiplies the weight of the older ones by decay, so
+    the fit follows the engine as load, hardware or settings change.
+    """
+
+    def __init__(self, decay: float):
+        self.decay = decay
+        self.weight = 0.0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    def add(self, chars: float, seconds: float, weight: float = 1.0):
+        d = self.decay
+        self.weight = d * self.weight + weight
+        self._sx = d * self._sx + weight * chars
+        self._sy = d * self._sy + weight * seconds
+        self._sxx = d * self._sxx + weight * chars * chars
+        self._sxy = d * self._sxy + weight * chars * seconds
+
+    def coefficients(self) -> Optional[Tuple[float, float]]:
+        """(overhead seconds, seconds per char), or None before the first sample"""
+        if self.weight <= 0:
+            return None
+        mean_x = self._sx / self.weight
+        mean_y = self._sy / self.weight
+        var_x = self._sxx / self.weight - mean_x * mean_x
+        if var_x > 1e-6 * max(1.0, mean_x * mean_x):
+            rate = max(0.0, (self._sxy / self.weight - mean_x * mean_y) / var_x)
+        else:
+            # All samples about the same length: put everything on the rate
+            rate = mean_y / mean_x if mean_x > 0 else 0.0
+        overhead = mean_y - rate * mean_x
+        if overhead < 0:
+            # A negative intercept would predict nonsense for short texts
+            rate, overhead = (mean_y / mean_x if mean_x > 0 else 0.0), 0.0
+        return overhead, rate
+
+    def predict(self, chars: int) -> Optional[float]:
+        coefficients = self.coefficients()
+        if coefficients is None:
+            return None
+        overhead, rate = coefficients
+        return overhead + rate * chars
+
+class LatencyEstimator:
+    """
+    Synthesis time per engine and per voice, learned from completed
+    requests. A voice uses its own fit once it has min_voice_samples
+    (decayed) samples and its engine's fit before that; engines without
+    any sample fall back to the configured seconds-per-char priors.
+
+    Has the scheduler's cost model interface (estimate / observe / rate),
+    so queued requests are weighted and their completion predicted with it.
+    """
+
+    def __init__(self, config, priors: Optional[Dict[str, float]] = None, default_rate: float = 0.02):
+        """
+        Args:
+            config: LatencyConfig
+            priors: engine -> seconds per char used before the first sample
+        """
+        self.config = config
+        self.priors = dict(priors or {})
+        self.default_rate = default_rate
+        self._engines: Dict[str, DecayedRegression] = {}
+        self._voices: Dict[Tuple[str, str], DecayedRegression] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, engine: str, chars: int, seconds: float, voice_id: Optional[str] = None,
+                weight: float = 1.0):
+        with self._lock:
+            self._engines.setdefault(engine, DecayedRegression(self.config.decay)).add(chars, seconds, weight)
+            if voice_id is not None:
+                self._voices.setdefault(
+                    (engine, voice_id), DecayedRegression(self.config.decay)
+                ).add(chars, seconds, weight)
+
+    def predict(self, engine: str, chars: int, voice_id: Optional[str] = None) -> Tuple[float, str]:
+        """(predicted seconds, which model answered: voice, engine or prior)"""
+        chars = max(1, chars)
+        with self._lock:
+            voice = self._voices.get((engine, voice_id))
+            if voice is not None and voice.weight >= self.config.min_voice_samples:
+                return voice.predict(chars), "voice"
+            model = self._engines.get(engine)
+            if model is not None:
+                return model.predict(chars), "engine"
+        return self.priors.get(engine, self.default_rate) * chars, "prior"
+
+    def estimate(self, engine: str, chars: int, voice_id: Optional[str] = None) -> float:
+        return self.predict(engine, chars, voice_id)[0]
+
+    def rate(self, engine: str) -> Optional[float]:
+        with self._lock:
+            model = self._engines.get(engine)
+            coefficients = model.coefficients() if model is not None else None
+        return coefficients[1] if coefficients is not None else self.priors.get(engine)
+
+    def seed_from_results(self, results_dir: Path, engine_for_voice: Callable[[str], str]) -> int:
+        """
+        Start from earlier load-test runs (test_results/*.json with a
+        "results" list). Their times include queueing under the test's
+        concurrency, so they get seed_weight and live traffic soon
+        outweighs them. Returns the number of samples used.
+        """
+        samples = 0
+        for path in sorted(Path(results_dir).glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    results = json.load(f).get("results")
+            except (OSError, ValueError, AttributeError):
+                continue
+            if not isinstance(results, list):
+                continue
+            for result in results:
+                if not isinstance(result, dict) or not result.get("success"):
+                    continue
+                voice_id, chars = result.get("voice_id"), result.get("text_length")
+                timing = (result.get("response_data") or {}).get("timing_info") or {}
+                seconds = timing.get("total_generation_time", result.get("latency"))
+                if not voice_id or not chars or seconds is None:
+                    continue
+                self.observe(engine_for_voice(voice_id), chars, seconds, voice_id, self.config.seed_weight)
+                samples += 1
+        if samples:
+            logger.info(f"Latency estimator seeded with {samples} samples from {results_dir}")
+        return samples
+
+    def get_status(self) -> Dict:
+        def describe(model: DecayedRegression) -> Dict:
+            overhead, rate = model.coefficients()
+            return {
+                "overhead_seconds": round(overhead, 4),
+                "seconds_per_char": round(rate, 5),
+                "samples": round(model.weight, 1)
+            }
+
+        with self._lock:
+            status = {engine: {**describe(model), "voices": {}} for engine, model in self._engines.items()}
+            for (engine, voice_id), model in self._voices.items():
+                status[engine]["voices"][voice_id] = describe(model)
+        return status
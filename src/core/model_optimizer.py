@@ -0,0 +1,153 @@
+# src/core/model_optimizer.py
+import inspect
+import logging
+import functools
+import contextlib
+from typing import Iterable, Optional
+
+import torch
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PRECISIONS = ("fp32", "fp16", "bf16", "int8")
+PRECISION_DTYPES = {
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+def resolve_precision(precision: str, device: str) -> str:
+    """
+    Map a requested precision onto one the device can actually run.
+    fp16 needs CUDA, bf16 needs a bf16-capable GPU or a CPU, int8 dynamic
+    quantization only has CPU kernels.
+    """
+    precision = (precision or "fp32").lower()
+    if precision not in SUPPORTED_PRECISIONS:
+        logger.warning(f"Unknown precision '{precision}', using fp32")
+        return "fp32"
+
+    on_cuda = str(device).startswith("cuda")
+    if precision == "fp16" and not on_cuda:
+        logger.warning("fp16 inference requires CUDA, using fp32 on CPU")
+        return "fp32"
+    if precision == "bf16" and on_cuda and not torch.cuda.is_bf16_supported():
+        logger.warning("bf16 is not supported on this GPU, using fp16")
+        return "fp16"
+    if precision == "int8" and on_cuda:
+        logger.warning("int8 dynamic quantization is CPU-only, using fp16 on CUDA")
+        return "fp16"
+    return precision
+
+def conv1d_to_linear(module: nn.Module) -> nn.Module:
+    """
+    Replace transformers' GPT-2 Conv1D layers with equivalent nn.Linear layers
+    so that dynamic quantization (which only targets nn.Linear) can reach them.
+    """
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            linear = nn.Linear(child.nx, child.nf, bias=True)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            conv1d_to_linear(child)
+    return module
+
+def quantize_int8(module: nn.Module, layers: Optional[set] = None) -> nn.Module:
+    """Apply int8 dynamic quantization to all linear (or given) layers of a CPU module"""
+    conv1d_to_linear(module)
+    return torch.ao.quantization.quantize_dynamic(
+        module, layers or {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+def compile_forward(module: nn.Module, mode: str = "default") -> bool:
+    """Replace module.forward with a torch.compile'd version, keeping the module object"""
+    if not hasattr(torch, "compile"):
+        logger.warning("torch.compile is not available in this torch version")
+        return False
+    try:
+        module.forward = torch.compile(module.forward, mode=mode, dynamic=True)
+        return True
+    except Exception as e:
+        logger.warning(f"torch.compile failed for {type(module).__name__}: {e}")
+        return False
+
+def inference_context(device: str, precision: str, inference_mode: bool = True):
+    """Build the context (inference mode + autocast) inference calls run under"""
+    stack = contextlib.ExitStack()
+    if inference_mode:
+        stack.enter_context(torch.inference_mode())
+    dtype = PRECISION_DTYPES.get(precision)
+    if dtype is not None:
+        device_type = "cuda" if str(device).startswith("cuda") else "cpu"
+        stack.enter_context(torch.autocast(device_type=device_type, dtype=dtype))
+    return stack
+
+def wrap_inference_calls(model, method_names: Iterable[str], device: str,
+                         precision: str, inference_mode: bool = True):
+    """Run the given bound methods of model inside inference_context"""
+    def wrap(method):
+        if inspect.isgeneratorfunction(method):
+            # Streaming methods (inference_stream) do their work while being iterated
+            @functools.wraps(method)
+            def generator_wrapper(*args, **kwargs):
+                with inference_context(device, precision, inference_mode):
+                    yield from method(*args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with inference_context(device, precision, inference_mode):
+                return method(*args, **kwargs)
+        return wrapper
+
+    for name in method_names:
+        method = getattr(model, name, None)
+        if method is not None:
+            setattr(model, name, wrap(method))
+    return model
+
+def optimize_xtts(model, inference_config, device: str, precision: Optional[str] = None):
+    """
+    Apply the configured precision, compilation and inference-mode settings
+    to a loaded XTTS model (GPT stage and HiFi-GAN decoder).
+    precision overrides inference_config.precision when given.
+    """
+    precision = resolve_precision(precision or inference_config.precision, device)
+
+    if precision == "int8":
+        model.gpt = quantize_int8(model.gpt)
+    elif precision in PRECISION_DTYPES:
+        # The GPT holds most of the weights; the decoder stays fp32 and runs
+        # under autocast so the conv stacks keep their accuracy
+        model.gpt.to(PRECISION_DTYPES[precision])
+
+    gpt_inference = getattr(model.gpt, "gpt_inference", None)
+    is_cpu = not str(device).startswith("cuda")
+    if inference_config.static_kv_cache:
+        if hasattr(gpt_inference, "enable_static_cache"):
+            gpt_inference.enable_static_cache(cuda_graph=inference_config.cuda_graph and not is_cpu)
+        else:
+            logger.warning("static_kv_cache requires the patched GPT2InferenceModel, keeping the dynamic cache")
+
+    if inference_config.compile:
+        if gpt_inference is not None:
+            compile_forward(gpt_inference, inference_config.compile_mode)
+        compile_forward(model.hifigan_decoder, inference_config.compile_mode)
+
+    wrap_inference_calls(
+        model,
+        ["inference", "inference_stream", "get_conditioning_latents"],
+        device,
+        precision,
+        inference_config.inference_mode
+    )
+    logger.info(
+        f"XTTS inference settings: precision={precision}, "
+        f"compile={inference_config.compile}, inference_mode={inference_config.inference_mode}, "
+        f"static_kv_cache={inference_config.static_kv_cache}, cuda_graph={inference_config.cuda_graph}"
+    )
+    return model
@@ -0,0 +1,130 @@
+# src/core/phoneme_cache.py
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("sentence", "word")
+
+class PhonemeCache:
+    """
+    Bounded LRU of G2P results per language and level: "sentence" holds
+    the phonemized segments of a whole text piece, "word" the phonemes of
+    single out-of-lexicon words. Values must be JSON-serializable so the
+    cache can be persisted and reloaded on the next start.
+    """
+
+    def __init__(self, sentence_entries: int = 10000, word_entries: int = 50000,
+                 persist_path: Optional[Path] = None, save_interval_seconds: float = 300.0):
+        """
+        Args:
+            sentence_entries / word_entries: Entries kept per language at each level
+            persist_path: JSON file loaded now and written every save_interval_seconds
+                (and on save()); None keeps the cache in memory only
+        """
+        self.limits = {"sentence": sentence_entries, "word": word_entries}
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.save_interval_seconds = save_interval_seconds
+        self._entries: Dict[Tuple[str, str], "OrderedDict[str, Any]"] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        if self.persist_path is not None:
+            self.load()
+
+    def _table(self, language: str, level: str) -> "OrderedDict[str, Any]":
+        key = (language, level)
+        if key not in self._entries:
+            self._entries[key] = OrderedDict()
+            self._stats[key] = {"hits": 0, "misses": 0}
+        return self._entries[key]
+
+    def get_or_compute(self, language: str, level: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached value of key, or compute() stored as the most recent entry"""
+        with self._lock:
+            table = self._table(language, level)
+            if key in table:
+                table.move_to_end(key)
+                self._stats[(language, level)]["hits"] += 1
+                return table[key]
+            self._stats[(language, level)]["misses"] += 1
+
+        # G2P runs outside the lock; two threads missing the same key both compute it
+        value = compute()
+        with self._lock:
+            self._store_locked(language, level, key, value)
+        self._maybe_save()
+        return value
+
+    def _store_locked(self, language: str, level: str, key: str, value: Any):
+        table = self._table(language, level)
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.limits[level]:
+            table.popitem(last=False)
+        self._dirty = True
+
+    def _maybe_save(self):
+        if (self.persist_path is not None and self._dirty
+                and time.monotonic() - self._last_save >= self.save_interval_seconds):
+            self.save()
+
+    def save(self):
+        """Write the cache to persist_path (atomically replaced)"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            data = {}
+            for (language, level), table in self._entries.items():
+                data.setdefault(language, {})[level] = list(table.items())
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            # Replicas and workers may share the file: each writes its own temp file
+            temp_path = self.persist_path.with_name(f"{self.persist_path.name}.{os.getpid()}.{id(self)}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.persist_path)
+        except OSError as e:
+            logger.warning(f"Could not save phoneme cache to {self.persist_path}: {e}")
+
+    def load(self):
+        """Fill the cache from persist_path; a missing or unreadable file leaves it empty"""
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable phoneme cache {self.persist_path}: {e}")
+            return
+        with self._lock:
+            for language, levels in data.items():
+                for level, entries in levels.items():
+                    if level not in self.limits:
+                        continue
+                    for key, value in entries:
+                        self._store_locked(language, level, key, value)
+            self._dirty = False
+        logger.info(f"Loaded phoneme cache from {self.persist_path}")
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            status = {}
+            for (language, level), stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                status.setdefault(language, {})[level] = {
+                    "entries": len(self._entries[(language, level)]),
+                    "hits": stats["hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": stats["hits"] / lookups if lookups else 0.0
+                }
+            return status
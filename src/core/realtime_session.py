@@ -0,0 +1,199 @@
+# src/core/realtime_session.py
+import re
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, or at a line break. The UI sends text on space and
+# Enter, so a just-finished sentence always has its trailing whitespace.
+SENTENCE_END = re.compile(r'[.!?…。！？।]+["\'”’)\]]*(?=\s)|\n')
+SPEAKABLE = re.compile(r'\w')
+
+@dataclass
+class Segment:
+    seq: int
+    text: str
+    # Character span in the session text
+    start: int
+    end: int
+    superseded: bool = False
+    finished: bool = False
+    # Cancelled when the segment is superseded, so its synthesis stops early
+    token: CancellationToken = field(default_factory=CancellationToken)
+
+class RealtimeSession:
+    """
+    Incremental state of one realtime typing session.
+
+    Each update carries the whole text typed so far. Only sentences that
+    became complete since the last update are turned into segments, so a
+    prefix is never synthesized twice. Segments get increasing sequence
+    numbers and are synthesized strictly in that order, even when they
+    were claimed by different (concurrent) requests.
+
+    When the text changes before the already claimed part (an edit or a
+    backspace), segments after the edit point are superseded: those not
+    yet synthesized are skipped, the one being synthesized is cancelled,
+    and the edited sentences are extracted again on this update.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.text = ""
+        # Characters of self.text already claimed, and where each claimed piece ends
+        self.offset = 0
+        self.boundaries: List[int] = []
+        self.segments: List[Segment] = []
+        self.next_seq = 0
+        self.last_active = time.time()
+        self._next_turn = 0
+        self._done_seqs = set()
+        self._condition = threading.Condition()
+
+    def update(self, text: str, final: bool = False,
+               token: Optional[CancellationToken] = None) -> Tuple[List[Segment], List[int]]:
+        """
+        Take the latest full text and claim the newly completed sentences.
+
+        Args:
+            text: Everything typed so far
+            final: Also claim the unfinished tail (Enter / end of input)
+            token: The request's token; new segments inherit its cancellation and deadline
+
+        Returns:
+            (new segments to synthesize, sequence numbers superseded by an edit)
+        """
+        with self._condition:
+            self.last_active = time.time()
+            superseded = []
+            if not text.startswith(self.text[:self.offset]):
+                common = 0
+                limit = min(len(text), self.offset)
+                while common < limit and text[common] == self.text[common]:
+                    common += 1
+                superseded = self._rewind_locked(common)
+            self.text = text
+
+            segments = []
+            ends = [match.end() for match in SENTENCE_END.finditer(text, self.offset)]
+            if final and len(text) > (ends[-1] if ends else self.offset):
+                ends.append(len(text))
+            for end in ends:
+                sentence = text[self.offset:end].strip()
+                # Punctuation-only pieces are consumed without a segment
+                if SPEAKABLE.search(sentence):
+                    segment = Segment(self.next_seq, sentence, self.offset, end,
+                                      token=CancellationToken(parent=token))
+                    self.next_seq += 1
+                    self.segments.append(segment)
+                    segments.append(segment)
+                self.boundaries.append(end)
+                self.offset = end
+            return segments, superseded
+
+    def rewind(self, segment: Segment) -> List[int]:
+        """Give a segment's text back (e.g. synthesis failed) so the next update claims it again"""
+        with self._condition:
+            return self._rewind_locked(segment.start)
+
+    def cancel(self) -> List[int]:
+        """Supersede everything; returns the segments that were not synthesized yet"""
+        with self._condition:
+            pending = [s.seq for s in self.segments if not s.finished and not s.superseded]
+            self._rewind_locked(0)
+            return pending
+
+    def _rewind_locked(self, position: int) -> List[int]:
+        # Whole claimed pieces before the edit point stay claimed
+        self.boundaries = [end for end in self.boundaries if end <= position]
+        self.offset = self.boundaries[-1] if self.boundaries else 0
+        superseded = []
+        for segment in self.segments:
+            if segment.end > self.offset and not segment.superseded:
+                segment.superseded = True
+                segment.token.cancel("superseded")
+                superseded.append(segment.seq)
+                if not segment.finished:
+                    # Nobody synthesizes it, so it must not hold up later turns
+                    self._done_seqs.add(segment.seq)
+        self.segments = [s for s in self.segments if s.end <= self.offset]
+        self._advance_locked()
+        return superseded
+
+    def _advance_locked(self):
+        while self._next_turn in self._done_seqs:
+            self._done_seqs.discard(self._next_turn)
+            self._next_turn += 1
+        self._condition.notify_all()
+
+    def wait_turn(self, segment: Segment, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every earlier segment is done. Returns False when the
+        segment was superseded meanwhile and must not be synthesized.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: segment.superseded or self._next_turn >= segment.seq, timeout
+            )
+            return not segment.superseded
+
+    def finish(self, segment: Segment):
+        """Mark a segment done (synthesized, skipped or failed) so later ones may run"""
+        with self._condition:
+            segment.finished = True
+            if segment.seq >= self._next_turn:
+                self._done_seqs.add(segment.seq)
+            self._advance_locked()
+
+class RealtimeSessionStore:
+    """Realtime sessions by id, dropped after idle_seconds without updates"""
+
+    def __init__(self, idle_seconds: float = 1800.0):
+        self.idle_seconds = idle_seconds
+        self._sessions: Dict[str, RealtimeSession] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "updates": 0,
+            "segments": 0,
+            "superseded": 0,
+            "chars_received": 0,
+            "chars_synthesized": 0
+        }
+
+    def get(self, session_id: str) -> RealtimeSession:
+        now = time.time()
+        with self._lock:
+            for stale_id in [sid for sid, s in self._sessions.items() if now - s.last_active > self.idle_seconds]:
+                self._sessions.pop(stale_id).cancel()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = RealtimeSession(session_id)
+            return session
+
+    def clear(self, session_id: str):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.record(superseded=len(session.cancel()))
+
+    def record(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self.stats[key] += value
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["active_sessions"] = len(self._sessions)
+        # Resending the full text each time would have synthesized chars_received
+        stats["synthesis_saved_ratio"] = (
+            1 - stats["chars_synthesized"] / stats["chars_received"] if stats["chars_received"] else 0.0
+        )
+        return stats
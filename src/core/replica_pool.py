@@ -0,0 +1,161 @@
+# src/core/replica_pool.py
+import time
+import logging
+import threading
+import contextlib
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest request in the smoothed latency
+LATENCY_EWMA_ALPHA = 0.2
+
+def resolve_device(device: Optional[str] = None) -> str:
+    """
+    Map a placement entry onto a usable torch device. None/"auto" picks
+    CUDA when available; CUDA indices beyond the visible GPUs wrap around,
+    and CUDA entries fall back to CPU on machines without a GPU. CPU
+    entries may carry a label ("cpu:1") to tell replicas apart; they all
+    run on "cpu".
+    """
+    import torch
+    device = (device or "auto").strip().lower()
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    if device.startswith("cuda"):
+        if not torch.cuda.is_available():
+            logger.warning(f"{device} requested but CUDA is not available, using cpu")
+            return "cpu"
+        _, _, index = device.partition(":")
+        if not index:
+            return "cuda"
+        count = torch.cuda.device_count()
+        if int(index) >= count:
+            logger.warning(f"{device} requested but only {count} GPUs are visible, using cuda:{int(index) % count}")
+        return f"cuda:{int(index) % count}"
+    return "cpu"
+
+def device_context(device: str):
+    """Make device the current CUDA device so library code that allocates on 'cuda' lands on it"""
+    if str(device).startswith("cuda:"):
+        import torch
+        return torch.cuda.device(torch.device(device))
+    return contextlib.nullcontext()
+
+class Replica:
+    def __init__(self, service, device: str, index: int):
+        self.service = service
+        self.device = device
+        self.index = index
+        self.in_flight = 0
+        self.served = 0
+        self.failures = 0
+
+class ReplicaPool:
+    """
+    N copies of one engine placed on (possibly different) devices. Requests
+    go to the replica with the fewest in-flight requests, ties broken by
+    the fewest served. Attribute lookups that the pool does not define
+    (get_voices, languages, storage, ...) go to the first replica, so a
+    pool can stand in for a single service.
+    """
+
+    def __init__(self, name: str, factory: Callable[[str], Any], devices: List[Optional[str]],
+                 device_scope: bool = True):
+        """
+        Args:
+            name: Engine name, for logging
+            factory: Builds one service for a resolved device
+            devices: One entry per replica (see resolve_device)
+            device_scope: Make the replica's device current while building and
+                calling it; off for replicas that live in another process
+        """
+        self.name = name
+        self.device_scope = device_scope
+        self.latency_ewma: Optional[float] = None
+        self._lock = threading.Lock()
+        self.replicas: List[Replica] = []
+        for index, entry in enumerate(devices or [None]):
+            device = resolve_device(entry)
+            with self._device_context(device):
+                service = factory(device)
+            self.replicas.append(Replica(service, device, index))
+            logger.info(f"{name} replica {index} placed on {device}")
+
+    def _device_context(self, device: str):
+        return device_context(device) if self.device_scope else contextlib.nullcontext()
+
+    def __getattr__(self, name):
+        if name in ("replicas", "device_scope", "latency_ewma"):
+            raise AttributeError(name)
+        return getattr(self.replicas[0].service, name)
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """Reserve the least-loaded replica for the duration of a request"""
+        with self._lock:
+            replica = min(self.replicas, key=lambda r: (r.in_flight, r.served, r.index))
+            replica.in_flight += 1
+        start_time = time.monotonic()
+        try:
+            with self._device_context(replica.device):
+                yield replica
+            elapsed = time.monotonic() - start_time
+            with self._lock:
+                self.latency_ewma = elapsed if self.latency_ewma is None else \
+                    LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+        except Exception:
+            with self._lock:
+                replica.failures += 1
+            raise
+        finally:
+            with self._lock:
+                replica.in_flight -= 1
+                replica.served += 1
+
+    def expected_wait(self) -> float:
+        """
+        Rough queueing delay for a new request: requests already in flight on
+        the least-loaded replica times the smoothed request latency.
+        """
+        with self._lock:
+            if self.latency_ewma is None:
+                return 0.0
+            return min(r.in_flight for r in self.replicas) * self.latency_ewma
+
+    def for_each_replica(self, fn: Callable[[Any], Any]) -> List[Any]:
+        """
+        Call fn(service) on every replica with its device current. Used for
+        maintenance work (warmup) that should not count as served requests
+        or move the latency average.
+        """
+        results = []
+        for replica in self.replicas:
+            with self._device_context(replica.device):
+                results.append(fn(replica.service))
+        return results
+
+    def synthesize(self, text: str, voice_id: str, session_id: str) -> str:
+        with self.acquire() as replica:
+            return replica.service.synthesize(text, voice_id, session_id)
+
+    def shutdown(self):
+        """Release replicas that hold external resources (worker processes)"""
+        for replica in self.replicas:
+            shutdown = getattr(replica.service, "shutdown", None)
+            if shutdown is not None:
+                shutdown()
+
+    def get_status(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "index": r.index,
+                    "device": r.device,
+                    "in_flight": r.in_flight,
+                    "served": r.served,
+                    "failures": r.failures,
+                    "latency_ewma": self.latency_ewma
+                }
+                for r in self.replicas
+            ]
@@ -0,0 +1,246 @@
+# src/core/scheduler.py
+import math
+import time
+import logging
+import threading
+import contextlib
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from core.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+# Served in this order; bulk only gets a slot when no interactive request waits
+PRIORITIES = (INTERACTIVE, BULK)
+
+class CostModel:
+    """
+    Per-engine synthesis cost in seconds, estimated from text length with a
+    seconds-per-character rate. Rates start from configured seeds and
+    follow observed request times (exponentially weighted).
+    """
+
+    def __init__(self, seconds_per_char: Dict[str, float], default_rate: float = 0.02, alpha: float = 0.2):
+        self.rates = dict(seconds_per_char)
+        self.default_rate = default_rate
+        self.alpha = alpha
+        self.samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, engine: str, chars: int, voice_id: Optional[str] = None) -> float:
+        with self._lock:
+            return self.rates.get(engine, self.default_rate) * max(1, chars)
+
+    def rate(self, engine: str) -> Optional[float]:
+        with self._lock:
+            return self.rates.get(engine)
+
+    def observe(self, engine: str, chars: int, seconds: float, voice_id: Optional[str] = None):
+        rate = seconds / max(1, chars)
+        with self._lock:
+            current = self.rates.get(engine)
+            self.rates[engine] = rate if current is None else self.alpha * rate + (1 - self.alpha) * current
+            self.samples[engine] = self.samples.get(engine, 0) + 1
+
+class _Ticket:
+    def __init__(self, flow: str, priority: str, cost: float):
+        self.flow = flow
+        self.priority = priority
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.granted = threading.Event()
+
+class _Flow:
+    def __init__(self):
+        self.tickets: Deque[_Ticket] = deque()
+        self.deficit = 0.0
+
+class _EngineQueue:
+    """Waiting requests of one engine: a deficit round robin over flows per priority class"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.in_use = 0
+        self.running = set()
+        # priority -> flow key -> flow, in round-robin order
+        self.flows: Dict[str, "OrderedDict[str, _Flow]"] = {priority: OrderedDict() for priority in PRIORITIES}
+        self.granted = {priority: 0 for priority in PRIORITIES}
+        self.wait_seconds = {priority: 0.0 for priority in PRIORITIES}
+
+    def queued(self, priority: str) -> List[_Ticket]:
+        return [ticket for flow in self.flows[priority].values() for ticket in flow.tickets]
+
+class FairScheduler:
+    """
+    Admission of synthesis requests to each engine.
+
+    Every engine runs at most `capacity` requests at once; the rest wait
+    here instead of piling onto the engine in arrival order. Waiting
+    requests are served by priority class (interactive before bulk) and,
+    within a class, by deficit round robin across flows (one flow per
+    session or API key): each turn a flow earns quantum seconds of credit
+    and may start requests whose estimated cost fits its credit. A user
+    submitting long texts therefore gets the same share of engine time
+    as everyone else instead of blocking them.
+    """
+
+    def __init__(self, config, cost_model=None):
+        """
+        Args:
+            config: SchedulerConfig
+            cost_model: Estimator with estimate / observe / rate (e.g. a
+                LatencyEstimator); defaults to a per-engine CostModel
+        """
+        if config.quantum_seconds <= 0:
+            raise ValueError(f"scheduler.quantum_seconds must be positive, got {config.quantum_seconds}")
+        self.config = config
+        self.cost_model = cost_model or CostModel(config.seconds_per_char, alpha=config.rate_alpha)
+        self._queues: Dict[str, _EngineQueue] = {}
+        self._lock = threading.Lock()
+
+    def set_capacity(self, engine: str, capacity: int):
+        """Concurrent requests the engine serves (replicas, or batch slots with batching)"""
+        capacity = self.config.concurrency.get(engine, capacity)
+        with self._lock:
+            queue = self._queues.setdefault(engine, _EngineQueue(capacity))
+            queue.capacity = max(1, capacity)
+            self._dispatch_locked(queue)
+
+    def capacity(self, engine: str) -> int:
+        with self._lock:
+            queue = self._queues.get(engine)
+            return queue.capacity if queue is not None else max(1, self.config.concurrency.get(engine, 1))
+
+    @contextlib.contextmanager
+    def slot(self, engine: str, flow: str, priority: str, chars: int,
+             token: Optional[CancellationToken] = None, voice_id: Optional[str] = None):
+        """
+        Wait for a turn on engine, run the block, then release the slot and
+        teach the cost model how long the block took.
+
+        Raises RequestCancelledError if the token is cancelled while waiting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
+        if not self.config.enabled:
+            start_time = time.monotonic()
+            yield
+            self.cost_model.observe(engine, chars, time.monotonic() - start_time, voice_id)
+            return
+        ticket = _Ticket(flow or "anonymous", priority, self.cost_model.estimate(engine, chars, voice_id))
+        with self._lock:
+            queue = self._queues.setdefault(engine, _EngineQueue(self.config.concurrency.get(engine, 1)))
+            queue.flows[priority].setdefault(ticket.flow, _Flow()).tickets.append(ticket)
+            self._dispatch_locked(queue)
+
+        self._wait(queue, ticket, token)
+        try:
+            yield
+            self.cost_model.observe(engine, chars, time.monotonic() - ticket.started_at, voice_id)
+        finally:
+            with self._lock:
+                queue.in_use -= 1
+                queue.running.discard(ticket)
+                self._dispatch_locked(queue)
+
+    def _wait(self, queue: _EngineQueue, ticket: _Ticket, token: Optional[CancellationToken]):
+        while not ticket.granted.wait(0.05 if token is not None else None):
+            if token.cancelled:
+                with self._lock:
+                    if not ticket.granted.is_set():
+                        flow = queue.flows[ticket.priority].get(ticket.flow)
+                        if flow is not None and ticket in flow.tickets:
+                            flow.tickets.remove(ticket)
+                            if not flow.tickets:
+                                del queue.flows[ticket.priority][ticket.flow]
+                        token.check()
+                # Granted just before the cancel: take the slot and let the engine stop at its checkpoint
+                break
+
+    def _dispatch_locked(self, queue: _EngineQueue):
+        """Start waiting requests while the engine has free slots"""
+        while queue.in_use < queue.capacity:
+            ticket = self._next_ticket_locked(queue)
+            if ticket is None:
+                return
+            queue.in_use += 1
+            ticket.started_at = time.monotonic()
+            queue.running.add(ticket)
+            queue.granted[ticket.priority] += 1
+            queue.wait_seconds[ticket.priority] += time.monotonic() - ticket.enqueued_at
+            ticket.granted.set()
+
+    def _next_ticket_locked(self, queue: _EngineQueue) -> Optional[_Ticket]:
+        quantum = self.config.quantum_seconds
+        for priority in PRIORITIES:
+            flows = queue.flows[priority]
+            if not flows:
+                continue
+            # The rounds are granted in one step rather than quantum by quantum:
+            # the first flow (in round order) needing the fewest quanta before
+            # its head request fits its credit is served next
+            keys = list(flows)
+            needs = [
+                max(0, math.ceil((flow.tickets[0].cost - flow.deficit) / quantum))
+                for flow in flows.values()
+            ]
+            rounds = min(needs)
+            winner = needs.index(rounds)
+            for index, key in enumerate(keys):
+                # Flows ahead of the winner earn a quantum in the winning round too
+                flows[key].deficit += (rounds + 1 if index < winner else rounds) * quantum
+            for key in keys[:winner]:
+                # Passed over this round: to the back
+                flows.move_to_end(key)
+
+            key = keys[winner]
+            flow = flows[key]
+            head = flow.tickets.popleft()
+            flow.deficit -= head.cost
+            if not flow.tickets:
+                # An idle flow keeps no credit
+                del flows[key]
+            return head
+        return None
+
+    def expected_wait(self, engine: str, priority: str = INTERACTIVE) -> float:
+        """
+        Predicted queueing delay for a new request: the estimated work still
+        left on running requests (when every slot is taken) plus the work
+        waiting at the same or a higher priority, spread over the engine's slots
+        """
+        now = time.monotonic()
+        with self._lock:
+            queue = self._queues.get(engine)
+            if queue is None:
+                return 0.0
+            ahead = PRIORITIES[:PRIORITIES.index(priority) + 1] if priority in PRIORITIES else PRIORITIES
+            backlog = sum(ticket.cost for p in ahead for ticket in queue.queued(p))
+            if queue.in_use >= queue.capacity:
+                backlog += sum(max(0.0, ticket.cost - (now - ticket.started_at)) for ticket in queue.running)
+            return backlog / queue.capacity
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            status = {}
+            for engine, queue in self._queues.items():
+                status[engine] = {
+                    "capacity": queue.capacity,
+                    "in_use": queue.in_use,
+                    "seconds_per_char": self.cost_model.rate(engine),
+                    "classes": {
+                        priority: {
+                            "queued": len(queue.queued(priority)),
+                            "flows": len(queue.flows[priority]),
+                            "granted": queue.granted[priority],
+                            "mean_wait_seconds": queue.wait_seconds[priority] / queue.granted[priority]
+                            if queue.granted[priority] else 0.0
+                        }
+                        for priority in PRIORITIES
+                    }
+                }
+            return status
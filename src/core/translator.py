@@ -1,6 +1,4 @@
 from typing import Dict
-from google.cloud import translate_v2 as translate
-from google.oauth2 import service_account
 import html
 import logging
 from pathlib import Path
@@ -15,7 +13,7 @@ class Translator:
         self.logger = logging.getLogger(__name__)
         self.client = self._initialize_client(config.paths.google_credentials)
 
-    def _initialize_client(self, credentials_path: str) -> translate.Client:
+    def _initialize_client(self, credentials_path: str) -> "translate.Client":
         """
         Initialize the translation client with proper credentials handling.
         
@@ -38,6 +36,10 @@ class Translator:
                     details={"credentials_path": str(cred_path)}
                 )
 
+            # google-cloud-translate is imported here, not at module load
+            from google.cloud import translate_v2 as translate
+            from google.oauth2 import service_account
+
             # Load credentials from the JSON file
             credentials = service_account.Credentials.from_service_account_file(
                 str(cred_path),
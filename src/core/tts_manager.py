@@ -1,28 +1,94 @@
 import logging
-from typing import Optional
+import importlib
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 import threading
 import time
-import torch
 
 import os
 import sys
+from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.ConfigLoader import AppConfig
 
 from core.translator import Translator
 from core.file_cleanup import AudioFileCleanup
+from core.audio_storage import AudioStorage
 from core.voice_info_engine import VoiceEngine
+from core.replica_pool import ReplicaPool
+from core.engine_worker import EngineWorker
+from core.circuit_breaker import CircuitBreaker, OPEN
+from core.warmup import warmup_pool
+from core.realtime_session import RealtimeSessionStore, Segment
+from core.error_handlers import (
+    CudaError, EngineUnavailableError, EngineOverloadedError, EngineWorkerError, RequestCancelledError
+)
+from core.cancellation import CancellationToken, bind_token
+from core.scheduler import FairScheduler, INTERACTIVE
+from core.latency_estimator import LatencyEstimator
+from core.batch_synthesis import BatchJobStore
 
-from services.IndicService import IndicService
-from services.KokoroService import KokoroService
-from services.PollyService import PollyService
-from services.ViXttsService import ViXttsService
-from services.XttsService import XttsService
+# voice_id prefix -> (engine name, service class name) for the rebuildable local engines.
+# Service modules (services/<class name>.py) pull in torch, TTS, transformers,
+# kokoro or boto3, so they are imported only when their engine is loaded.
+ENGINE_SERVICES = {
+    'xtts_': ('xtts', 'XttsService'),
+    'kokoro_': ('kokoro', 'KokoroService'),
+    'vixtts': ('vixtts', 'ViXttsService'),
+    'indic_': ('indic', 'IndicService')
+}
+
+VOICE_ENGINES = {
+    'xtts_': VoiceEngine.XTTS,
+    'kokoro_': VoiceEngine.KOKORO,
+    'vixtts': VoiceEngine.VIETNAMESE_XTTS,
+    'indic_': VoiceEngine.INDIC_PARLER
+}
+
+SERVICE_CLASSES = {'PollyService'} | {class_name for _, class_name in ENGINE_SERVICES.values()}
+
+def _service_class(class_name: str):
+    """Service class by name, importing its module on first use"""
+    service_class = globals().get(class_name)
+    if service_class is None:
+        service_class = getattr(importlib.import_module(f"services.{class_name}"), class_name)
+        globals()[class_name] = service_class
+    return service_class
+
+def __getattr__(name):
+    # Keeps core.tts_manager.XttsService (and patching it) working without an eager import
+    if name in SERVICE_CLASSES:
+        return _service_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@dataclass
+class SynthesisResult:
+    filename: Optional[str]
+    # Voice and engine that actually produced the audio
+    voice_id: str
+    engine: str
+    requested_voice_id: str
+    fallback: bool = False
+    # Why the request was rerouted: breaker_open, overloaded or failed
+    fallback_reason: Optional[str] = None
+
+    def served_by(self) -> dict:
+        return {
+            "engine": self.engine,
+            "voice_id": self.voice_id,
+            "fallback": self.fallback,
+            "fallback_reason": self.fallback_reason
+        }
 
 class TTSManager:
     def __init__(self, config: AppConfig):
         self.config = config
+        self.base_dir = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.audio_dir = self.base_dir / config.directories.audio_output_dir
+        self.storage = AudioStorage(str(self.audio_dir), config.directories.audio_bucket_minutes)
         self._voices = {}
         self._lock = threading.Lock()
 
@@ -39,72 +105,218 @@ class TTSManager:
             'vixtts': 0,
             'indic_': 0
         }
-        self._recovery_cooldown = 60  # Minimum seconds between recovery attempts
+        self._recovery_cooldown = config.recovery.cooldown_seconds  # Minimum seconds between recovery attempts
+        self.breakers = {
+            prefix: CircuitBreaker(
+                engine,
+                failure_threshold=config.recovery.failure_threshold,
+                open_seconds=config.recovery.open_seconds
+            )
+            for prefix, (engine, _) in ENGINE_SERVICES.items()
+        }
+        self._fallback_counts = {prefix: {} for prefix in ENGINE_SERVICES}
+        self.startup_report = {}
+        # Engine readiness: loading -> warming -> ready | failed, or disabled
+        self.engine_states = {
+            engine: 'loading' if engine in config.startup.engines else 'disabled'
+            for engine, _ in ENGINE_SERVICES.values()
+        }
+        self.engine_errors: Dict[str, str] = {}
+        self._engine_ready = {engine: threading.Event() for engine, _ in ENGINE_SERVICES.values()}
+        self.service_map = {}
+        # Synthesis time per engine and voice, learned online; prices the scheduler's queue
+        self.latency = LatencyEstimator(config.latency, priors=config.scheduler.seconds_per_char)
+        if config.latency.seed_results_dir:
+            self.latency.seed_from_results(self.base_dir / config.latency.seed_results_dir, self.engine_for_voice)
+        # Per-engine admission: priority classes and fair shares across sessions
+        self.scheduler = FairScheduler(config.scheduler, cost_model=self.latency)
+        self.batch_jobs = BatchJobStore(self, config.batch, self.base_dir)
+        # Outlives reinitialize(): sessions keep their offsets across a full recover
+        self.realtime_sessions = RealtimeSessionStore(config.realtime.session_idle_seconds)
         
         self.init_class()
         self._update_voices()
         
         # Initialize cleanup service
         self.cleanup_service = AudioFileCleanup(
-            directory=self.config.directories.audio_output_dir,
+            directory=str(self.audio_dir),
             max_age_hours=config.cleanup.max_age_hours,
             min_free_space_mb=config.cleanup.min_free_space_mb,
-            cleanup_interval_minutes=config.cleanup.cleanup_interval_minutes
+            cleanup_interval_minutes=config.cleanup.cleanup_interval_minutes,
+            storage=self.storage
         )
         self.cleanup_service.start()
 
-    def init_class(self):
-        """Initialize all services"""
+    def init_class(self, background: Optional[bool] = None):
+        """
+        Initialize all services. Local engines load concurrently; with
+        background loading this returns before they are ready and each
+        engine is swapped in as soon as it has loaded.
+        """
         try:
-            self.polly = PollyService(self.config)
+            self.polly = _service_class('PollyService')(self.config)
             logging.info("Polly is ready!")
         except Exception as e:
+            self.polly = None
             logging.error(f"Failed to initialize Polly: {e}")
-            
-        try:
-            self.xtts = XttsService(self.config)
-            logging.info("xtts-v2 is ready!")
-        except Exception as e:
-            raise e
 
-        try:
-            self.vixtts = ViXttsService(self.config)
-            logging.info("Vietnamese XTTS is ready!")
-        except Exception as e:
-            raise e
+        self.translator = Translator(self.config)
+        self._load_engines(self.config.startup.background if background is None else background)
 
-        try:
-            self.indic = IndicService(self.config)
-            logging.info("Indic Parler TTS is ready!")
-        except Exception as e:
-            raise e
+    def _load_engines(self, background: bool):
+        """Load every local engine in a thread pool; downloads and deserialization overlap"""
+        start_time = time.time()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.startup.max_workers),
+            thread_name_prefix="engine-init"
+        )
+        futures = [
+            executor.submit(self._load_engine, prefix)
+            for prefix, (engine, _) in ENGINE_SERVICES.items()
+            if engine in self.config.startup.engines
+        ]
+        executor.shutdown(wait=False)
+
+        def finish():
+            wait(futures)
+            self._log_startup_report(time.time() - start_time)
 
+        if background:
+            threading.Thread(target=finish, daemon=True, name="engine-init-report").start()
+            return
+        finish()
+        for future in futures:
+            # Surface the first load failure like the sequential loader did
+            future.result()
+
+    def _load_engine(self, service_prefix: str):
+        engine, class_name = ENGINE_SERVICES[service_prefix]
+        if service_prefix not in self.service_map:
+            self.engine_states[engine] = 'loading'
         try:
-            self.kokoro = KokoroService(self.config)
-            logging.info("Kokoro pipelines are ready!")
+            pool = self._create_pool(engine, class_name)
+            if service_prefix not in self.service_map:
+                self.engine_states[engine] = 'warming'
+            self._warmup(engine, pool)
         except Exception as e:
-            raise e
+            logging.error(f"Failed to initialize {engine}: {e}")
+            if service_prefix not in self.service_map:
+                self.engine_states[engine] = 'failed'
+            self.engine_errors[engine] = str(e)
+            raise
+        self._install_engine(service_prefix, pool)
+        logging.info(f"{engine} is ready!")
+
+    def _install_engine(self, service_prefix: str, pool):
+        """Atomically put a built pool in service, then release the one it replaces"""
+        engine = ENGINE_SERVICES[service_prefix][0]
+        with self._lock:
+            old_pool = self.service_map.get(service_prefix)
+            self.service_map[service_prefix] = pool
+            setattr(self, engine, pool)
+            self.engine_states[engine] = 'ready'
+            self.engine_errors.pop(engine, None)
+        self.scheduler.set_capacity(engine, self._engine_concurrency(engine, pool))
+        self._engine_ready[engine].set()
+        if old_pool is not None and old_pool is not pool:
+            old_pool.shutdown()
+        self._update_voices()
 
-        self.service_map = {
-            'xtts_': self.xtts,
-            'kokoro_': self.kokoro,
-            'vixtts': self.vixtts,
-            'indic_': self.indic
+    def _engine_concurrency(self, engine: str, pool) -> int:
+        """Requests an engine usefully runs at once: one per replica, or a batch per replica"""
+        if engine == 'xtts' and self.config.inference.continuous_batching:
+            return len(pool.replicas) * self.config.inference.max_batch_size
+        return len(pool.replicas)
+
+    def get_readiness(self) -> Dict:
+        """Per-engine readiness with load times; ready once every enabled local engine is serving"""
+        engines = {}
+        for engine, state in self.engine_states.items():
+            report = self.startup_report.get(engine) or {}
+            engines[engine] = {
+                "state": state,
+                "load_seconds": report.get("seconds"),
+                "warmup_seconds": (report.get("warmup") or {}).get("seconds")
+            }
+            if engine in self.engine_errors:
+                engines[engine]["error"] = self.engine_errors[engine]
+        return {
+            "ready": all(info["state"] in ('ready', 'disabled') for info in engines.values()),
+            "engines": engines,
+            "polly": getattr(self, 'polly', None) is not None
         }
 
-        self.speech_queue = {}
-        self.translator = Translator(self.config)
+    def _warmup(self, engine: str, pool):
+        """Prime a freshly built pool before it is put in service"""
+        warmup = self.config.warmup
+        if not warmup.enabled:
+            return
+        batch_sizes = []
+        if engine == 'xtts' and self.config.inference.continuous_batching:
+            batch_sizes = [size for size in warmup.batch_sizes if 1 < size <= self.config.inference.max_batch_size]
+        report = warmup_pool(pool, warmup, batch_sizes)
+        self.startup_report.setdefault(engine, {})["warmup"] = report
+        logging.info(f"{engine} warmed up in {report['seconds']:.1f}s")
+
+    def _create_pool(self, engine: str, class_name: str):
+        """Build the replicas of an engine on the devices given by the placement config"""
+        start_time = time.time()
+        pool = self._build_pool(engine, class_name)
+        self.startup_report[engine] = {
+            "seconds": round(time.time() - start_time, 3),
+            "replicas": [getattr(r.service, 'load_timings', {}) for r in pool.replicas]
+        }
+        return pool
+
+    def _build_pool(self, engine: str, class_name: str):
+        devices = self.config.placement.engines.get(engine) or [None]
+        workers = self.config.workers
+        if workers.enabled and engine in workers.engines:
+            # Only the worker process imports the engine's libraries
+            spec = f"services.{class_name}:{class_name}"
+            return ReplicaPool(
+                engine,
+                lambda device: EngineWorker(
+                    engine,
+                    spec,
+                    self.config,
+                    device=device,
+                    storage=self.storage,
+                    start_timeout=workers.start_timeout_seconds,
+                    request_timeout=workers.request_timeout_seconds,
+                    max_restarts=workers.max_restarts,
+                    buffer_bytes=workers.buffer_mb * 1024 * 1024
+                ),
+                devices,
+                device_scope=False
+            )
+        service_class = _service_class(class_name)
+        return ReplicaPool(engine, lambda device: service_class(self.config, device=device), devices)
+
+    def _log_startup_report(self, elapsed: float):
+        for engine, report in self.startup_report.items():
+            phases = ", ".join(
+                f"{phase} {seconds:.1f}s" for phase, seconds in (report["replicas"][0] if report["replicas"] else {}).items()
+            )
+            warmup = f", warmup {report['warmup']['seconds']:.1f}s" if report.get("warmup") else ""
+            logging.info(f"Startup: {engine} loaded in {report['seconds']:.1f}s ({phases or 'no phase timings'}){warmup}")
+        # The sum is roughly what loading the engines one after another would take
+        sequential = sum(
+            report['seconds'] + (report.get('warmup') or {}).get('seconds', 0)
+            for report in self.startup_report.values()
+        )
+        logging.info(f"Startup: engines loaded in {elapsed:.1f}s (sum of engine load times {sequential:.1f}s)")
 
     def _update_voices(self):
         """Update available voices from all services"""
         try:
+            # Engines that are still loading contribute no voices yet
             grouped_voices = {
-                VoiceEngine.POLLY.value: self.polly.get_voices(),
-                VoiceEngine.XTTS.value: self.xtts.get_voices(),
-                VoiceEngine.KOKORO.value: self.kokoro.get_voices(),
-                VoiceEngine.VIETNAMESE_XTTS.value: self.vixtts.get_voices(),
-                VoiceEngine.INDIC_PARLER.value: self.indic.get_voices()
+                VOICE_ENGINES[prefix].value: pool.get_voices()
+                for prefix, pool in list(self.service_map.items())
             }
+            if getattr(self, 'polly', None) is not None:
+                grouped_voices[VoiceEngine.POLLY.value] = self.polly.get_voices()
             
             self._voices = {
                 engine: {
@@ -125,23 +337,289 @@ class TTSManager:
         return self._voices
 
     def _get_service_for_voice(self, voice_id: str):
-        """Get the appropriate service and prefix for a voice ID"""
-        for prefix, service in self.service_map.items():
+        """Get the appropriate service and prefix for a voice ID; the service is None while the engine loads"""
+        for prefix in ENGINE_SERVICES:
             if voice_id.startswith(prefix):
-                return prefix, service
+                return prefix, self.service_map.get(prefix)
         return None, self.polly  # Default to Polly
 
-    def synthesize_speech(self, text: str, voice_id: str, session_id: str) -> Optional[str]:
-        try:
-            # Get service and prefix based on voice_id
-            service_prefix, service = self._get_service_for_voice(voice_id)
-            
-            return service.synthesize(text, voice_id, session_id)
+    def _engine_name(self, service_prefix: Optional[str]) -> str:
+        return ENGINE_SERVICES[service_prefix][0] if service_prefix in ENGINE_SERVICES else 'polly'
 
+    def engine_for_voice(self, voice_id: str) -> str:
+        """Engine that serves a voice (polly for voices of no local engine)"""
+        for prefix, (engine, _) in ENGINE_SERVICES.items():
+            if voice_id.startswith(prefix):
+                return engine
+        return 'polly'
+
+    def estimate_latency(self, voice_id: str, chars: int, priority: str = INTERACTIVE) -> Dict:
+        """Predicted queue wait and synthesis time for a request of chars characters"""
+        engine = self.engine_for_voice(voice_id)
+        service_seconds, model = self.latency.predict(engine, chars, voice_id)
+        queue_seconds = self.scheduler.expected_wait(engine, priority) if engine != 'polly' else 0.0
+        return {
+            "engine": engine,
+            "voice_id": voice_id,
+            "chars": chars,
+            "priority": priority,
+            "queue_seconds": round(queue_seconds, 3),
+            "service_seconds": round(service_seconds, 3),
+            "total_seconds": round(queue_seconds + service_seconds, 3),
+            # voice, engine or prior: which fit the prediction came from
+            "model": model
+        }
+
+    def _admit(self, text: str, voice_id: str, priority: str, token: Optional[CancellationToken]):
+        """
+        Turn a request away before it queues when its predicted wait is over
+        the priority's limit, or when it would finish after its deadline
+        anyway. Retry-After is the predicted time for the queue to drain.
+        """
+        admission = self.config.admission
+        if not admission.enabled or not self.config.scheduler.enabled:
+            return
+        estimate = self.estimate_latency(voice_id, len(text), priority)
+        queue_seconds = estimate["queue_seconds"]
+        if queue_seconds <= 0:
+            # An idle engine always takes the request; the deadline stops it if need be
+            return
+        limit = admission.max_queue_seconds.get(priority, 0)
+        remaining = token.remaining() if token is not None else None
+        if limit and queue_seconds > limit:
+            reason = f"predicted queue wait {queue_seconds:.1f}s is over {limit:.0f}s"
+        elif admission.reject_past_deadline and remaining is not None and estimate["total_seconds"] > remaining:
+            reason = f"predicted completion in {estimate['total_seconds']:.1f}s is past the request deadline"
+        else:
+            return
+        raise EngineOverloadedError(
+            message=f"{estimate['engine']} is overloaded: {reason}",
+            engine=estimate["engine"],
+            retry_after=queue_seconds,
+            predicted_seconds=estimate["total_seconds"]
+        )
+
+    def _fallback_reason(self, service_prefix: Optional[str], service,
+                         priority: str = INTERACTIVE) -> Optional[str]:
+        """Why a request for this engine should skip it, or None to try it"""
+        if service is None:
+            return 'not_ready'
+        breaker = self.breakers.get(service_prefix)
+        if breaker is not None and breaker.state == OPEN:
+            return 'breaker_open'
+        expected_wait = getattr(service, 'expected_wait', None)
+        if expected_wait is not None:
+            if self.config.scheduler.enabled:
+                # Requests queued ahead plus what is left of the running ones
+                wait = self.scheduler.expected_wait(self._engine_name(service_prefix), priority)
+            else:
+                wait = expected_wait()
+            if wait > self.config.fallback.latency_budget_seconds:
+                return 'overloaded'
+        return None
+
+    def route_speech(self, text: str, voice_id: str, session_id: str,
+                     token: Optional[CancellationToken] = None, priority: str = INTERACTIVE,
+                     flow: Optional[str] = None) -> SynthesisResult:
+        """
+        Synthesize with the requested voice, or with its configured fallback
+        voice when the primary engine's breaker is open, its expected queue
+        wait exceeds the latency budget, or it fails at the engine level
+        (CUDA error, open breaker, dead worker). The result records which
+        engine served the request.
+        """
+        service_prefix, service = self._get_service_for_voice(voice_id)
+        fallback_voice = self.config.fallback.voices.get(voice_id) if self.config.fallback.enabled else None
+
+        reason = self._fallback_reason(service_prefix, service, priority) if fallback_voice else None
+        if reason is None:
+            try:
+                filename = self.synthesize_speech(text, voice_id, session_id, token, priority, flow)
+                return SynthesisResult(filename, voice_id, self._engine_name(service_prefix), voice_id)
+            except (CudaError, EngineUnavailableError, EngineWorkerError) as e:
+                if not fallback_voice:
+                    raise
+                logging.warning(f"{voice_id} failed ({e.message}), falling back to {fallback_voice}")
+                reason = 'overloaded' if isinstance(e, EngineOverloadedError) else 'failed'
+
+        if service_prefix in self._fallback_counts:
+            with self._lock:
+                counts = self._fallback_counts[service_prefix]
+                counts[reason] = counts.get(reason, 0) + 1
+        fallback_prefix, _ = self._get_service_for_voice(fallback_voice)
+        filename = self.synthesize_speech(text, fallback_voice, session_id, token, priority, flow)
+        return SynthesisResult(
+            filename,
+            fallback_voice,
+            self._engine_name(fallback_prefix),
+            voice_id,
+            fallback=True,
+            fallback_reason=reason
+        )
+
+    def synthesize_speech(self, text: str, voice_id: str, session_id: str,
+                          token: Optional[CancellationToken] = None, priority: str = INTERACTIVE,
+                          flow: Optional[str] = None) -> Optional[str]:
+        """
+        Synthesize with one voice. token carries the request's cancellation
+        and deadline; it is checked before the engine is called and bound
+        for the engine's own checkpoints (between segments / decode steps).
+
+        Local engines are entered through the scheduler: the request waits
+        for its turn by priority (interactive or bulk) and by fair share of
+        its flow (API key, defaulting to the session).
+        """
+        if token is not None:
+            token.check()
+        # Get service and prefix based on voice_id
+        service_prefix, service = self._get_service_for_voice(voice_id)
+        if service is None:
+            service = self._wait_for_engine(service_prefix)
+        if service_prefix in ENGINE_SERVICES:
+            self._admit(text, voice_id, priority, token)
+        breaker = self.breakers.get(service_prefix)
+        if breaker is not None and not breaker.allow_request():
+            engine = ENGINE_SERVICES[service_prefix][0]
+            raise EngineUnavailableError(
+                message=f"{engine} is recovering from a failure, please retry shortly",
+                engine=engine,
+                retry_after=breaker.retry_after()
+            )
+
+        engine_started = False
+        try:
+            if service_prefix in ENGINE_SERVICES:
+                slot = self.scheduler.slot(ENGINE_SERVICES[service_prefix][0], flow or session_id, priority,
+                                           len(text), token, voice_id)
+            else:
+                slot = contextlib.nullcontext()
+            with slot, bind_token(token):
+                engine_started = True
+                filename = service.synthesize(text, voice_id, session_id)
         except Exception as e:
+            if breaker is not None:
+                if not engine_started or isinstance(e, RequestCancelledError):
+                    # Cancelled or rejected before the engine gave an answer: no verdict on its health
+                    breaker.release_probe()
+                else:
+                    # Converts CUDA failures into CudaError (raised from there)
+                    self._record_failure(service_prefix, breaker, e)
             raise e
+        if breaker is not None:
+            breaker.record_success()
+
+        audio_path = self.storage.resolve(filename) if filename else None
+        if audio_path is not None:
+            # Feed the cleanup index so it never has to scan the directory
+            self.cleanup_service.register_file(audio_path)
+        return filename
 
-    def _try_recovery(self, service_prefix: str):
+    def _wait_for_engine(self, service_prefix: str):
+        """Give a loading engine up to wait_for_engine_seconds, then reject the request"""
+        if service_prefix is None:
+            raise EngineUnavailableError(message="Polly is not available", engine="polly")
+        engine = ENGINE_SERVICES[service_prefix][0]
+        if self.engine_states[engine] == 'disabled':
+            raise EngineUnavailableError(message=f"{engine} is not enabled on this server", engine=engine)
+        self._engine_ready[engine].wait(self.config.startup.wait_for_engine_seconds)
+        service = self.service_map.get(service_prefix)
+        if service is not None:
+            return service
+        if self.engine_states[engine] == 'failed':
+            raise EngineUnavailableError(
+                message=f"{engine} failed to load: {self.engine_errors.get(engine)}",
+                engine=engine,
+                retry_after=self.config.recovery.open_seconds
+            )
+        raise EngineUnavailableError(
+            message=f"{engine} is still loading, please retry shortly",
+            engine=engine,
+            retry_after=self.config.startup.loading_retry_after_seconds
+        )
+
+    def _record_failure(self, service_prefix: str, breaker: CircuitBreaker, error: Exception):
+        """
+        Count a CUDA failure against the engine's breaker and start a
+        background rebuild once it opens. Other errors mean the engine
+        itself answered, so they count as a healthy response.
+        """
+        if not (isinstance(error, CudaError) or CudaError.is_cuda_error(error)):
+            breaker.record_success()
+            return
+        engine = ENGINE_SERVICES[service_prefix][0]
+        breaker.record_failure()
+        if breaker.state == OPEN:
+            self._schedule_recovery(service_prefix)
+        if not isinstance(error, CudaError):
+            raise CudaError(
+                message=getattr(error, 'message', str(error)),
+                model_name=engine,
+                details={"retry_after": breaker.retry_after()}
+            ) from error
+
+    def _schedule_recovery(self, service_prefix: str, respect_cooldown: bool = True) -> bool:
+        """Rebuild one engine in the background; returns False if a rebuild is already running"""
+        if self._recovery_in_progress[service_prefix]:
+            return False
+        threading.Thread(
+            target=self._try_recovery,
+            args=(service_prefix, respect_cooldown),
+            daemon=True,
+            name=f"recover-{service_prefix.rstrip('_')}"
+        ).start()
+        return True
+
+    def recover_engine(self, engine: str) -> bool:
+        """Start a rebuild of one engine by name (xtts, vixtts, indic, kokoro), ignoring the cooldown"""
+        for prefix, (name, _) in ENGINE_SERVICES.items():
+            if name == engine:
+                if self.engine_states[name] == 'disabled':
+                    raise ValueError(f"Engine {engine} is not enabled")
+                return self._schedule_recovery(prefix, respect_cooldown=False)
+        raise ValueError(f"Unknown engine: {engine}")
+
+    def recover_open_engines(self) -> list:
+        """Start rebuilds for every engine whose breaker is open"""
+        return [
+            ENGINE_SERVICES[prefix][0]
+            for prefix, breaker in self.breakers.items()
+            if breaker.state == OPEN and self._schedule_recovery(prefix, respect_cooldown=False)
+        ]
+
+    def get_metrics(self):
+        """Per-engine generation length-control counters and batching status"""
+        metrics = {}
+        scheduler_status = self.scheduler.get_status()
+        for prefix, pool in list(self.service_map.items()):
+            replicas = []
+            for status, replica in zip(pool.get_status(), pool.replicas):
+                if isinstance(replica.service, EngineWorker):
+                    status['worker'] = replica.service.get_status()
+                    status.update(replica.service.get_metrics())
+                    replicas.append(status)
+                    continue
+                generation_control = getattr(replica.service, 'generation_control', None)
+                if generation_control is not None:
+                    status['generation'] = generation_control.get_metrics()
+                batcher = getattr(replica.service, 'batcher', None)
+                if batcher is not None:
+                    status['batching'] = batcher.get_status()
+                phoneme_cache = getattr(replica.service, 'phoneme_cache', None)
+                if phoneme_cache is not None:
+                    status['phoneme_cache'] = phoneme_cache.get_status()
+                replicas.append(status)
+            metrics[prefix.rstrip('_')] = {
+                'replicas': replicas,
+                'breaker': self.breakers[prefix].get_status(),
+                'recovering': self._recovery_in_progress[prefix],
+                'expected_wait': pool.expected_wait(),
+                'fallbacks': dict(self._fallback_counts[prefix]),
+                'startup': self.startup_report.get(ENGINE_SERVICES[prefix][0]),
+                'scheduler': scheduler_status.get(ENGINE_SERVICES[prefix][0])
+            }
+        return metrics
+
+    def _try_recovery(self, service_prefix: str, respect_cooldown: bool = True):
         """Attempt recovery for a specific service with cooldown and lock protection"""
         current_time = time.time()
         
@@ -149,15 +627,17 @@ class TTSManager:
             if self._recovery_in_progress[service_prefix]:
                 return False
                 
-            if current_time - self._last_recovery_time.get(service_prefix, 0) < self._recovery_cooldown:
+            if respect_cooldown and current_time - self._last_recovery_time.get(service_prefix, 0) < self._recovery_cooldown:
                 return False
                 
             self._recovery_in_progress[service_prefix] = True
+            # Failed rebuilds count too, so a broken engine is not rebuilt in a loop
+            self._last_recovery_time[service_prefix] = current_time
         
         try:
             logging.info(f"Starting recovery for service: {service_prefix}")
             self._reinitialize_service(service_prefix)
-            self._last_recovery_time[service_prefix] = current_time
+            self.breakers[service_prefix].reset()
             logging.info(f"Service recovery completed successfully for {service_prefix}")
             return True
         except Exception as e:
@@ -166,46 +646,96 @@ class TTSManager:
         finally:
             self._recovery_in_progress[service_prefix] = False
 
+    def speak_realtime(self, text: str, voice_id: str, session_id: str, target_language: Optional[str] = None,
+                       final: bool = False, token: Optional[CancellationToken] = None,
+                       priority: str = INTERACTIVE, flow: Optional[str] = None
+                       ) -> Tuple[List[Tuple[Segment, SynthesisResult]], List[int]]:
+        """
+        Synthesize what is new in a realtime typing session.
+
+        text is everything typed so far; only sentences completed since the
+        session's last update are synthesized (final=True also speaks the
+        unfinished tail). Segments play back in sequence order: each waits
+        until the session's earlier segments are done, and segments
+        superseded by an edit are skipped or cancelled mid-synthesis.
+
+        Returns:
+            ([(segment, result)] for the audio produced, superseded sequence numbers)
+        """
+        session = self.realtime_sessions.get(session_id)
+        segments, superseded = session.update(text, final, token)
+        self.realtime_sessions.record(
+            updates=1, chars_received=len(text), segments=len(segments), superseded=len(superseded)
+        )
+        results = []
+        pending = list(segments)
+        try:
+            while pending:
+                segment = pending.pop(0)
+                if not session.wait_turn(segment):
+                    session.finish(segment)
+                    continue
+                try:
+                    segment_text = segment.text
+                    if target_language:
+                        segment_text = self.translator.translate_text(segment_text, target_language)
+                    result = self.route_speech(segment_text, voice_id, session_id, segment.token, priority, flow)
+                except RequestCancelledError:
+                    if segment.superseded:
+                        # An edit replaced this sentence while it was being synthesized
+                        continue
+                    session.rewind(segment)
+                    raise
+                except Exception:
+                    # Hand the text back so the next update retries it
+                    session.rewind(segment)
+                    raise
+                finally:
+                    session.finish(segment)
+                if segment.superseded:
+                    continue
+                self.realtime_sessions.record(chars_synthesized=len(segment.text))
+                results.append((segment, result))
+        finally:
+            # Segments after a failure were superseded by the rewind; release their turns
+            for segment in pending:
+                session.finish(segment)
+        return results, superseded
+
     def clear_session(self, session_id: str):
-        """Clear session data"""
-        if session_id in self.speech_queue:
-            del self.speech_queue[session_id]
+        """Clear session data; segments still waiting to be synthesized are dropped"""
+        self.realtime_sessions.clear(session_id)
 
     def _reinitialize_service(self, service_prefix: str):
-        """Reinitialize a specific service"""
+        """
+        Rebuild a specific service and swap it in atomically. The old pool
+        keeps its place in service_map until the new one is ready, so
+        requests never see a half-built engine.
+        """
         logging.info(f"Reinitializing service: {service_prefix}")
-        
-        # Clear CUDA cache for GPU services
-        if service_prefix in ['xtts_', 'vixtts', 'indic_', 'kokoro_']:
-            try:
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-                    logging.info(f"CUDA cache cleared for {service_prefix}")
-            except Exception as e:
-                logging.warning(f"Failed to clear CUDA cache for {service_prefix}: {e}")
+        engine, class_name = ENGINE_SERVICES[service_prefix]
 
-        # Reinitialize specific service
         try:
-            if service_prefix == 'xtts_':
-                self.xtts = XttsService(self.config)
-                self.service_map['xtts_'] = self.xtts
-            elif service_prefix == 'kokoro_':
-                self.kokoro = KokoroService(self.config)
-                self.service_map['kokoro_'] = self.kokoro
-            elif service_prefix == 'vixtts':
-                self.vixtts = ViXttsService(self.config)
-                self.service_map['vixtts'] = self.vixtts
-            elif service_prefix == 'indic_':
-                self.indic = IndicService(self.config)
-                self.service_map['indic_'] = self.indic
-                
-            self._update_voices()  # Update voice list after reinitialization
-            logging.info(f"Successfully reinitialized {service_prefix}")
-            
+            new_pool = self._create_pool(engine, class_name)
+            # The old pool keeps serving while the new one warms up
+            self._warmup(engine, new_pool)
         except Exception as e:
             logging.error(f"Failed to reinitialize {service_prefix}: {e}")
             raise
 
+        self._install_engine(service_prefix, new_pool)
+
+        # Clear CUDA cache for GPU services
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+                logging.info(f"CUDA cache cleared for {service_prefix}")
+        except Exception as e:
+            logging.warning(f"Failed to clear CUDA cache for {service_prefix}: {e}")
+
+        logging.info(f"Successfully reinitialized {service_prefix}")
+
     def reinitialize(self):
         """Full reinitialization of all services - use sparingly"""
         logging.info("Starting full service reinitialization...")
@@ -215,15 +745,18 @@ class TTSManager:
         
         # Clear any existing GPU memory
         try:
+            import torch
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
                 logging.info("CUDA cache cleared")
         except Exception as e:
             logging.warning(f"Failed to clear CUDA cache: {e}")
         
-        # Reinitialize all services
-        self.init_class()
+        # Reinitialize all services; each old pool serves until its replacement is in
+        self.init_class(background=False)
         self._update_voices()
+        for breaker in self.breakers.values():
+            breaker.reset()
         
         # Restart cleanup service
         self.cleanup_service.start()
@@ -233,3 +766,5 @@ class TTSManager:
         """Cleanup when the manager is destroyed"""
         if hasattr(self, 'cleanup_service'):
             self.cleanup_service.stop()
+        for pool in getattr(self, 'service_map', {}).values():
+            pool.shutdown()
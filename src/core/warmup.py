@@ -0,0 +1,67 @@
+# src/core/warmup.py
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+def warmup_voices(service, languages_per_engine: int = 0) -> Dict[str, str]:
+    """One voice id per language the service offers (language name -> voice id)"""
+    voices = {}
+    for language, language_voices in (service.get_voices() or {}).items():
+        if language_voices:
+            voices[language] = language_voices[0].id
+        if languages_per_engine and len(voices) >= languages_per_engine:
+            break
+    return voices
+
+def _timed_generate(service, text: str, voice_id: str) -> float:
+    start_time = time.time()
+    service.generate_audio(text, voice_id)
+    return time.time() - start_time
+
+def warmup_service(service, warmup_config, batch_sizes: List[int]) -> Dict:
+    """
+    Prime one engine replica before it takes traffic: runs synthetic
+    requests for every language (CUDA context, kernel autotuning,
+    tokenizers, allocator growth), then concurrent requests at each batch
+    size so batched decode shapes are compiled as well. Failures are
+    logged and counted; a replica that cannot be warmed still serves.
+    """
+    start_time = time.time()
+    report = {"languages": {}, "batch_sizes": {}, "failures": 0}
+    voices = warmup_voices(service, warmup_config.languages_per_engine)
+    for language, voice_id in voices.items():
+        text = warmup_config.texts.get(language, warmup_config.text)
+        runs = []
+        try:
+            for _ in range(max(1, warmup_config.runs)):
+                runs.append(round(_timed_generate(service, text, voice_id), 3))
+        except Exception as e:
+            report["failures"] += 1
+            logger.warning(f"Warmup of {voice_id} ({language}) failed: {e}")
+        # First run is the cold cost, the last one what traffic will see
+        report["languages"][language] = {"voice_id": voice_id, "seconds": runs}
+
+    if voices and batch_sizes:
+        language, voice_id = next(iter(voices.items()))
+        text = warmup_config.texts.get(language, warmup_config.text)
+        for size in batch_sizes:
+            batch_start = time.time()
+            with ThreadPoolExecutor(max_workers=size) as executor:
+                futures = [executor.submit(_timed_generate, service, text, voice_id) for _ in range(size)]
+            errors = [future.exception() for future in futures if future.exception() is not None]
+            if errors:
+                report["failures"] += 1
+                logger.warning(f"Warmup at batch size {size} failed: {errors[0]}")
+            report["batch_sizes"][str(size)] = round(time.time() - batch_start, 3)
+
+    report["seconds"] = round(time.time() - start_time, 3)
+    return report
+
+def warmup_pool(pool, warmup_config, batch_sizes: List[int]) -> Dict:
+    """Warm every replica of a pool; returns the total time and one report per replica"""
+    start_time = time.time()
+    replicas = pool.for_each_replica(lambda service: warmup_service(service, warmup_config, batch_sizes))
+    return {"seconds": round(time.time() - start_time, 3), "replicas": replicas}
@@ -0,0 +1,147 @@
+# src/core/weight_cache.py
+import os
+import re
+import time
+import shutil
+import hashlib
+import logging
+import contextlib
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import torch
+from safetensors.torch import load_file, save_file
+
+logger = logging.getLogger(__name__)
+
+class WeightCache:
+    """
+    Local cache of model weights converted to safetensors.
+
+    The first load of a checkpoint converts its state dict once; later loads
+    (restarts, engine recoveries, other worker processes) memory-map the
+    converted file instead of unpickling the original. Mapped pages live in
+    the OS page cache, so every process loading the same engine reads them
+    from memory rather than disk, and unpickling cost disappears.
+
+    Cache entries are keyed on the source file's path, size and mtime, so a
+    re-downloaded checkpoint is converted again and the stale entry removed.
+    """
+
+    def __init__(self, cache_dir, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    @classmethod
+    def from_config(cls, config, base_dir) -> "WeightCache":
+        cache_dir = Path(config.weight_cache.cache_dir)
+        if not cache_dir.is_absolute():
+            cache_dir = Path(base_dir) / cache_dir
+        return cls(cache_dir, config.weight_cache.enabled)
+
+    @staticmethod
+    def _fingerprint(source: Path) -> str:
+        stat = source.stat()
+        key = f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+    def state_dict(self, name: str, source, load: Callable[[], Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        """
+        State dict of a checkpoint, memory-mapped from the cache when possible.
+
+        Args:
+            name: Cache entry name (one entry per name is kept)
+            source: Original checkpoint file
+            load: Loads the state dict from the original checkpoint on a miss
+        """
+        source = Path(source)
+        if not self.enabled or not source.exists():
+            return load()
+
+        path = self.cache_dir / f"{name}-{self._fingerprint(source)}.safetensors"
+        if path.exists():
+            try:
+                return load_file(str(path))
+            except Exception as e:
+                logger.warning(f"Unreadable weight cache entry {path}, converting again: {e}")
+                path.unlink(missing_ok=True)
+
+        state_dict = load()
+        try:
+            self._save(name, path, state_dict, source)
+        except Exception as e:
+            logger.warning(f"Could not cache weights for {name}: {e}")
+        return state_dict
+
+    def _save(self, name: str, path: Path, state_dict: Dict[str, torch.Tensor], source: Path):
+        if not all(isinstance(value, torch.Tensor) for value in state_dict.values()):
+            logger.info(f"{name} checkpoint holds non-tensor values, not caching it")
+            return
+        start_time = time.time()
+        tensors = {}
+        seen_storage = set()
+        for key, value in state_dict.items():
+            value = value.detach().cpu()
+            # safetensors refuses tensors that share memory (tied weights)
+            storage = value.untyped_storage().data_ptr()
+            if storage in seen_storage:
+                value = value.clone()
+            seen_storage.add(value.untyped_storage().data_ptr())
+            tensors[key] = value.contiguous()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name so concurrent workers never map a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        save_file(tensors, str(tmp_path), metadata={"source": str(source)})
+        os.replace(tmp_path, path)
+        for stale in self.cache_dir.glob(f"{name}-*.safetensors"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        logger.info(f"Converted {name} weights to {path} in {time.time() - start_time:.1f}s")
+
+    def pretrained_dir(self, name: str, model_id: str) -> Optional[Path]:
+        """
+        Directory holding a save_pretrained(safe_serialization=True) copy of a
+        Hugging Face model, or None when the cache is disabled
+        """
+        if not self.enabled:
+            return None
+        return self.cache_dir / name / re.sub(r"[^A-Za-z0-9_.-]", "--", model_id)
+
+    def save_pretrained(self, model, target: Path):
+        """Store a local safetensors copy of a transformers model"""
+        tmp_dir = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            model.save_pretrained(str(tmp_dir), safe_serialization=True)
+            if target.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
+            os.replace(tmp_dir, target)
+            logger.info(f"Cached {target.name} as safetensors in {target}")
+        except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            logger.warning(f"Could not cache {target.name}: {e}")
+
+@contextlib.contextmanager
+def timed(timings: Dict[str, float], phase: str):
+    """Record how long a block took under timings[phase]"""
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        timings[phase] = round(time.time() - start_time, 3)
+
+def load_xtts_checkpoint(model, config, checkpoint_dir, cache: WeightCache, name: str, **kwargs):
+    """
+    Xtts.load_checkpoint with model.pth served from the weight cache. The
+    rest of load_checkpoint (tokenizer, speaker manager, inference setup)
+    runs unchanged.
+    """
+    original = model.get_compatible_checkpoint_state_dict
+    model.get_compatible_checkpoint_state_dict = lambda model_path: cache.state_dict(
+        name, model_path, lambda: original(model_path)
+    )
+    try:
+        model.load_checkpoint(config, checkpoint_dir=str(checkpoint_dir), **kwargs)
+    finally:
+        del model.get_compatible_checkpoint_state_dict
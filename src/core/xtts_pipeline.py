@@ -0,0 +1,197 @@
+# src/core/xtts_pipeline.py
+import queue
+import logging
+import threading
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+class PipelinedVocoder:
+    """
+    Two-stage GPT -> vocoder pipeline.
+
+    A producer thread pulls latent frames from the GPT generator and hands
+    them over in chunks; the calling thread vocodes each chunk as soon as it
+    arrives, so the vocoder works on chunk N while the GPT generates chunk
+    N+1 and total latency approaches the slower stage instead of the sum.
+
+    Each chunk is decoded together with the last context_frames frames
+    before it, so the vocoder sees the same left context it would in a
+    full decode; the context part of the output is dropped and consecutive
+    chunks are crossfaded over overlap_samples to hide any seam. On CUDA
+    the vocoder runs on its own stream, synchronised per chunk with an
+    event recorded by the producer.
+    """
+
+    def __init__(self,
+                 chunk_frames: int = 20,
+                 context_frames: int = 8,
+                 overlap_samples: int = 1024,
+                 device: str = "cpu",
+                 max_pending_chunks: int = 4):
+        """
+        Args:
+            chunk_frames: Latent frames per vocoder call
+            context_frames: Previously decoded frames re-fed as left context
+            overlap_samples: Crossfade length between chunks
+            device: Device the models run on
+            max_pending_chunks: Bound on chunks waiting for the vocoder
+        """
+        self.chunk_frames = max(1, chunk_frames)
+        self.context_frames = max(0, context_frames)
+        self.overlap_samples = max(0, overlap_samples)
+        self.max_pending_chunks = max_pending_chunks
+        self.use_cuda_stream = str(device).startswith("cuda") and torch.cuda.is_available()
+        self.vocoder_stream = torch.cuda.Stream() if self.use_cuda_stream else None
+
+    def _produce(self, latent_frames: Iterable[torch.Tensor], chunks: queue.Queue,
+                 stop: threading.Event):
+        """Producer thread: group frames (dim,) or (1, dim) into chunks"""
+        try:
+            with torch.inference_mode():
+                pending = []
+                for frame in latent_frames:
+                    if stop.is_set():
+                        break
+                    pending.append(frame.reshape(1, -1))
+                    if len(pending) >= self.chunk_frames:
+                        self._put_latents(chunks, torch.cat(pending, dim=0), stop)
+                        pending = []
+                if pending and not stop.is_set():
+                    self._put_latents(chunks, torch.cat(pending, dim=0), stop)
+        except Exception as e:
+            logger.error(f"GPT stage failed: {e}")
+            self._put(chunks, e, stop)
+            return
+        self._put(chunks, _END, stop)
+
+    def _put_latents(self, chunks: queue.Queue, latents: torch.Tensor, stop: threading.Event):
+        event = None
+        if self.use_cuda_stream:
+            event = torch.cuda.Event()
+            event.record()
+        self._put(chunks, (latents, event), stop)
+
+    @staticmethod
+    def _put(chunks: queue.Queue, item, stop: threading.Event):
+        """Queue item unless the consumer has stopped, in which case nobody would take it"""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _decode_window(self, vocode, window: torch.Tensor, event) -> np.ndarray:
+        if self.vocoder_stream is None:
+            wav = vocode(window.unsqueeze(0))
+        else:
+            self.vocoder_stream.wait_event(event)
+            with torch.cuda.stream(self.vocoder_stream):
+                wav = vocode(window.unsqueeze(0))
+            self.vocoder_stream.synchronize()
+        return wav.detach().float().cpu().numpy().reshape(-1)
+
+    def stream(self, latent_frames: Iterable[torch.Tensor],
+               vocode: Callable[[torch.Tensor], torch.Tensor]) -> Iterator[np.ndarray]:
+        """
+        Yield waveform chunks while latent_frames is still being generated.
+        vocode maps latents (1, frames, dim) to a waveform tensor.
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=self.max_pending_chunks)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(latent_frames, chunks, stop), daemon=True, name="xtts-gpt-stage"
+        )
+        producer.start()
+
+        context = None
+        held_tail = None
+        try:
+            with torch.inference_mode():
+                while True:
+                    item = chunks.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    latents, event = item
+
+                    context_len = 0 if context is None else context.shape[0]
+                    window = latents if context is None else torch.cat([context, latents], dim=0)
+                    wav = self._decode_window(vocode, window, event)
+                    if self.context_frames:
+                        context = window[-self.context_frames:]
+
+                    samples_per_frame = len(wav) / window.shape[0]
+                    start = int(round(context_len * samples_per_frame))
+                    overlap = min(self.overlap_samples, start) if held_tail is not None else 0
+                    new_audio = wav[start - overlap:]
+
+                    if held_tail is not None:
+                        overlap = min(overlap, len(held_tail), len(new_audio))
+                        head = self._crossfade(held_tail[len(held_tail) - overlap:], new_audio[:overlap])
+                        new_audio = np.concatenate([held_tail[:len(held_tail) - overlap], head, new_audio[overlap:]])
+
+                    # Hold back the tail so the next chunk can crossfade into it
+                    keep = min(self.overlap_samples, len(new_audio)) if self.context_frames else 0
+                    held_tail = new_audio[len(new_audio) - keep:]
+                    if len(new_audio) - keep > 0:
+                        yield new_audio[:len(new_audio) - keep]
+                if held_tail is not None and len(held_tail):
+                    yield held_tail
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue
+            while True:
+                try:
+                    chunks.get_nowait()
+                except queue.Empty:
+                    break
+            producer.join(timeout=5)
+
+    def synthesize(self, latent_frames: Iterable[torch.Tensor],
+                   vocode: Callable[[torch.Tensor], torch.Tensor]) -> np.ndarray:
+        chunks = list(self.stream(latent_frames, vocode))
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def _crossfade(previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        if not len(previous):
+            return current
+        fade = np.linspace(0.0, 1.0, len(previous), dtype=np.float32)
+        return previous * (1.0 - fade) + current * fade
+
+def xtts_latent_frames(model, text: str, language: str, gpt_cond_latent: torch.Tensor,
+                       **hf_generate_kwargs) -> Iterator[torch.Tensor]:
+    """
+    Latent frames for one XTTS text, streamed from the GPT as in
+    Xtts.inference_stream. Frames are yielded one decode step at a time.
+    The text is a single generation: callers split long texts into
+    sentences first (XttsService._sentences).
+    """
+    device = gpt_cond_latent.device
+    text_tokens = torch.IntTensor(
+        model.tokenizer.encode(text.strip().lower(), lang=language.split("-")[0])
+    ).unsqueeze(0).to(device)
+    fake_inputs = model.gpt.compute_embeddings(gpt_cond_latent, text_tokens)
+    generator = model.gpt.get_generator(
+        fake_inputs=fake_inputs,
+        num_beams=1,
+        num_return_sequences=1,
+        output_attentions=False,
+        output_hidden_states=True,
+        **hf_generate_kwargs
+    )
+    for _, latent in generator:
+        yield latent
+
+def xtts_vocoder(model, speaker_embedding: torch.Tensor) -> Callable[[torch.Tensor], torch.Tensor]:
+    def vocode(latents: torch.Tensor) -> torch.Tensor:
+        return model.hifigan_decoder(latents, g=speaker_embedding)
+    return vocode
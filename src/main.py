@@ -13,11 +13,10 @@ os.environ["ACCEPT_TOS"] = "1"
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.ConfigLoader import ConfigLoader
+from core.cpu_profile import apply_cpu_profile
 from core.tts_manager import TTSManager
 from api.routes import register_routes
 
-import torch
-
 def create_app(config_path: str):
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})
@@ -25,6 +24,11 @@ def create_app(config_path: str):
     # Load configuration
     config = ConfigLoader.load_config(config_path)
     ConfigLoader.ensure_directories(config)
+    # Hand file bodies to the front-end server instead of streaming them
+    app.config['USE_X_SENDFILE'] = config.audio_serving.use_x_sendfile
+
+    # Threading and NUMA placement must be fixed before models load
+    apply_cpu_profile(config)
     
     # Initialize TTS Manager
     tts_manager = TTSManager(config)
@@ -1,10 +1,8 @@
 from pathlib import Path
 import time
-from scipy.io.wavfile import write
 
 from parler_tts import ParlerTTSForConditionalGeneration
 from transformers import AutoTokenizer
-import soundfile as sf
 
 import os
 import sys
@@ -12,19 +10,43 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.ConfigLoader import AppConfig
 from src.core.constants import INDIC_VOICES, INDIC_LANG_CODES
 from src.core.error_handlers import IndicParlerError
+from core.cpu_profile import quantize_for_cpu
+from core.error_handlers import RequestCancelledError
+from core.cancellation import check_cancelled
+from core.generation_control import cancellation_criteria
+from core.weight_cache import WeightCache, timed
 from .base import BaseService
 from src.core.voice_info_engine import VoiceInfo
 
 class IndicService(BaseService):
-    def __init__(self, config: AppConfig):
-        super().__init__()
+    def __init__(self, config: AppConfig, device: str = None):
+        super().__init__(device)
         model_name = config.models.indic_model
         self.base_dir = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.config = config
         self.languages = list(INDIC_LANG_CODES.keys())
-        self.model = ParlerTTSForConditionalGeneration.from_pretrained(model_name).to(self.device)
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.description_tokenizer = AutoTokenizer.from_pretrained(self.model.config.text_encoder._name_or_path)
+        self.weight_cache = WeightCache.from_config(config, self.base_dir)
+        with timed(self.load_timings, "weights"):
+            self.model = self.get_parler(model_name).to(self.device)
+        with timed(self.load_timings, "optimize"):
+            self.model.decoder = quantize_for_cpu(self.model.decoder, config, self.device, "Parler decoder")
+        with timed(self.load_timings, "tokenizers"):
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.description_tokenizer = AutoTokenizer.from_pretrained(self.model.config.text_encoder._name_or_path)
+
+    def get_parler(self, model_name):
+        """
+        Load Parler from the local safetensors copy in the weight cache,
+        creating it on first use; this skips Hub resolution on restarts and
+        the weights are memory-mapped
+        """
+        local_dir = self.weight_cache.pretrained_dir("indic", model_name)
+        if local_dir is not None and (local_dir / "config.json").exists():
+            return ParlerTTSForConditionalGeneration.from_pretrained(str(local_dir))
+        model = ParlerTTSForConditionalGeneration.from_pretrained(model_name)
+        if local_dir is not None:
+            self.weight_cache.save_pretrained(model, local_dir)
+        return model
 
     def get_voices(self):
         try:
@@ -47,14 +69,20 @@ class IndicService(BaseService):
             return {}
         
     def synthesize(self, text, voice_id, session_id):
+        audio_array, sample_rate = self.generate_audio(text, voice_id)
+        try:
+            output_filename, _ = self.save_audio(audio_array, sample_rate, session_id)
+        except Exception as e:
+            raise IndicParlerError(
+                message=f"Audio saving failed: {str(e)}",
+                details={"sample_rate": sample_rate}
+            )
+        return output_filename
+
+    def generate_audio(self, text, voice_id):
         lang_code = None
         voice_name = None
         try:
-            timestamp = int(time.time() * 10000000)
-            output_filename = f"realtime_{session_id}_{timestamp}.wav"
-            output_dir = self.base_dir / self.config.directories.audio_output_dir
-            output_path = output_dir / output_filename
-            
             _, lang_code, voice_name = voice_id.split('_')
             voice_name = voice_name.capitalize()
 
@@ -117,7 +145,8 @@ class IndicService(BaseService):
                     input_ids=description_inputs.input_ids,
                     attention_mask=description_inputs.attention_mask,
                     prompt_input_ids=prompt_inputs.input_ids,
-                    prompt_attention_mask=prompt_inputs.attention_mask
+                    prompt_attention_mask=prompt_inputs.attention_mask,
+                    stopping_criteria=cancellation_criteria()
                 )
             except Exception as e:
                 raise IndicParlerError(
@@ -130,23 +159,11 @@ class IndicService(BaseService):
                     }
                 )
 
-            # Convert to numpy and save
+            check_cancelled()
             audio_array = generation.cpu().numpy().squeeze()
-            sf.write(str(output_path), audio_array, self.model.config.sampling_rate)
-            
-            if output_path.exists():
-                return output_filename
-            
-            raise IndicParlerError(
-                message=f"Audio saving failed: {str(e)}",
-                language=language,
-                details={
-                    "output_path": output_path,
-                    "sample_rate": self.model.config.sampling_rate
-                }
-            )
+            return audio_array, self.model.config.sampling_rate
 
-        except IndicParlerError:
+        except (IndicParlerError, RequestCancelledError):
             raise
         except Exception as e:
             raise IndicParlerError(
@@ -1,35 +1,70 @@
-from kokoro import KPipeline
+from kokoro import KModel, KPipeline
 from huggingface_hub import hf_hub_download
 import logging
 
 import numpy as np
-import soundfile as sf
+import re
 import time
+import copy
+import atexit
+import queue
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
 from pathlib import Path
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.ConfigLoader import AppConfig
 from core.constants import KOKORO_LANGUAGE_CODES, KOKORO_VOICE_CHOICES, XTTS_SAMPLE_RATE
-from core.error_handlers import KokoroError
+from core.error_handlers import KokoroError, RequestCancelledError
+from core.cancellation import check_cancelled
+from core.cpu_profile import quantize_for_cpu
+from core.weight_cache import timed
+from core.phoneme_cache import PhonemeCache
 from .base import BaseService
 from src.core.voice_info_engine import VoiceInfo
 
+# Marks the end of a request's phoneme stream
+_G2P_DONE = object()
+
 class KokoroService(BaseService):
-    def __init__(self, config: AppConfig):
-        super().__init__()
+    def __init__(self, config: AppConfig, device: str = None):
+        super().__init__(device)
         self.config = config
         self.base_dir = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-        self.pipelines = self.get_kokoro()
+        with timed(self.load_timings, "weights"):
+            self.model = self.get_kokoro()
+        self.phoneme_cache = None
+        if config.kokoro.cache_enabled:
+            self.phoneme_cache = PhonemeCache(
+                config.kokoro.cache_sentence_entries,
+                config.kokoro.cache_word_entries,
+                self.base_dir / config.kokoro.cache_path if config.kokoro.cache_path else None,
+                config.kokoro.cache_save_interval_seconds
+            )
+            if config.kokoro.cache_path:
+                atexit.register(self.phoneme_cache.save)
+        self.pipelines = {}
+        # Same G2P front-ends and voices as self.pipelines, without the model
+        self.g2p_pipelines = {}
+        self._g2p_executor = None
+        if config.kokoro.overlap_g2p:
+            self._g2p_executor = ThreadPoolExecutor(
+                max_workers=config.kokoro.g2p_threads, thread_name_prefix="kokoro-g2p"
+            )
         self.languages = list(KOKORO_LANGUAGE_CODES.keys())
-        self._initialize_kokoro_voices()
+        with timed(self.load_timings, "pipelines"):
+            self._initialize_kokoro_voices()
 
     def _initialize_kokoro_voices(self):
         """Initialize Kokoro pipelines and load voices"""
         for lang_code in KOKORO_LANGUAGE_CODES.values():
             try:
-                pipeline = KPipeline(lang_code=lang_code)
+                # Every language pipeline shares the one model; only G2P and voices differ
+                pipeline = KPipeline(lang_code=lang_code, model=self.model, device=self.device)
                 
                 # Get all voices for this language code
                 voices_for_lang = [code for _, code, _ in KOKORO_VOICE_CHOICES 
@@ -44,6 +79,11 @@ class KokoroService(BaseService):
                         logging.error(f"Failed to load voice {voice_code}: {e}")
                 
                 self.pipelines[lang_code] = pipeline
+                self._cache_word_fallback(lang_code, pipeline)
+                # KPipeline only phonemizes when it has no model
+                g2p_pipeline = copy.copy(pipeline)
+                g2p_pipeline.model = False
+                self.g2p_pipelines[lang_code] = g2p_pipeline
                 logging.info(f"Successfully initialized Kokoro pipeline for {lang_code}")
                 
             except Exception as e:
@@ -54,17 +94,18 @@ class KokoroService(BaseService):
                 )
 
     def get_kokoro(self):
-        pipelines = {}
-        for lang_code in KOKORO_LANGUAGE_CODES.values():
-            try:
-                pipelines[lang_code] = KPipeline(lang_code=lang_code)
-            except Exception as e:
-                KokoroError(
-                    f"Failed to initialize Kokoro pipeline for language {lang_code}: {e}",
-                    lang_code
-                )
-        return pipelines
+        """Load the Kokoro model once; every language pipeline shares it"""
+        try:
+            model = KModel().to(self.device).eval()
+        except Exception as e:
+            raise KokoroError(message=f"Failed to load Kokoro model: {e}")
+        return quantize_for_cpu(model, self.config, self.device, "Kokoro")
     
+    def shutdown(self):
+        """Persist the phoneme cache when the replica is replaced or its worker stops"""
+        if self.phoneme_cache is not None:
+            self.phoneme_cache.save()
+
     def get_voices(self):
         grouped_voices = {"US English": [], "GB English": []}
         for name, code, gender in KOKORO_VOICE_CHOICES:
@@ -84,12 +125,100 @@ class KokoroService(BaseService):
         return grouped_voices
 
     def synthesize(self, text, voice_id, session_id):
+        final_audio, sample_rate = self.generate_audio(text, voice_id)
         try:
-            timestamp = int(time.time() * 10000000)
-            output_filename = f"realtime_{session_id}_{timestamp}.wav"
-            output_dir = self.base_dir / self.config.directories.audio_output_dir
-            output_path = output_dir / output_filename
+            output_filename, _ = self.save_audio(final_audio, sample_rate, session_id)
+        except Exception as e:
+            raise KokoroError(
+                message=f"Failed to save audio file: {str(e)}",
+                details={"session_id": session_id}
+            )
+        return output_filename
+
+    def _cache_word_fallback(self, lang_code: str, pipeline):
+        """
+        Send misaki's per-word fallback (espeak for words missing from its
+        lexicon, the slow part of English G2P) through the word cache
+        """
+        g2p = getattr(pipeline, 'g2p', None)
+        fallback = getattr(g2p, 'fallback', None)
+        if self.phoneme_cache is None or fallback is None:
+            return
+
+        def cached_fallback(token):
+            return self.phoneme_cache.get_or_compute(lang_code, "word", token.text, lambda: fallback(token))
+        g2p.fallback = cached_fallback
+
+    @staticmethod
+    def _pieces(text: str) -> List[str]:
+        """text split on line breaks, as KPipeline splits it with split_pattern=r'\n+'"""
+        return [piece for piece in re.split(r'\n+', text.strip()) if piece.strip()]
 
+    def _phonemize_piece(self, lang_code: str, piece: str) -> List[Tuple[str, str]]:
+        def compute():
+            return [
+                (graphemes, phonemes)
+                for graphemes, phonemes, _ in self.g2p_pipelines[lang_code](piece, split_pattern=None)
+                if phonemes
+            ]
+
+        if self.phoneme_cache is None:
+            return compute()
+        return [tuple(segment) for segment in
+                self.phoneme_cache.get_or_compute(lang_code, "sentence", piece, compute)]
+
+    def phonemize(self, lang_code: str, text: str) -> List[Tuple[str, str]]:
+        """
+        (graphemes, phonemes) of every segment of text, split on line breaks
+        and into model-sized chunks exactly as KPipeline would split them.
+        Pieces seen before come from the phoneme cache.
+        """
+        return [segment for piece in self._pieces(text) for segment in self._phonemize_piece(lang_code, piece)]
+
+    def _phoneme_stream(self, lang_code: str, text: str) -> Iterator[str]:
+        """
+        Phonemes of text's segments in order. With overlap_g2p the G2P runs
+        ahead in a background thread, so segment N+1 is phonemized while the
+        model synthesizes segment N (the G2P is Python, the model releases
+        the GIL inside torch ops).
+        """
+        if self._g2p_executor is None:
+            for _, phonemes in self.phonemize(lang_code, text):
+                yield phonemes
+            return
+
+        segments = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for piece in self._pieces(text):
+                    if stop.is_set():
+                        return
+                    for _, phonemes in self._phonemize_piece(lang_code, piece):
+                        segments.put(phonemes)
+            except Exception as e:
+                segments.put(e)
+                return
+            segments.put(_G2P_DONE)
+
+        self._g2p_executor.submit(produce)
+        try:
+            while True:
+                item = segments.get()
+                if item is _G2P_DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # The request ended early (cancelled or failed): let the producer stop
+            stop.set()
+
+    def generate_audio(self, text, voice_id):
+        lang_code = None
+        full_voice_name = None
+        try:
             _, full_voice_name = voice_id.split("kokoro_")
             
             # Get the appropriate pipeline
@@ -101,15 +230,15 @@ class KokoroService(BaseService):
                 )
             
             pipeline = self.pipelines[lang_code]
+            pack = pipeline.load_voice(full_voice_name).to(self.model.device)
             all_audio = []
 
-            for graphemes, phonemes, audio in pipeline(
-                text,
-                voice=full_voice_name,
-                speed=self.config.kokoro_speed,  # You might want to make this configurable
-                split_pattern=r'\n+'
-            ):
-                all_audio.append(audio)
+            with contextlib.closing(self._phoneme_stream(lang_code, text)) as segments:
+                for phonemes in segments:
+                    output = KPipeline.infer(self.model, phonemes, pack, self.config.kokoro_speed)
+                    all_audio.append(output.audio)
+                    # Stop before the next segment if the request was abandoned
+                    check_cancelled()
             
             if not all_audio:
                 raise KokoroError(
@@ -118,18 +247,10 @@ class KokoroService(BaseService):
                     details={"voice": full_voice_name}
                 )
             
-            final_audio = np.concatenate(all_audio)
-            sf.write(str(output_path), final_audio, XTTS_SAMPLE_RATE)
-            
-            if output_path.exists():
-                return output_filename
-            
-            raise KokoroError(
-                message="Failed to save audio file",
-                model_state="save_failed",
-                details={"output_path": str(output_path)}
-            )
+            return np.concatenate(all_audio), XTTS_SAMPLE_RATE
         
+        except (KokoroError, RequestCancelledError):
+            raise
         except Exception as e:
             raise KokoroError(
                 message=f"Kokoro synthesis failed: {str(e)}",
@@ -1,7 +1,6 @@
 import boto3
 from dotenv import load_dotenv
 load_dotenv()
-import time
 import numpy as np
 from scipy.io.wavfile import write
 from pathlib import Path
@@ -65,10 +64,7 @@ class PollyService(BaseService):
         Returns: Path to the generated audio file
         """
         try:
-            timestamp = int(time.time() * 10000000)
-            output_filename = f"realtime_{session_id}_{timestamp}.wav"
-            output_dir = self.base_dir / self.config.directories.audio_output_dir
-            output_path = output_dir / output_filename
+            output_filename, output_path = self.get_output_path(session_id)
             
             response = self.polly_client.synthesize_speech(
                 Engine="neural",
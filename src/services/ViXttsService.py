@@ -4,43 +4,59 @@ from TTS.tts.models.xtts import Xtts
 #from TTS.utils.generic_utils import get_user_data_dir
 from pathlib import Path
 import time
-from scipy.io.wavfile import write
 from huggingface_hub import snapshot_download
+from transformers import LogitsProcessorList
 
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.ConfigLoader import AppConfig
 from core.constants import XTTS_SAMPLE_RATE
-from core.error_handlers import VietnameseXTTSError
+from core.error_handlers import VietnameseXTTSError, RequestCancelledError
+from core.cancellation import check_cancelled
+from core.model_optimizer import optimize_xtts
+from core.cpu_profile import select_precision
+from core.generation_control import GenerationControl, cancellation_criteria
+from core.weight_cache import WeightCache, load_xtts_checkpoint, timed
 from .base import BaseService
 from src.core.voice_info_engine import VoiceInfo
 
 class ViXttsService(BaseService):
-    def __init__(self, config: AppConfig):
-        super().__init__()
+    audio_subtype = "FLOAT"
+
+    def __init__(self, config: AppConfig, device: str = None):
+        super().__init__(device)
         self.languages = ["Vietnamese"]
         self.speakers = {
             "male": config.reference_audio_paths.male,
             "female": config.reference_audio_paths.female
         }
+        # reference audio path -> (gpt_cond_latent, speaker_embedding)
+        self._conditioning = {}
         self.config = config
         # Set up paths
         self.base_dir = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.model_dir = self.base_dir / config.directories.vietnamese_model_dir
+        self.weight_cache = WeightCache.from_config(config, self.base_dir)
         
         # Download model if not exists
         if not self.model_dir.exists():
             print("Downloading Vietnamese model from Hugging Face...")
-            snapshot_download(
-                repo_id=config.models.xtts_vietnamese,
-                repo_type="model",
-                local_dir=str(self.model_dir)
-            )
+            with timed(self.load_timings, "download"):
+                snapshot_download(
+                    repo_id=config.models.xtts_vietnamese,
+                    repo_type="model",
+                    local_dir=str(self.model_dir)
+                )
             print("Vietnamese model downloaded successfully!")
             
         # Initialize model
         self.model = self.get_vietnamese_xtts(self.model_dir)
+        self.generation_control = GenerationControl(
+            config.generation,
+            max_tokens=self.model.gpt.max_gen_mel_tokens,
+            stop_token=self.model.gpt.stop_audio_token
+        )
 
     def get_vietnamese_xtts(self, model_path):
         try:
@@ -54,10 +70,18 @@ class ViXttsService(BaseService):
             config_path = model_path / "config.json"
             vn_config.load_json(str(config_path))
             
-            xtts_vietnamese_model = Xtts.init_from_config(vn_config)
-            xtts_vietnamese_model.load_checkpoint(vn_config, checkpoint_dir=str(model_path))
-            xtts_vietnamese_model.eval()
-            return xtts_vietnamese_model.to(self.device)
+            with timed(self.load_timings, "weights"):
+                xtts_vietnamese_model = Xtts.init_from_config(vn_config)
+                load_xtts_checkpoint(xtts_vietnamese_model, vn_config, model_path, self.weight_cache, "vixtts")
+                xtts_vietnamese_model.eval()
+                xtts_vietnamese_model = xtts_vietnamese_model.to(self.device)
+            with timed(self.load_timings, "optimize"):
+                return optimize_xtts(
+                    xtts_vietnamese_model,
+                    self.config.inference,
+                    self.device,
+                    precision=select_precision(self.config, self.device)
+                )
         except Exception as e:
             raise VietnameseXTTSError(
                 message=f"Failed to initialize Vietnamese XTTS model: {str(e)}",
@@ -87,16 +111,33 @@ class ViXttsService(BaseService):
         }
 
     def synthesize(self, text: str, voice_id: str, session_id: str) -> str:
-        gender = None
+        audio, sample_rate = self.generate_audio(text, voice_id)
         try:
-            timestamp = int(time.time() * 10000000)
-            output_filename = f"realtime_{session_id}_{timestamp}.wav"
-            output_dir = self.base_dir / self.config.directories.audio_output_dir
-            output_path = output_dir / output_filename
+            output_filename, _ = self.save_audio(audio, sample_rate, session_id)
+        except Exception as e:
+            raise VietnameseXTTSError(
+                message=f"Failed to save audio file: {str(e)}",
+                model_state="save_failed",
+                details={"session_id": session_id}
+            )
+        return output_filename
 
-            if not output_dir.exists():
-                output_dir.mkdir(parents=True, exist_ok=True)
+    def _conditioning_latents(self, reference_audio: str):
+        """Conditioning of a reference voice; computed on its first request, then reused"""
+        latents = self._conditioning.get(reference_audio)
+        if latents is None:
+            latents = self.model.get_conditioning_latents(
+                audio_path=reference_audio,
+                gpt_cond_len=self.model.config.gpt_cond_len,
+                max_ref_length=self.model.config.max_ref_len,
+                sound_norm_refs=self.model.config.sound_norm_refs
+            )
+            self._conditioning[reference_audio] = latents
+        return latents
 
+    def generate_audio(self, text: str, voice_id: str):
+        gender = None
+        try:
             # Get gender from voice_id
             gender = voice_id.split('_')[-1]
             reference_audio = self.speakers[gender.lower()]
@@ -107,18 +148,22 @@ class ViXttsService(BaseService):
                     model_state="reference_missing"
                 )
 
-            gpt_cond_latent, speaker_embedding = self.model.get_conditioning_latents(
-                audio_path=reference_audio,
-                gpt_cond_len=self.model.config.gpt_cond_len,
-                max_ref_length=self.model.config.max_ref_len,
-                sound_norm_refs=self.model.config.sound_norm_refs
-            )
+            gpt_cond_latent, speaker_embedding = self._conditioning_latents(reference_audio)
+            check_cancelled()
             
-            out = self.model.inference(
-                text=text,
-                language="vi",
-                gpt_cond_latent=gpt_cond_latent,
-                speaker_embedding=speaker_embedding,
+            out = self.generation_control.run(
+                lambda max_new_tokens, monitor, **sampling: self.model.inference(
+                    text=text,
+                    language="vi",
+                    gpt_cond_latent=gpt_cond_latent,
+                    speaker_embedding=speaker_embedding,
+                    max_new_tokens=max_new_tokens,
+                    logits_processor=LogitsProcessorList([monitor]),
+                    stopping_criteria=cancellation_criteria(),
+                    **sampling
+                ),
+                text,
+                "vi",
                 temperature=0.3,
                 length_penalty=1.0,
                 repetition_penalty=10.0,
@@ -126,18 +171,9 @@ class ViXttsService(BaseService):
                 top_p=0.85
             )
             
-            write(str(output_path), XTTS_SAMPLE_RATE, out["wav"])
-
-            if output_path.exists():
-                return output_filename
-
-            raise VietnameseXTTSError(
-                message="Failed to save audio file",
-                model_state="save_failed",
-                details={"output_path": str(output_path)}
-            )
+            return out["wav"], XTTS_SAMPLE_RATE
 
-        except VietnameseXTTSError:
+        except (VietnameseXTTSError, RequestCancelledError):
             raise
         except Exception as e:
             raise VietnameseXTTSError(
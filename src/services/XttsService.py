@@ -1,10 +1,13 @@
 from TTS.utils.manage import ModelManager
 from TTS.tts.configs.xtts_config import XttsConfig
 from TTS.tts.models.xtts import Xtts
+from TTS.tts.layers.xtts.tokenizer import split_sentence
 from TTS.utils.generic_utils import get_user_data_dir
 import numpy as np
-from scipy.io.wavfile import write
+import torch
+from transformers import LogitsProcessorList
 import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 import traceback
 import logging
@@ -16,39 +19,218 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.ConfigLoader import AppConfig
 from core.constants import XTTS_LANGUAGE_NAMES, XTTS_SAMPLE_RATE
-from core.error_handlers import XTTSError
+from core.error_handlers import XTTSError, RequestCancelledError
+from core.cancellation import check_cancelled, current_token
+from core.model_optimizer import optimize_xtts
+from core.cpu_profile import select_precision
+from core.continuous_batching import ContinuousBatcher, build_xtts_prefix
+from core.generation_control import GenerationControl, cancellation_criteria
+from core.xtts_pipeline import PipelinedVocoder, xtts_latent_frames, xtts_vocoder
+from core.weight_cache import WeightCache, load_xtts_checkpoint, timed
 from .base import BaseService
 from src.core.voice_info_engine import VoiceInfo
 
+# Sampling used by every synthesis path (direct, batched, pipelined, streaming)
+SAMPLING = {"temperature": 0.75, "repetition_penalty": 5.0, "top_k": 50, "top_p": 0.85}
+
 class XttsService(BaseService):
-    def __init__(self, config: AppConfig):
-        super().__init__()
+    audio_subtype = "FLOAT"
+
+    def __init__(self, config: AppConfig, device: str = None):
+        super().__init__(device)
         self.config = config
         self.base_dir = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.languages = XTTS_LANGUAGE_NAMES
+        self.weight_cache = WeightCache.from_config(config, self.base_dir)
         model_name = config.models.xtts_base_model
         self.model = self.get_xtts(model_name)
         self.speakers = {
             "male": config.reference_audio_paths.male,
             "female": config.reference_audio_paths.female
         }
+        # reference audio path -> (gpt_cond_latent, speaker_embedding)
+        self._conditioning = {}
+        self.generation_control = GenerationControl(
+            config.generation,
+            max_tokens=self.model.gpt.max_gen_mel_tokens,
+            stop_token=self.model.gpt.stop_audio_token
+        )
+        self.pipeline = None
+        if config.inference.pipeline_vocoder:
+            self.pipeline = PipelinedVocoder(
+                chunk_frames=config.inference.pipeline_chunk_frames,
+                context_frames=config.inference.pipeline_context_frames,
+                overlap_samples=config.inference.pipeline_overlap_samples,
+                device=self.device
+            )
+        self.batcher = None
+        if config.inference.continuous_batching:
+            self.batcher = ContinuousBatcher(
+                self.model.gpt.gpt_inference,
+                max_batch_size=config.inference.max_batch_size,
+                vocoder=self._vocode,
+                device=self.device
+            )
+            self.batcher.start()
+            logger.info(f"XTTS continuous batching enabled with {config.inference.max_batch_size} slots")
             
     def get_xtts(self, xtts_base_model_name):
         """Initialize and return the XTTS model"""
         try:
-            ModelManager().download_model(xtts_base_model_name)
+            with timed(self.load_timings, "download"):
+                ModelManager().download_model(xtts_base_model_name)
             model_path = os.path.join(get_user_data_dir("tts"), xtts_base_model_name.replace("/", "--"))
             config = XttsConfig()
             config.load_json(os.path.join(model_path, "config.json"))
-            xtts_base_model = Xtts.init_from_config(config)
-            xtts_base_model.load_checkpoint(config, checkpoint_dir=model_path, eval=True)
-            return xtts_base_model.to(self.device)
+            with timed(self.load_timings, "weights"):
+                xtts_base_model = Xtts.init_from_config(config)
+                load_xtts_checkpoint(xtts_base_model, config, model_path, self.weight_cache, "xtts", eval=True)
+                xtts_base_model = xtts_base_model.to(self.device)
+            with timed(self.load_timings, "optimize"):
+                return optimize_xtts(
+                    xtts_base_model,
+                    self.config.inference,
+                    self.device,
+                    precision=select_precision(self.config, self.device)
+                )
         except Exception as e:
             raise XTTSError(
                 message=f"Failed to initialize XTTS model: {str(e)}",
                 model_state="initialization_failed"
             )
 
+    def _synthesize_batched(self, text: str, lang_code: str, gpt_cond_latent, speaker_embedding,
+                            max_new_tokens: int, monitor, **sampling):
+        """Run the GPT stage through the shared decode batch; the vocoder runs on completion"""
+        gpt = self.model.gpt
+        language = lang_code.split("-")[0]
+        with torch.inference_mode():
+            text_tokens = torch.IntTensor(
+                self.model.tokenizer.encode(text.strip().lower(), lang=language)
+            ).unsqueeze(0).to(self.device)
+            prefix_emb = build_xtts_prefix(gpt, gpt_cond_latent.to(self.device), text_tokens)
+        future = self.batcher.submit(
+            prefix_emb,
+            start_token=gpt.start_audio_token,
+            stop_token=gpt.stop_audio_token,
+            max_new_tokens=max_new_tokens,
+            logits_processor=monitor,
+            payload=(text_tokens, gpt_cond_latent, speaker_embedding),
+            **sampling
+        )
+        try:
+            return np.atleast_1d(self._wait_batched(future))
+        except BaseException:
+            # The batcher drops cancelled requests at its next step, freeing the slot
+            future.cancel()
+            raise
+
+    def _wait_batched(self, future):
+        """Result of one batched request; gives up at the request's deadline, on a stopped batcher or after batch_timeout_seconds"""
+        token = current_token()
+        timeout = self.config.inference.batch_timeout_seconds
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        while True:
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeoutError:
+                if token is not None:
+                    token.check()
+                if not self.batcher.is_alive():
+                    raise XTTSError(message="XTTS decode batcher is not running", model_state="batcher_stopped")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise XTTSError(
+                        message=f"Batched XTTS request did not finish within {timeout}s",
+                        model_state="batcher_timeout"
+                    )
+
+    def _sentences(self, text: str, lang_code: str):
+        """
+        Text split as by Xtts.inference(enable_text_splitting=True); short
+        texts stay whole. Every path generates one sentence at a time.
+        """
+        language = lang_code.split("-")[0]
+        return split_sentence(text, language, self.model.tokenizer.char_limits[language])
+
+    def _synthesize_direct(self, text: str, lang_code: str, gpt_cond_latent, speaker_embedding,
+                           max_new_tokens: int, monitor, **sampling):
+        out = self.model.inference(
+            text,
+            lang_code,
+            gpt_cond_latent,
+            speaker_embedding,
+            max_new_tokens=max_new_tokens,
+            logits_processor=LogitsProcessorList([monitor]),
+            stopping_criteria=cancellation_criteria(),
+            **sampling
+        )
+        return np.array(out["wav"])
+
+    def _stream_pipelined(self, text: str, lang_code: str, gpt_cond_latent, speaker_embedding,
+                          max_new_tokens: int, monitor, **sampling):
+        """GPT and HiFi-GAN as two overlapping stages; yields audio chunks as they are decoded"""
+        latent_frames = xtts_latent_frames(
+            self.model,
+            text,
+            lang_code,
+            gpt_cond_latent.to(self.device),
+            max_new_tokens=max_new_tokens,
+            logits_processor=LogitsProcessorList([monitor]),
+            stopping_criteria=cancellation_criteria(),
+            do_sample=True,
+            **sampling
+        )
+        return self.pipeline.stream(latent_frames, xtts_vocoder(self.model, speaker_embedding.to(self.device)))
+
+    def _synthesize_pipelined(self, *args, **kwargs):
+        chunks = list(self._stream_pipelined(*args, **kwargs))
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+    def synthesize_stream(self, text: str, voice_id: str):
+        """
+        Yield float32 audio chunks at XTTS_SAMPLE_RATE as soon as they are
+        vocoded. Uses the pipelined path even when it is off for synthesize().
+        """
+        _, lang_code, gender = voice_id.split('_')
+        gpt_cond_latent, speaker_embedding = self._conditioning_latents(self.speakers[gender.lower()])
+        if self.pipeline is None:
+            self.pipeline = PipelinedVocoder(
+                chunk_frames=self.config.inference.pipeline_chunk_frames,
+                context_frames=self.config.inference.pipeline_context_frames,
+                overlap_samples=self.config.inference.pipeline_overlap_samples,
+                device=self.device
+            )
+        # One GPT generation per sentence, like synthesize(); their audio streams are chained
+        for sentence in self._sentences(text, lang_code):
+            yield from self._stream_pipelined(
+                sentence,
+                lang_code,
+                gpt_cond_latent,
+                speaker_embedding,
+                max_new_tokens=self.generation_control.token_budget(sentence, lang_code),
+                monitor=self.generation_control.new_monitor(),
+                **SAMPLING
+            )
+
+    def _vocode(self, result):
+        """Vocoder stage: recompute GPT latents for the generated codes and decode them like Xtts.inference"""
+        text_tokens, gpt_cond_latent, speaker_embedding = result.payload
+        gpt = self.model.gpt
+        with torch.inference_mode():
+            expected_output_len = torch.tensor([result.codes.shape[-1] * gpt.code_stride_len], device=self.device)
+            text_len = torch.tensor([text_tokens.shape[-1]], device=self.device)
+            gpt_latents = gpt(
+                text_tokens,
+                text_len,
+                result.codes,
+                expected_output_len,
+                cond_latents=gpt_cond_latent,
+                return_attentions=False,
+                return_latent=True
+            )
+            wav = self.model.hifigan_decoder(gpt_latents, g=speaker_embedding.to(self.device))
+        return wav.cpu().numpy().squeeze()
+
     def get_voices(self):
         grouped_voices = {}
         for code, name in sorted(XTTS_LANGUAGE_NAMES.items()):
@@ -71,12 +253,36 @@ class XttsService(BaseService):
         Synthesize speech using XTTS
         Returns: Path to the generated audio file
         """
+        audio_array, sample_rate = self.generate_audio(text, voice_id)
         try:
-            timestamp = int(time.time() * 10000000)
-            output_filename = f"realtime_{session_id}_{timestamp}.wav"
-            output_dir = self.base_dir / self.config.directories.audio_output_dir
-            output_path = output_dir / output_filename
+            output_filename, _ = self.save_audio(audio_array, sample_rate, session_id)
+        except Exception as e:
+            raise XTTSError(
+                message=f"Failed to save audio file: {str(e)}",
+                model_state="save_failed",
+                details={"session_id": session_id}
+            )
+        return output_filename
 
+    def _conditioning_latents(self, reference_audio: str):
+        """Conditioning of a reference voice; computed on its first request, then reused"""
+        latents = self._conditioning.get(reference_audio)
+        if latents is None:
+            latents = self.model.get_conditioning_latents(
+                audio_path=reference_audio,
+                gpt_cond_len=30,
+                gpt_cond_chunk_len=4,
+                max_ref_length=60
+            )
+            self._conditioning[reference_audio] = latents
+        return latents
+
+    def generate_audio(self, text: str, voice_id: str):
+        """
+        Synthesize speech using XTTS
+        Returns: (audio samples, sample rate)
+        """
+        try:
             _, lang_code, gender = voice_id.split('_')
             reference_audio = self.speakers[gender.lower()]
             
@@ -86,35 +292,25 @@ class XttsService(BaseService):
                     model_state="reference_missing"
                 )
             
-            gpt_cond_latent, speaker_embedding = self.model.get_conditioning_latents(
-                audio_path=reference_audio,
-                gpt_cond_len=30,
-                gpt_cond_chunk_len=4,
-                max_ref_length=60
-            )
+            gpt_cond_latent, speaker_embedding = self._conditioning_latents(reference_audio)
+            check_cancelled()
             
-            out = self.model.inference(
-                text,
+            if self.batcher is not None:
+                synthesize = self._synthesize_batched
+            elif self.pipeline is not None and self.config.inference.pipeline_vocoder:
+                synthesize = self._synthesize_pipelined
+            else:
+                synthesize = self._synthesize_direct
+            # Budget, stop monitor and runaway retries apply per sentence
+            wavs = self.generation_control.run_sentences(
+                lambda sentence, **kwargs: synthesize(sentence, lang_code, gpt_cond_latent, speaker_embedding, **kwargs),
+                self._sentences(text, lang_code),
                 lang_code,
-                gpt_cond_latent,
-                speaker_embedding,
-                temperature=0.75,
-                repetition_penalty=5.0
-            )    
-
-            audio_array = np.array(out["wav"])
-            write(output_path, XTTS_SAMPLE_RATE, audio_array)
-            
-            if os.path.exists(output_path):
-                return output_filename
-                
-            raise XTTSError(
-                message="Failed to save audio file",
-                model_state="save_failed",
-                details={"output_path": output_path}
+                **SAMPLING
             )
+            return np.concatenate([np.atleast_1d(wav) for wav in wavs]), XTTS_SAMPLE_RATE
 
-        except XTTSError:
+        except (XTTSError, RequestCancelledError):
             raise
         except Exception as e:
             error_msg = f"XTTS synthesis failed: {str(e)}"
@@ -127,7 +323,6 @@ class XttsService(BaseService):
                     "traceback": traceback.format_exc(),
                     "text": text,
                     "voice_id": voice_id,
-                    "session_id": session_id,
                     "lang_code": lang_code if 'lang_code' in locals() else None,
                     "gender": gender if 'gender' in locals() else None
                 }
@@ -1,9 +1,42 @@
-import torch
+import os
+import sys
+from typing import Optional, Tuple
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.audio_storage import AudioStorage
+from core.replica_pool import resolve_device
 
 class BaseService:
-    def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+    # soundfile subtype for saved WAV files; None keeps the PCM_16 default
+    audio_subtype = None
+
+    def __init__(self, device: Optional[str] = None):
+        self.device = resolve_device(device)
         self.languages = []
+        self.storage = None
+        # Seconds per load phase (download, weights, optimize, warmup, ...)
+        self.load_timings = {}
+
+    def get_output_path(self, session_id):
+        """
+        Allocate a sharded output path for a new audio file.
+        Returns: (relative filename, absolute output path)
+        """
+        if self.storage is None:
+            self.storage = AudioStorage(
+                self.base_dir / self.config.directories.audio_output_dir,
+                self.config.directories.audio_bucket_minutes
+            )
+        return self.storage.new_output_path(session_id)
+
+    def save_audio(self, audio: np.ndarray, sample_rate: int, session_id: str):
+        """
+        Write generated audio to a new output file.
+        Returns: (relative filename, absolute output path)
+        """
+        output_filename, output_path = self.get_output_path(session_id)
+        self.storage.write(output_path, audio, sample_rate, self.audio_subtype)
+        return output_filename, output_path
     
     def get_supported_languages(self):
         return self.languages
@@ -11,6 +44,13 @@ class BaseService:
     def get_voices(self):
         raise NotImplementedError
 
+    def generate_audio(self, text, voice_id) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize speech without touching the disk.
+        Returns: (audio samples, sample rate)
+        """
+        raise NotImplementedError
+
     def synthesize(self, text, voice_id, session_id):
         raise NotImplementedError
     
\ No newline at end of file
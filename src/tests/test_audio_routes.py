@@ -0,0 +1,49 @@
+# tests/test_audio_routes.py
+import pytest
+from unittest.mock import Mock
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from src.config.ConfigLoader import AudioServingConfig
+from src.core.audio_storage import AudioStorage
+from api.routes import register_routes
+
+@pytest.fixture
+def audio_client(tmp_path):
+    manager = Mock()
+    manager.storage = AudioStorage(str(tmp_path))
+    manager.config.audio_serving = AudioServingConfig()
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    register_routes(app, manager)
+
+    relative, path = manager.storage.new_output_path("session")
+    path.write_bytes(bytes(range(256)) * 16)
+    return app.test_client(), f"/audio/{relative}"
+
+def test_serve_audio_full(audio_client):
+    client, url = audio_client
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.data) == 4096
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert 'ETag' in response.headers
+
+def test_serve_audio_range(audio_client):
+    client, url = audio_client
+    response = client.get(url, headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert len(response.data) == 100
+    assert response.headers['Content-Range'] == 'bytes 0-99/4096'
+
+def test_serve_audio_conditional(audio_client):
+    client, url = audio_client
+    etag = client.get(url).headers['ETag']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_serve_audio_missing(audio_client):
+    client, _ = audio_client
+    assert client.get("/audio/197001010000/realtime_none_1.wav").status_code == 404
+    assert client.get("/audio/../secret.wav").status_code == 404
@@ -0,0 +1,32 @@
+# tests/test_audio_storage.py
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.audio_storage import AudioStorage
+
+def test_new_output_path_is_bucketed(tmp_path):
+    storage = AudioStorage(str(tmp_path), bucket_minutes=10)
+    relative, path = storage.new_output_path("session", timestamp=0)
+    assert relative == "197001010000/realtime_session_0.wav"
+    assert path == tmp_path / "197001010000" / "realtime_session_0.wav"
+    assert path.parent.is_dir()
+
+def test_resolve_round_trip(tmp_path):
+    storage = AudioStorage(str(tmp_path))
+    relative, path = storage.new_output_path("session")
+    assert storage.resolve(relative) == path
+    assert storage.resolve("realtime_legacy_1.wav") == tmp_path / "realtime_legacy_1.wav"
+
+def test_resolve_rejects_traversal(tmp_path):
+    storage = AudioStorage(str(tmp_path))
+    assert storage.resolve("../secret.wav") is None
+    assert storage.resolve("197001010000/../../secret.wav") is None
+    assert storage.resolve("notabucket/realtime_a_1.wav") is None
+
+def test_expired_buckets(tmp_path):
+    storage = AudioStorage(str(tmp_path), bucket_minutes=10)
+    now = time.time()
+    _, old_path = storage.new_output_path("old", timestamp=now - 3600)
+    _, new_path = storage.new_output_path("new", timestamp=now)
+    assert storage.expired_buckets(now - 1800) == [old_path.parent]
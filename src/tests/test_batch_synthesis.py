@@ -0,0 +1,105 @@
+# tests/test_batch_synthesis.py
+import os
+import sys
+import json
+import zipfile
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from src.config.ConfigLoader import SchedulerConfig
+# Imported as core.* (not src.core.*) so the cancellation classes match the ones the job uses
+from core.batch_synthesis import BatchJob, parse_manifest, RESULTS_FILE
+from core.scheduler import FairScheduler, BULK
+from core.file_cleanup import AudioFileCleanup
+
+class _Storage:
+    def __init__(self, root):
+        self.root = root
+
+    def resolve(self, filename):
+        path = self.root / filename
+        return path if path.exists() else None
+
+class _Manager:
+    """Writes the text as the 'audio'; voices in fail_voices raise"""
+
+    def __init__(self, root, fail_voices=()):
+        self.storage = _Storage(root)
+        self.scheduler = FairScheduler(SchedulerConfig())
+        self.cleanup_service = AudioFileCleanup(str(root))
+        self.fail_voices = set(fail_voices)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def engine_for_voice(self, voice_id):
+        return voice_id.split('_')[0]
+
+    def synthesize_speech(self, text, voice_id, session_id, token=None, priority=None, flow=None):
+        with self._lock:
+            self.calls.append((text, voice_id, priority))
+            index = len(self.calls)
+        if voice_id in self.fail_voices:
+            raise RuntimeError("engine error")
+        path = self.storage.root / f"realtime_{index}.wav"
+        path.write_text(text)
+        self.cleanup_service.register_file(path)
+        return path.name
+
+def _manifest(*entries):
+    return [json.dumps(entry) for entry in entries]
+
+def test_manifest_validation():
+    items = parse_manifest(_manifest({"text": "Hi", "voice_id": "xtts_en_female"}, {"id": "b", "text": "Yo", "voice_id": "kokoro_af_heart"}))
+    assert [item.id for item in items] == ["1", "b"]
+    for bad in (["not json"], _manifest({"id": "../x", "text": "a", "voice_id": "v"}),
+                _manifest({"id": "a", "text": "a", "voice_id": "v"}, {"id": "a", "text": "b", "voice_id": "v"}),
+                _manifest({"text": "", "voice_id": "v"}), []):
+        with pytest.raises(ValueError):
+            parse_manifest(bad)
+    with pytest.raises(ValueError):
+        parse_manifest(_manifest(*[{"text": "a", "voice_id": "v"}] * 3), max_items=2)
+
+def test_renders_outputs_with_results_and_archive(tmp_path):
+    (tmp_path / "audio").mkdir()
+    manager = _Manager(tmp_path / "audio")
+    items = parse_manifest(_manifest(
+        {"id": "a", "text": "one", "voice_id": "kokoro_af_heart"},
+        {"id": "b", "text": "two", "voice_id": "xtts_en_female"},
+        {"id": "c", "text": "three", "voice_id": "kokoro_af_heart"}
+    ))
+    job = BatchJob("job", items, tmp_path / "out" / "job", manager, archive=True)
+    job.run()
+
+    assert job.state == "completed" and job.counts["done"] == 3
+    # Moved out of the audio directory, so no longer the cleanup service's business
+    assert manager.cleanup_service.get_status()["tracked_files"] == 0
+    assert manager.cleanup_service.tracked_bytes == 0
+    assert (tmp_path / "out" / "job" / "b.wav").read_text() == "two"
+    assert all(priority == BULK for _, _, priority in manager.calls)
+    results = [json.loads(line) for line in open(tmp_path / "out" / "job" / RESULTS_FILE)]
+    assert [r["id"] for r in results] == ["a", "b", "c"]
+    with zipfile.ZipFile(job.archive_path) as archive:
+        assert {"a.wav", "b.wav", "c.wav", RESULTS_FILE, "manifest.json"} <= set(archive.namelist())
+
+def test_resume_skips_rendered_items_and_retries_failures(tmp_path):
+    (tmp_path / "audio").mkdir()
+    items = parse_manifest(_manifest(
+        {"id": "a", "text": "one", "voice_id": "kokoro_af_heart"},
+        {"id": "b", "text": "two", "voice_id": "xtts_en_female"}
+    ))
+    first = _Manager(tmp_path / "audio", fail_voices={"xtts_en_female"})
+    job = BatchJob("job", items, tmp_path / "job", first)
+    job.run()
+    assert job.counts == {"total": 2, "done": 1, "failed": 1, "skipped": 0}
+
+    second = _Manager(tmp_path / "audio")
+    job = BatchJob("job", items, tmp_path / "job", second)
+    job.run()
+    assert [text for text, _, _ in second.calls] == ["two"]
+    assert job.counts == {"total": 2, "done": 1, "failed": 0, "skipped": 1}
+    results = [json.loads(line) for line in open(tmp_path / "job" / RESULTS_FILE)]
+    assert [(r["id"], r["status"]) for r in results] == [("a", "ok"), ("b", "ok")]
+
+def test_dotted_job_ids_get_their_own_archive(tmp_path):
+    paths = {BatchJob(job_id, [], tmp_path / job_id, None).archive_path for job_id in ("v1.2", "v1.3")}
+    assert paths == {tmp_path / "v1.2.zip", tmp_path / "v1.3.zip"}
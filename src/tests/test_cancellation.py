@@ -0,0 +1,88 @@
+# tests/test_cancellation.py
+import os
+import sys
+import time
+import pickle
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import torch
+from unittest.mock import Mock
+from flask import Flask
+from src.config.ConfigLoader import DeadlineConfig
+from api.routes import register_routes
+# Imported as core.* like the engines do, so the request context variable is shared
+from core.cancellation import CancellationToken, bind_token, check_cancelled, current_token
+from core.error_handlers import RequestCancelledError, handle_tts_error
+from core.generation_control import cancellation_criteria
+from core.realtime_session import RealtimeSession
+
+def test_cancel_deadline_and_parent():
+    token = CancellationToken.with_timeout(0.05)
+    assert not token.cancelled and 0 < token.remaining() <= 0.05
+    time.sleep(0.06)
+    assert token.reason == "deadline"
+
+    parent = CancellationToken.with_timeout(30)
+    child = CancellationToken(parent=parent)
+    assert child.deadline == parent.deadline
+    parent.cancel()
+    assert child.reason == "cancelled"
+
+    flag = threading.Event()
+    flagged = CancellationToken(flag=flag)
+    flag.set()
+    assert flagged.cancelled
+
+def test_checkpoints_see_the_bound_token():
+    check_cancelled()  # outside a request: no-op
+    token = CancellationToken()
+    with bind_token(token):
+        assert current_token() is token
+        check_cancelled()
+        token.cancel("superseded")
+        with pytest.raises(RequestCancelledError) as error:
+            check_cancelled()
+    assert error.value.reason == "superseded"
+    assert current_token() is None
+
+def test_stopping_criteria_end_generation():
+    token = CancellationToken()
+    with bind_token(token):
+        criteria = cancellation_criteria()
+    input_ids = torch.zeros((2, 3), dtype=torch.long)
+    assert not criteria(input_ids, None).any()
+    token.cancel()
+    assert criteria(input_ids, None).all()
+    assert len(cancellation_criteria()) == 0
+
+def test_error_keeps_reason_across_processes():
+    error = pickle.loads(pickle.dumps(RequestCancelledError("Request deadline exceeded", reason="deadline")))
+    assert error.reason == "deadline"
+    response, status_code = handle_tts_error(error)
+    assert (response["error_type"], status_code) == ("cancelled", 504)
+    assert handle_tts_error(RequestCancelledError("gone"))[1] == 499
+
+def test_superseded_segments_are_cancelled():
+    request = CancellationToken.with_timeout(30)
+    session = RealtimeSession("s")
+    segments, _ = session.update("One. Two. ", token=request)
+    assert segments[1].token.deadline == request.deadline
+    session.update("One. Too. ")
+    assert not segments[0].token.cancelled
+    assert segments[1].token.reason == "superseded"
+    session.cancel()
+    assert segments[0].token.cancelled
+
+@pytest.mark.parametrize("deadline_seconds", ["soon", -5, 0])
+def test_invalid_deadline_is_rejected(deadline_seconds):
+    manager = Mock()
+    manager.config.deadlines = DeadlineConfig()
+    app = Flask(__name__)
+    register_routes(app, manager)
+    response = app.test_client().post("/generate-realtime", json={
+        "text": "Hello.", "voice_id": "kokoro_af_heart", "session_id": "s", "deadline_seconds": deadline_seconds
+    })
+    assert response.status_code == 400
+    assert response.json["success"] is False
+    manager.speak_realtime.assert_not_called()
@@ -0,0 +1,65 @@
+# tests/test_circuit_breaker.py
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_opens_after_threshold_and_fails_fast():
+    clock = _Clock()
+    breaker = CircuitBreaker("xtts", failure_threshold=2, open_seconds=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    clock.now = 10
+    assert breaker.retry_after() == 20
+
+def test_half_open_lets_a_single_probe_through():
+    clock = _Clock()
+    breaker = CircuitBreaker("xtts", open_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # A failed probe re-opens the breaker for another full period
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 59
+    assert not breaker.allow_request()
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.get_status()["times_opened"] == 2
+
+def test_reset_closes_after_rebuild():
+    breaker = CircuitBreaker("kokoro", open_seconds=300)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    breaker.reset()
+    assert breaker.allow_request()
+    assert breaker.get_status() == {
+        "state": CLOSED, "consecutive_failures": 0, "times_opened": 1, "retry_after": 0.0
+    }
+
+def test_released_probe_leaves_the_breaker_half_open():
+    clock = _Clock()
+    breaker = CircuitBreaker("xtts", open_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow_request()
+    # The probe was cancelled while queued: the next request probes instead
+    breaker.release_probe()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,139 @@
+# tests/test_continuous_batching.py
+import os
+import sys
+import time
+import random
+import functools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import pytest
+import torch
+from torch import nn
+from transformers import GPT2Config, GPT2Model
+from assets.gpt_inference import GPT2InferenceModel
+from src.core.continuous_batching import ContinuousBatcher, GenerationResult
+
+DIM = 64
+VOCAB = 40
+START_TOKEN = 38
+STOP_TOKEN = 39
+
+class _PositionEmbeddings(nn.Module):
+    def __init__(self, seq_len, model_dim):
+        super().__init__()
+        self.emb = nn.Embedding(seq_len, model_dim)
+
+    def forward(self, x):
+        return self.emb(torch.arange(0, x.shape[1], device=x.device))
+
+def _null_position_embeddings(range, dim):
+    return torch.zeros((range.shape[0], range.shape[1], dim), device=range.device)
+
+def _tiny_model():
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=VOCAB, n_positions=64, n_embd=DIM, n_layer=2, n_head=4)
+    gpt = GPT2Model(config)
+    del gpt.wpe
+    gpt.wpe = functools.partial(_null_position_embeddings, dim=DIM)
+    model = GPT2InferenceModel(
+        config, gpt, _PositionEmbeddings(64, DIM), nn.Embedding(VOCAB, DIM),
+        nn.LayerNorm(DIM), nn.Linear(DIM, VOCAB), kv_cache=True
+    )
+    return model.eval()
+
+def _solo_greedy(model, prefix_emb, max_new_tokens):
+    """Reference: the request decoded alone through the model's own forward"""
+    model.store_prefix_emb(prefix_emb)
+    prefix_len = prefix_emb.shape[1]
+    input_ids = torch.full((1, prefix_len + 1), START_TOKEN, dtype=torch.long)
+    tokens = []
+    with torch.no_grad():
+        outputs = model(input_ids=input_ids, use_cache=True, return_dict=True)
+        while True:
+            tokens.append(int(outputs.logits[0, -1].argmax()))
+            if tokens[-1] == STOP_TOKEN or len(tokens) >= max_new_tokens:
+                return tokens
+            outputs = model(input_ids=torch.tensor([[tokens[-1]]]), past_key_values=outputs.past_key_values,
+                            use_cache=True, return_dict=True)
+
+def _requests(count):
+    generator = torch.Generator().manual_seed(1)
+    rng = random.Random(2)
+    return [
+        (torch.randn(1, rng.randint(3, 10), DIM, generator=generator), rng.randint(1, 24))
+        for _ in range(count)
+    ]
+
+def test_simulated_load_matches_solo_decoding():
+    model = _tiny_model()
+    batcher = ContinuousBatcher(model, max_batch_size=4)
+    requests = _requests(12)
+    futures = []
+    # Staggered arrivals: a few requests join every other scheduling step
+    pending = list(requests)
+    step = 0
+    while pending or batcher.active or batcher.waiting:
+        if pending and step % 2 == 0:
+            for prefix_emb, max_new_tokens in pending[:2]:
+                futures.append(batcher.submit(prefix_emb, START_TOKEN, STOP_TOKEN, max_new_tokens, do_sample=False))
+            pending = pending[2:]
+        batcher.step()
+        step += 1
+
+    for (prefix_emb, max_new_tokens), future in zip(requests, futures):
+        result = future.result(timeout=5)
+        assert isinstance(result, GenerationResult)
+        assert result.codes[0].tolist() == _solo_greedy(model, prefix_emb, max_new_tokens)
+        assert result.latents.shape == (1, result.codes.shape[1], DIM)
+
+    status = batcher.get_status()
+    assert status["completed"] == len(requests)
+    assert 1 < status["mean_batch_size"] <= 4
+    batcher.stop()
+
+def test_short_request_leaves_before_long_one():
+    model = _tiny_model()
+    batcher = ContinuousBatcher(model, max_batch_size=2)
+    long_future = batcher.submit(torch.randn(1, 4, DIM), START_TOKEN, -1, 30, do_sample=False)
+    batcher.step()
+    short_future = batcher.submit(torch.randn(1, 6, DIM), START_TOKEN, -1, 3, do_sample=False)
+    while not short_future.done():
+        batcher.step()
+    assert not long_future.done()
+    assert len(batcher.active) == 1
+    batcher.run_until_idle()
+    assert len(long_future.result().codes[0]) == 30
+    batcher.stop()
+
+def test_background_loop_hands_results_to_vocoder():
+    model = _tiny_model()
+    batcher = ContinuousBatcher(model, max_batch_size=3, vocoder=lambda result: ("wav", result.payload, result.codes.shape[1]))
+    batcher.start()
+    requests = _requests(6)
+    futures = [
+        batcher.submit(prefix_emb, START_TOKEN, STOP_TOKEN, max_new_tokens, do_sample=True,
+                       temperature=0.8, top_k=10, top_p=0.9, repetition_penalty=2.0, payload=index)
+        for index, (prefix_emb, max_new_tokens) in enumerate(requests)
+    ]
+    for index, future in enumerate(futures):
+        kind, payload, length = future.result(timeout=30)
+        assert kind == "wav" and payload == index
+        assert 1 <= length <= requests[index][1]
+    batcher.stop()
+
+def test_stopped_loop_fails_unfinished_requests():
+    model = _tiny_model()
+    batcher = ContinuousBatcher(model, max_batch_size=1)
+    slow = lambda input_ids, scores: (time.sleep(0.05), scores)[1]
+    futures = [
+        batcher.submit(torch.randn(1, 4, DIM), START_TOKEN, -1, 50, do_sample=False, logits_processor=slow)
+        for _ in range(2)
+    ]
+    batcher.start()
+    while not batcher.active:
+        time.sleep(0.01)
+    batcher.stop()
+    assert not batcher.is_alive()
+    # The active request and the one still waiting both fail instead of hanging
+    for future in futures:
+        with pytest.raises(RuntimeError, match="batcher stopped"):
+            future.result(timeout=5)
@@ -0,0 +1,32 @@
+# tests/test_cpu_profile.py
+import os
+import sys
+import torch
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.ConfigLoader import CpuProfileConfig, InferenceConfig
+from src.core.cpu_profile import parse_cpulist, select_precision, apply_cpu_profile
+
+def _config(**profile):
+    return SimpleNamespace(
+        cpu_profile=CpuProfileConfig(**profile),
+        inference=InferenceConfig(precision="fp16")
+    )
+
+def test_parse_cpulist():
+    assert parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpulist("") == []
+
+def test_select_precision():
+    assert select_precision(_config(quantize=True), "cpu") == "int8"
+    assert select_precision(_config(quantize=True), "cuda") == "fp16"
+    assert select_precision(_config(), "cpu") == "fp16"
+    assert select_precision(_config(enabled=False, quantize=True), "cpu") == "fp16"
+
+def test_apply_cpu_profile_sets_threads():
+    previous = torch.get_num_threads()
+    try:
+        applied = apply_cpu_profile(_config(num_threads=2))
+        assert applied["num_threads"] == 2
+    finally:
+        torch.set_num_threads(previous)
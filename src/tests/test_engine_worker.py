@@ -0,0 +1,118 @@
+# tests/test_engine_worker.py
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+import soundfile as sf
+from src.core import engine_worker
+from src.core.audio_storage import AudioStorage
+from src.core.engine_worker import EngineWorker
+# core.* as imported by engine_worker, so tokens and errors are the same objects
+from core.cancellation import CancellationToken, bind_token, check_cancelled
+from core.error_handlers import RequestCancelledError
+
+SAMPLE_RATE = 8000
+
+class ToneService:
+    """Stand-in engine: voice 'tone_<seconds>' returns a sine of that length"""
+    audio_subtype = "FLOAT"
+
+    def __init__(self, config, device=None):
+        self.device = device
+
+    def get_supported_languages(self):
+        return ["English"]
+
+    def get_voices(self):
+        return {"English": ["tone_1"]}
+
+    def generate_audio(self, text, voice_id):
+        if voice_id == "tone_crash":
+            os._exit(3)
+        if voice_id == "tone_fail":
+            raise ValueError(f"cannot say {text}")
+        if voice_id == "tone_wait":
+            # Runs until the request is cancelled, like a long generation with checkpoints
+            for _ in range(1000):
+                check_cancelled()
+                time.sleep(0.01)
+        seconds = float(voice_id.split("_")[1])
+        t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+        return np.sin(2 * np.pi * 440 * t).astype(np.float32), SAMPLE_RATE
+
+@pytest.fixture
+def worker():
+    worker = EngineWorker("tone", f"{ToneService.__module__}:ToneService", buffer_bytes=16 * 1024, start_timeout=120)
+    yield worker
+    worker.shutdown()
+
+def _expected(seconds):
+    return ToneService(None).generate_audio("", f"tone_{seconds}")[0]
+
+def test_audio_comes_back_through_shared_memory(worker, tmp_path):
+    assert worker.get_voices() == {"English": ["tone_1"]}
+    audio, sample_rate = worker.generate_audio("hi", "tone_0.5")
+    assert sample_rate == SAMPLE_RATE
+    assert np.array_equal(audio, _expected(0.5))
+
+    # 2 s of float32 does not fit the 16 KiB buffer: it is grown and reused
+    worker.storage = AudioStorage(str(tmp_path))
+    filename = worker.synthesize("hi", "tone_2", "session")
+    written, _ = sf.read(str(worker.storage.resolve(filename)), dtype="float32")
+    assert np.array_equal(written, _expected(2))
+    status = worker.get_status()
+    assert status["buffer_bytes"] >= 2 * SAMPLE_RATE * 4
+    assert status["requests"] == 2
+    assert status["ipc_overhead_ms"]["mean"] >= 0
+
+def test_service_errors_reach_the_caller(worker):
+    with pytest.raises(ValueError, match="cannot say hi"):
+        worker.generate_audio("hi", "tone_fail")
+    assert worker.generate_audio("hi", "tone_0.1")[0].shape == (800,)
+
+def test_cancellation_reaches_the_worker(worker):
+    token = CancellationToken()
+    threading.Timer(0.3, token.cancel).start()
+    start_time = time.monotonic()
+    with bind_token(token), pytest.raises(RequestCancelledError) as error:
+        worker.generate_audio("hi", "tone_wait")
+    assert error.value.reason == "cancelled"
+    assert time.monotonic() - start_time < 5
+
+    # The deadline travels with the request
+    with bind_token(CancellationToken.with_timeout(0.3)), pytest.raises(RequestCancelledError) as error:
+        worker.generate_audio("hi", "tone_wait")
+    assert error.value.reason == "deadline"
+    assert worker.generate_audio("hi", "tone_0.1")[0].shape == (800,)
+
+def test_crashed_worker_is_replaced(worker):
+    first_pid = worker.get_status()["pid"]
+    with pytest.raises(engine_worker.EngineWorkerError, match="exited with code 3"):
+        worker.generate_audio("hi", "tone_crash")
+
+    audio, _ = worker.generate_audio("hi", "tone_0.1")
+    assert np.array_equal(audio, _expected(0.1))
+    status = worker.get_status()
+    assert status["restarts"] == 1
+    assert status["state"] == "ready"
+    assert status["pid"] != first_pid
+
+def test_metrics_do_not_wait_for_a_busy_worker(worker):
+    token = CancellationToken()
+
+    def busy():
+        with bind_token(token), pytest.raises(RequestCancelledError):
+            worker.generate_audio("hi", "tone_wait")
+
+    thread = threading.Thread(target=busy)
+    thread.start()
+    time.sleep(0.3)
+    start_time = time.monotonic()
+    assert worker.get_metrics() == {}
+    assert time.monotonic() - start_time < 1
+    token.cancel()
+    thread.join()
+    assert worker.get_status()["restarts"] == 0
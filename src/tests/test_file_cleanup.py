@@ -0,0 +1,96 @@
+# tests/test_file_cleanup.py
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.file_cleanup import AudioFileCleanup
+from src.core.audio_storage import AudioStorage
+
+def _write(directory, name, size=100):
+    path = directory / name
+    path.write_bytes(b"\0" * size)
+    return path
+
+def test_register_file_tracks_bytes(tmp_path):
+    cleanup = AudioFileCleanup(str(tmp_path))
+    cleanup.register_file(_write(tmp_path, "realtime_a_1.wav", 100))
+    cleanup.register_file(_write(tmp_path, "realtime_b_2.wav", 50))
+    cleanup.register_file(_write(tmp_path, "notes.txt", 10))
+    assert cleanup.tracked_bytes == 150
+    assert cleanup.get_status()["tracked_files"] == 2
+
+def test_cleanup_deletes_only_expired(tmp_path):
+    cleanup = AudioFileCleanup(str(tmp_path), max_age_hours=1, min_free_space_mb=0)
+    old = _write(tmp_path, "realtime_a_1.wav")
+    new = _write(tmp_path, "realtime_b_2.wav")
+    cleanup.register_file(old, created_at=time.time() - 7200)
+    cleanup.register_file(new)
+
+    cleanup.cleanup_files()
+
+    assert not old.exists()
+    assert new.exists()
+    assert cleanup.cleanup_stats["files_deleted"] == 1
+    assert cleanup.tracked_bytes == 100
+
+def test_reregistered_file_is_not_expired_early(tmp_path):
+    cleanup = AudioFileCleanup(str(tmp_path), max_age_hours=1, min_free_space_mb=0)
+    path = _write(tmp_path, "realtime_a_1.wav")
+    cleanup.register_file(path, created_at=time.time() - 7200)
+    cleanup.register_file(path, created_at=time.time())
+
+    cleanup.cleanup_files()
+
+    assert path.exists()
+    assert cleanup.tracked_bytes == 100
+
+def test_low_space_deletes_oldest_first(tmp_path):
+    cleanup = AudioFileCleanup(str(tmp_path), max_age_hours=24)
+    oldest = _write(tmp_path, "realtime_a_1.wav")
+    newest = _write(tmp_path, "realtime_b_2.wav")
+    cleanup.register_file(oldest, created_at=time.time() - 60)
+    cleanup.register_file(newest, created_at=time.time())
+    # Pretend we are 50 bytes short of the free space target
+    cleanup.get_free_space = lambda: cleanup.min_free_space_bytes - 50
+
+    cleanup.cleanup_files()
+
+    assert not oldest.exists()
+    assert newest.exists()
+
+def test_reconcile_index_runs_once(tmp_path):
+    _write(tmp_path, "realtime_a_1.wav")
+    cleanup = AudioFileCleanup(str(tmp_path))
+    cleanup.reconcile_index()
+    _write(tmp_path, "realtime_b_2.wav")
+    cleanup.reconcile_index()
+    assert cleanup.get_status()["tracked_files"] == 1
+
+def test_expired_bucket_dropped_whole(tmp_path):
+    storage = AudioStorage(str(tmp_path), bucket_minutes=10)
+    cleanup = AudioFileCleanup(str(tmp_path), max_age_hours=1, min_free_space_mb=0, storage=storage)
+    old_time = time.time() - 3 * 3600
+    _, old_path = storage.new_output_path("old", timestamp=old_time)
+    old_path.write_bytes(b"\0" * 100)
+    cleanup.register_file(old_path, created_at=old_time)
+    _, new_path = storage.new_output_path("new")
+    new_path.write_bytes(b"\0" * 100)
+    cleanup.register_file(new_path)
+
+    cleanup.cleanup_files()
+
+    assert not old_path.parent.exists()
+    assert new_path.exists()
+    assert cleanup.cleanup_stats["files_deleted"] == 1
+    assert cleanup.tracked_bytes == 100
+
+def test_low_space_falls_back_to_unindexed_files(tmp_path):
+    cleanup = AudioFileCleanup(str(tmp_path), max_age_hours=24)
+    # Written outside the manager, so never registered
+    stray = _write(tmp_path, "manual_export.wav")
+    cleanup.get_free_space = lambda: cleanup.min_free_space_bytes - 50
+
+    cleanup.cleanup_files()
+
+    assert not stray.exists()
+    assert cleanup.cleanup_stats["files_deleted"] == 1
@@ -0,0 +1,80 @@
+# tests/test_generation_control.py
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import torch
+from src.config.ConfigLoader import GenerationConfig
+from src.core.generation_control import GenerationControl, StopTokenMonitor
+
+STOP_TOKEN = 9
+
+def test_token_budget_scales_with_text_and_language():
+    control = GenerationControl(GenerationConfig(), max_tokens=605, stop_token=STOP_TOKEN)
+    assert control.token_budget("Hi.", "en") == 60
+    assert control.token_budget("a" * 100, "en") == 300
+    assert control.token_budget("a" * 100, "zh-cn") == 605
+    assert control.token_budget("a" * 1000, "en") == 605
+
+    disabled = GenerationControl(GenerationConfig(enabled=False), max_tokens=605, stop_token=STOP_TOKEN)
+    assert disabled.token_budget("Hi.", "en") == 605
+
+def test_monitor_forces_confident_stop_token():
+    monitor = StopTokenMonitor(STOP_TOKEN, stop_threshold=0.3)
+    scores = torch.zeros(2, 10)
+    scores[0, 0] = 5.0  # stop token unlikely
+    scores[1, STOP_TOKEN] = 2.0
+    scores[1, 0] = 2.5  # stop token below the top choice but above the threshold
+    scores[1, 1:STOP_TOKEN] = -10.0
+    out = monitor(torch.zeros(2, 1, dtype=torch.long), scores)
+    assert out[0].argmax() == 0
+    assert out[1].argmax() == STOP_TOKEN and torch.isinf(out[1, 0])
+    assert monitor.forced_stop and monitor.steps == 1
+
+def test_runaway_generation_is_retried_with_cooler_temperature():
+    control = GenerationControl(GenerationConfig(), max_tokens=605, stop_token=STOP_TOKEN)
+    calls = []
+
+    def generate(max_new_tokens, monitor, temperature):
+        calls.append((max_new_tokens, temperature))
+        # First attempt runs to the budget, the retry stops early
+        steps = max_new_tokens if len(calls) == 1 else 10
+        for _ in range(steps):
+            monitor(None, torch.zeros(1, 10))
+        return len(calls)
+
+    assert control.run(generate, "Hello there.", "en", temperature=0.75) == 2
+    assert calls[0] == (60, 0.75)
+    assert abs(calls[1][1] - 0.75 * 0.7) < 1e-9
+    metrics = control.get_metrics()
+    assert metrics["budget_hits"] == 1 and metrics["retries"] == 1 and metrics["recovered"] == 1
+    assert metrics["truncated"] == 0
+
+def test_persistent_runaway_returns_truncated_output():
+    control = GenerationControl(GenerationConfig(max_retries=1), max_tokens=605, stop_token=STOP_TOKEN)
+
+    def generate(max_new_tokens, monitor, **sampling):
+        for _ in range(max_new_tokens):
+            monitor(None, torch.zeros(1, 10))
+        return "audio"
+
+    assert control.run(generate, "Hello there.", "en", temperature=0.75) == "audio"
+    metrics = control.get_metrics()
+    assert metrics["budget_hits"] == 2 and metrics["truncated"] == 1
+    assert metrics["truncated_rate"] == 1.0
+
+def test_split_text_gets_a_budget_per_sentence():
+    control = GenerationControl(GenerationConfig(), max_tokens=605, stop_token=STOP_TOKEN)
+    # 600 chars need ~1800 tokens in total, far past the model maximum for one generation
+    sentences = ["a" * 150] * 4
+    calls = []
+
+    def generate(sentence, max_new_tokens, monitor, temperature):
+        calls.append(max_new_tokens)
+        for _ in range(max_new_tokens - 10):
+            monitor(None, torch.zeros(1, 10))
+        return sentence
+
+    assert control.run_sentences(generate, sentences, "en", temperature=0.75) == sentences
+    assert calls == [450] * 4
+    metrics = control.get_metrics()
+    assert metrics["budget_hits"] == 0 and metrics["retries"] == 0 and metrics["truncated"] == 0
@@ -0,0 +1,89 @@
+# tests/test_gpt_inference.py
+import os
+import sys
+import functools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import torch
+from torch import nn
+from transformers import GPT2Config, GPT2Model
+from assets.gpt_inference import GPT2InferenceModel, StaticKVCache
+
+DIM = 64
+VOCAB = 50
+PREFIX_LEN = 5
+
+class _PositionEmbeddings(nn.Module):
+    def __init__(self, seq_len, model_dim):
+        super().__init__()
+        self.emb = nn.Embedding(seq_len, model_dim)
+
+    def forward(self, x):
+        return self.emb(torch.arange(0, x.shape[1], device=x.device))
+
+def _null_position_embeddings(range, dim):
+    return torch.zeros((range.shape[0], range.shape[1], dim), device=range.device)
+
+def _tiny_model():
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=VOCAB, n_positions=64, n_embd=DIM, n_layer=2, n_head=4)
+    gpt = GPT2Model(config)
+    del gpt.wpe
+    gpt.wpe = functools.partial(_null_position_embeddings, dim=DIM)
+    model = GPT2InferenceModel(
+        config, gpt, _PositionEmbeddings(64, DIM), nn.Embedding(VOCAB, DIM),
+        nn.LayerNorm(DIM), nn.Linear(DIM, VOCAB), kv_cache=True
+    )
+    model.store_prefix_emb(torch.randn(1, PREFIX_LEN, DIM, generator=torch.Generator().manual_seed(1)))
+    return model.eval()
+
+def _greedy_logits(model, batch_size=2, steps=8):
+    input_ids = torch.zeros(batch_size, PREFIX_LEN + 1, dtype=torch.long)
+    with torch.no_grad():
+        outputs = model(input_ids=input_ids, use_cache=True, return_dict=True)
+        logits = [outputs.logits[:, -1]]
+        for _ in range(steps):
+            next_token = outputs.logits[:, -1:].argmax(-1)
+            outputs = model(input_ids=next_token, past_key_values=outputs.past_key_values,
+                            use_cache=True, return_dict=True)
+            logits.append(outputs.logits[:, -1])
+    return torch.stack(logits)
+
+def test_static_cache_matches_dynamic_cache():
+    model = _tiny_model()
+    expected = _greedy_logits(model)
+    model.enable_static_cache()
+    assert torch.allclose(_greedy_logits(model), expected, atol=1e-5)
+    assert isinstance(model.static_cache, StaticKVCache)
+
+def test_fixed_shape_decode_step_matches_dynamic_cache():
+    model = _tiny_model()
+    expected = _greedy_logits(model)
+    # On CPU the graph-capturable step runs eagerly
+    model.enable_static_cache(cuda_graph=True)
+    assert torch.allclose(_greedy_logits(model), expected, atol=1e-5)
+
+def test_static_cache_reorder_matches_tuple_reorder():
+    model = _tiny_model()
+    model.enable_static_cache()
+    with torch.no_grad():
+        outputs = model(input_ids=torch.zeros(3, PREFIX_LEN + 1, dtype=torch.long),
+                        use_cache=True, return_dict=True)
+    cache = outputs.past_key_values
+    beam_idx = torch.tensor([2, 0, 0])
+    expected = GPT2InferenceModel._reorder_cache(tuple(cache), beam_idx)
+    reordered = GPT2InferenceModel._reorder_cache(cache, beam_idx)
+    assert reordered is cache
+    for (key, value), (expected_key, expected_value) in zip(reordered, expected):
+        assert torch.equal(key, expected_key)
+        assert torch.equal(value, expected_value)
+
+def test_beam_search_static_cache_matches_dynamic_cache():
+    model = _tiny_model()
+    input_ids = torch.zeros(1, PREFIX_LEN + 1, dtype=torch.long)
+    kwargs = dict(num_beams=3, num_return_sequences=3, max_new_tokens=10,
+                  do_sample=False, pad_token_id=0, eos_token_id=VOCAB - 1)
+    with torch.no_grad():
+        expected = model.generate(input_ids, **kwargs)
+        model.enable_static_cache()
+        actual = model.generate(input_ids, **kwargs)
+    assert torch.equal(actual, expected)
@@ -0,0 +1,55 @@
+# tests/test_latency_estimator.py
+import os
+import sys
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from src.config.ConfigLoader import LatencyConfig
+from src.core.latency_estimator import DecayedRegression, LatencyEstimator
+
+def test_regression_recovers_overhead_and_rate():
+    model = DecayedRegression(decay=1.0)
+    for chars in (10, 40, 80, 160, 320):
+        model.add(chars, 0.5 + 0.02 * chars)
+    overhead, rate = model.coefficients()
+    assert overhead == pytest.approx(0.5)
+    assert rate == pytest.approx(0.02)
+    assert model.predict(100) == pytest.approx(2.5)
+
+def test_decay_follows_a_slower_engine():
+    model = DecayedRegression(decay=0.9)
+    for _ in range(50):
+        for chars in (20, 100):
+            model.add(chars, 0.01 * chars)
+    for _ in range(50):
+        for chars in (20, 100):
+            model.add(chars, 0.05 * chars)
+    assert model.predict(100) == pytest.approx(5.0, rel=0.01)
+
+def test_voice_engine_and_prior_predictions():
+    estimator = LatencyEstimator(LatencyConfig(decay=1.0, min_voice_samples=3), priors={"indic": 0.1})
+    assert estimator.predict("indic", 10) == (pytest.approx(1.0), "prior")
+
+    for chars in (10, 20, 30):
+        estimator.observe("xtts", chars, 0.1 * chars, "xtts_en_female")
+    estimator.observe("xtts", 10, 5.0, "xtts_de_male")
+    seconds, model = estimator.predict("xtts", 20, "xtts_en_female")
+    assert model == "voice" and seconds == pytest.approx(2.0)
+    # Too few samples of its own: the engine-wide fit answers
+    assert estimator.predict("xtts", 20, "xtts_de_male")[1] == "engine"
+    assert "xtts_en_female" in estimator.get_status()["xtts"]["voices"]
+
+def test_seeds_from_load_test_results(tmp_path):
+    results = [
+        {"voice_id": "kokoro_af_heart", "text_length": 40, "latency": 9.0, "success": True,
+         "response_data": {"timing_info": {"total_generation_time": 0.4}}},
+        {"voice_id": "kokoro_af_heart", "text_length": 40, "latency": 9.0, "success": False},
+        {"voice_id": "xtts_en_female", "text_length": 40, "latency": 4.0, "success": True}
+    ]
+    (tmp_path / "run.json").write_text(json.dumps({"results": results}))
+    # Benchmark output in the same directory has another shape
+    (tmp_path / "bench.json").write_text(json.dumps({"results": {"cpu": 1}}))
+    estimator = LatencyEstimator(LatencyConfig(decay=1.0))
+    assert estimator.seed_from_results(tmp_path, lambda voice_id: voice_id.split('_')[0]) == 2
+    assert estimator.predict("kokoro", 40)[0] == pytest.approx(0.4)
+    assert estimator.predict("xtts", 40)[0] == pytest.approx(4.0)
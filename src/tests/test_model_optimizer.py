@@ -0,0 +1,48 @@
+# tests/test_model_optimizer.py
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import torch
+from transformers import GPT2Config, GPT2Model
+from src.core.model_optimizer import resolve_precision, conv1d_to_linear, quantize_int8, wrap_inference_calls
+
+def _tiny_gpt2():
+    torch.manual_seed(0)
+    return GPT2Model(GPT2Config(n_layer=2, n_embd=64, n_head=4, n_positions=64)).eval()
+
+def test_resolve_precision_cpu_fallbacks():
+    assert resolve_precision("fp16", "cpu") == "fp32"
+    assert resolve_precision("bf16", "cpu") == "bf16"
+    assert resolve_precision("int8", "cpu") == "int8"
+    assert resolve_precision("int4", "cpu") == "fp32"
+
+def test_conv1d_to_linear_is_exact():
+    model = _tiny_gpt2()
+    inputs = torch.randint(0, 100, (2, 8))
+    with torch.no_grad():
+        expected = model(inputs).last_hidden_state
+        conv1d_to_linear(model)
+        actual = model(inputs).last_hidden_state
+    assert torch.equal(expected, actual)
+
+def test_quantize_int8_stays_close():
+    model = _tiny_gpt2()
+    inputs = torch.randint(0, 100, (2, 8))
+    with torch.no_grad():
+        expected = model(inputs).last_hidden_state
+        quantized = quantize_int8(model)
+        actual = quantized(inputs).last_hidden_state
+    assert torch.nn.functional.cosine_similarity(expected.flatten(), actual.flatten(), dim=0) > 0.99
+
+def test_wrapped_generators_run_in_inference_mode():
+    class Model:
+        def inference(self):
+            return torch.is_inference_mode_enabled()
+
+        def inference_stream(self):
+            for _ in range(2):
+                yield torch.is_inference_mode_enabled()
+
+    model = wrap_inference_calls(Model(), ["inference", "inference_stream"], "cpu", "fp32")
+    assert model.inference()
+    assert list(model.inference_stream()) == [True, True]
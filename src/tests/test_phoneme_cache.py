@@ -0,0 +1,39 @@
+# tests/test_phoneme_cache.py
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.phoneme_cache import PhonemeCache
+
+def test_lru_keeps_recent_entries_per_language():
+    cache = PhonemeCache(sentence_entries=2)
+    computed = []
+
+    def g2p(text):
+        return lambda: computed.append(text) or text.upper()
+
+    for text in ("a", "b", "a", "c", "b"):
+        cache.get_or_compute("en", "sentence", text, g2p(text))
+    # "b" was evicted by "c" (least recently used after "a" was hit)
+    assert computed == ["a", "b", "c", "b"]
+    assert cache.get_or_compute("fr", "sentence", "a", g2p("a")) == "A"
+    status = cache.get_status()
+    assert status["en"]["sentence"] == {"entries": 2, "hits": 1, "misses": 4, "hit_rate": 0.2}
+    assert status["fr"]["sentence"]["misses"] == 1
+
+def test_persisted_cache_is_reloaded(tmp_path):
+    path = tmp_path / "phonemes.json"
+    cache = PhonemeCache(persist_path=path)
+    cache.get_or_compute("a", "sentence", "Hello.", lambda: [("Hello.", "həlˈO.")])
+    cache.get_or_compute("a", "word", "Nevitech", lambda: ("nˈɛvitɛk", 1))
+    cache.save()
+
+    reloaded = PhonemeCache(persist_path=path)
+    assert reloaded.get_or_compute("a", "sentence", "Hello.", lambda: None) == [["Hello.", "həlˈO."]]
+    assert reloaded.get_or_compute("a", "word", "Nevitech", lambda: None) == ["nˈɛvitɛk", 1]
+    assert reloaded.get_status()["a"]["word"]["hits"] == 1
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "phonemes.json"
+    path.write_text("{not json")
+    cache = PhonemeCache(persist_path=path)
+    assert cache.get_status() == {}
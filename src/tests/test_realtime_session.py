@@ -0,0 +1,63 @@
+# tests/test_realtime_session.py
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.realtime_session import RealtimeSession, RealtimeSessionStore
+
+def _texts(segments):
+    return [segment.text for segment in segments]
+
+def test_only_newly_completed_sentences_are_claimed():
+    session = RealtimeSession("s")
+    assert _texts(session.update("Hello world. How")[0]) == ["Hello world."]
+    assert _texts(session.update("Hello world. How are ")[0]) == []
+    segments, superseded = session.update("Hello world. How are you? Fine ")
+    assert _texts(segments) == ["How are you?"] and superseded == []
+    # Enter flushes the unterminated tail; punctuation-only pieces are skipped
+    assert _texts(session.update("Hello world. How are you? Fine ... ok", final=True)[0]) == ["Fine ...", "ok"]
+    assert [segment.seq for segment in session.segments] == [0, 1, 2, 3]
+
+def test_edit_supersedes_later_sentences():
+    session = RealtimeSession("s")
+    first, _ = session.update("One. Two. Three. ")
+    session.finish(first[0])
+    segments, superseded = session.update("One. Too. Three. ")
+    assert superseded == [1, 2]
+    assert _texts(segments) == ["Too.", "Three."]
+    assert [segment.seq for segment in segments] == [3, 4]
+    # Superseded segments no longer block the turn order
+    assert session.wait_turn(segments[0], timeout=0)
+    assert not session.wait_turn(first[1], timeout=0)
+
+def test_segments_run_in_seq_order_across_requests():
+    session = RealtimeSession("s")
+    first, _ = session.update("First sentence. ")
+    second, _ = session.update("First sentence. Second one. ")
+    order = []
+
+    def speak(segment, delay):
+        assert session.wait_turn(segment, timeout=5)
+        time.sleep(delay)
+        order.append(segment.seq)
+        session.finish(segment)
+
+    later = threading.Thread(target=speak, args=(second[0], 0))
+    later.start()
+    time.sleep(0.05)
+    speak(first[0], 0.05)
+    later.join()
+    assert order == [0, 1]
+
+def test_rewind_gives_text_back_and_clear_cancels():
+    store = RealtimeSessionStore()
+    session = store.get("s")
+    segments, _ = session.update("Fails here. Queued behind. ")
+    assert session.rewind(segments[0]) == [0, 1]
+    session.finish(segments[0])
+    assert _texts(session.update("Fails here. Queued behind. ")[0]) == ["Fails here.", "Queued behind."]
+
+    store.clear("s")
+    assert store.get_status()["superseded"] == 2
+    assert store.get("s") is not session
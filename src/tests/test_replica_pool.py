@@ -0,0 +1,69 @@
+# tests/test_replica_pool.py
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import torch
+from src.core.replica_pool import ReplicaPool, resolve_device
+
+class _FakeService:
+    def __init__(self, device, delay=0.0):
+        self.device = device
+        self.delay = delay
+        self.calls = 0
+        self.languages = ["English"]
+
+    def get_voices(self):
+        return {"English": ["voice"]}
+
+    def synthesize(self, text, voice_id, session_id):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"{session_id}.wav"
+
+@pytest.mark.skipif(torch.cuda.is_available(), reason="checks the CPU fallbacks")
+def test_resolve_device_falls_back_to_cpu():
+    assert resolve_device(None) == "cpu"
+    assert resolve_device("auto") == "cpu"
+    assert resolve_device("cuda:1") == "cpu"
+    assert resolve_device("cpu:2") == "cpu"
+
+def test_requests_go_to_least_loaded_replica():
+    pool = ReplicaPool("fake", lambda device: _FakeService(device, delay=0.05), ["cpu:0", "cpu:1", "cpu:2"])
+    threads = [
+        threading.Thread(target=pool.synthesize, args=("hi", "fake_voice", f"s{i}"))
+        for i in range(9)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.service.calls for r in pool.replicas] == [3, 3, 3]
+    assert all(status["in_flight"] == 0 and status["served"] == 3 for status in pool.get_status())
+
+def test_busy_replica_is_skipped():
+    pool = ReplicaPool("fake", lambda device: _FakeService(device), ["cpu", "cpu"])
+    with pool.acquire() as busy:
+        with pool.acquire() as other:
+            assert other is not busy
+    assert pool.synthesize("hi", "fake_voice", "s") == "s.wav"
+
+def test_pool_stands_in_for_a_single_service():
+    pool = ReplicaPool("fake", lambda device: _FakeService(device), [None])
+    assert pool.get_voices() == {"English": ["voice"]}
+    assert pool.languages == ["English"]
+    assert len(pool.replicas) == 1
+
+def test_expected_wait_tracks_queue_and_latency():
+    pool = ReplicaPool("fake", lambda device: _FakeService(device, delay=0.05), ["cpu", "cpu"])
+    assert pool.expected_wait() == 0.0
+    pool.synthesize("hi", "fake_voice", "s")
+    assert 0.04 < pool.latency_ewma < 0.2
+    with pool.acquire():
+        # The other replica is still free
+        assert pool.expected_wait() == 0.0
+        with pool.acquire():
+            assert pool.expected_wait() == pytest.approx(pool.latency_ewma)
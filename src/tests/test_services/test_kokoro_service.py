@@ -12,4 +12,47 @@ def kokoro_service(test_config, mock_pipeline):
     with patch('services.KokoroService.KPipeline', return_value=mock_pipeline):
         service = KokoroService(test_config)
         service.pipelines = {code: mock_pipeline for code in KOKORO_LANGUAGE_CODES.values()}
-        return service
\ No newline at end of file
+        return service
+
+
+def _g2p_only(segments, calls=None):
+    """KPipeline stand-in without a model: yields (graphemes, phonemes, None) for each text piece"""
+    def pipeline(text, split_pattern=None):
+        if calls is not None:
+            calls.append(text)
+        graphemes = text.strip()
+        phonemes = segments[graphemes]
+        if isinstance(phonemes, Exception):
+            raise phonemes
+        yield graphemes, phonemes, None
+    return pipeline
+
+def _bare_service(segments, overlap=True, cache=None, calls=None):
+    from concurrent.futures import ThreadPoolExecutor
+    service = KokoroService.__new__(KokoroService)
+    service._g2p_executor = ThreadPoolExecutor(max_workers=1) if overlap else None
+    service.phoneme_cache = cache
+    service.g2p_pipelines = {"a": _g2p_only(segments, calls)}
+    return service
+
+@pytest.mark.parametrize("overlap", [True, False])
+def test_phoneme_stream_keeps_segment_order(overlap):
+    service = _bare_service({"One.": "wˈʌn", "Two.": "tˈu"}, overlap)
+    assert list(service._phoneme_stream("a", "One.\n\n \nTwo.")) == ["wˈʌn", "tˈu"]
+    assert service.phonemize("a", "One.\n\nTwo.") == [("One.", "wˈʌn"), ("Two.", "tˈu")]
+
+def test_repeated_pieces_come_from_the_phoneme_cache():
+    from core.phoneme_cache import PhonemeCache
+    calls = []
+    service = _bare_service({"One.": "wˈʌn", "Two.": "tˈu"}, cache=PhonemeCache(), calls=calls)
+    service.phonemize("a", "One.\nTwo.")
+    assert list(service._phoneme_stream("a", "Two.\nOne.")) == ["tˈu", "wˈʌn"]
+    assert calls == ["One.", "Two."]
+    assert service.phoneme_cache.get_status()["a"]["sentence"]["hits"] == 2
+
+def test_phoneme_stream_raises_g2p_errors():
+    service = _bare_service({"One.": "wˈʌn", "Two.": ValueError("g2p failed")})
+    stream = service._phoneme_stream("a", "One.\n\nTwo.")
+    assert next(stream) == "wˈʌn"
+    with pytest.raises(ValueError):
+        next(stream)
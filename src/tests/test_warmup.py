@@ -0,0 +1,59 @@
+# tests/test_warmup.py
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.ConfigLoader import WarmupConfig
+from src.core.replica_pool import ReplicaPool
+from src.core.voice_info_engine import VoiceInfo
+from src.core.warmup import warmup_pool
+
+class _RecordingService:
+    def __init__(self, fail_voice=None):
+        self.calls = []
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self.fail_voice = fail_voice
+
+    def get_voices(self):
+        return {
+            language: [VoiceInfo(f"tone_{code}", language, "", language, "tone", "female")]
+            for language, code in (("English", "en"), ("Vietnamese", "vi"), ("Hindi", "hi"))
+        }
+
+    def generate_audio(self, text, voice_id):
+        with self._lock:
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            if voice_id == self.fail_voice:
+                raise RuntimeError("no reference audio")
+            self.calls.append((text, voice_id))
+            return [0.0], 8000
+        finally:
+            with self._lock:
+                self._active -= 1
+
+def test_every_replica_and_language_is_primed():
+    pool = ReplicaPool("tone", lambda device: _RecordingService(), ["cpu", "cpu:1"])
+    config = WarmupConfig(runs=2, texts={"Vietnamese": "Xin chào"})
+    report = warmup_pool(pool, config, batch_sizes=[])
+    for replica in pool.replicas:
+        assert len(replica.service.calls) == 6
+        assert ("Xin chào", "tone_vi") in replica.service.calls
+    assert set(report["replicas"][0]["languages"]) == {"English", "Vietnamese", "Hindi"}
+    assert len(report["replicas"][1]["languages"]["Hindi"]["seconds"]) == 2
+    # Warmup is not traffic
+    assert all(status["served"] == 0 for status in pool.get_status())
+    assert pool.latency_ewma is None
+
+def test_language_cap_batches_and_failures():
+    pool = ReplicaPool("tone", lambda device: _RecordingService(fail_voice="tone_vi"), ["cpu"])
+    report = warmup_pool(pool, WarmupConfig(runs=1, languages_per_engine=2), batch_sizes=[4])
+    replica_report = report["replicas"][0]
+    assert set(replica_report["languages"]) == {"English", "Vietnamese"}
+    assert replica_report["languages"]["Vietnamese"]["seconds"] == []
+    assert replica_report["failures"] == 1
+    assert "4" in replica_report["batch_sizes"]
+    assert len(pool.replicas[0].service.calls) == 1 + 4
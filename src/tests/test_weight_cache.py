@@ -0,0 +1,81 @@
+# tests/test_weight_cache.py
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import torch
+from torch import nn
+from src.core.weight_cache import WeightCache, load_xtts_checkpoint
+
+class _TiedModel(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.embedding = nn.Embedding(10, 4)
+        self.head = nn.Linear(4, 10, bias=False)
+        self.head.weight = self.embedding.weight
+
+def _checkpoint(tmp_path):
+    source = tmp_path / "model.pth"
+    torch.save({"model": _TiedModel().state_dict()}, source)
+    return source
+
+def test_converts_once_then_maps_the_cache(tmp_path):
+    source = _checkpoint(tmp_path)
+    cache = WeightCache(tmp_path / "cache")
+    loads = []
+
+    def load():
+        loads.append(1)
+        return torch.load(source, weights_only=True)["model"]
+
+    first = cache.state_dict("tied", source, load)
+    second = cache.state_dict("tied", source, load)
+    assert len(loads) == 1
+    assert len(list((tmp_path / "cache").glob("tied-*.safetensors"))) == 1
+    assert first.keys() == second.keys()
+    assert all(torch.equal(first[key], second[key]) for key in first)
+
+    model = _TiedModel()
+    model.load_state_dict(second)
+    assert model.head.weight is model.embedding.weight
+
+def test_changed_checkpoint_replaces_stale_entry(tmp_path):
+    source = _checkpoint(tmp_path)
+    cache = WeightCache(tmp_path / "cache")
+    cache.state_dict("tied", source, lambda: torch.load(source, weights_only=True)["model"])
+    old_entry = next((tmp_path / "cache").glob("tied-*.safetensors"))
+
+    torch.save({"model": _TiedModel().state_dict()}, source)
+    os.utime(source, ns=(0, 1))
+    new = cache.state_dict("tied", source, lambda: torch.load(source, weights_only=True)["model"])
+    entries = list((tmp_path / "cache").glob("tied-*.safetensors"))
+    assert entries != [old_entry] and len(entries) == 1
+    assert torch.equal(new["embedding.weight"], torch.load(source, weights_only=True)["model"]["embedding.weight"])
+
+def test_disabled_cache_loads_directly(tmp_path):
+    source = _checkpoint(tmp_path)
+    cache = WeightCache(tmp_path / "cache", enabled=False)
+    cache.state_dict("tied", source, lambda: torch.load(source, weights_only=True)["model"])
+    assert not (tmp_path / "cache").exists()
+
+class _FakeXtts(_TiedModel):
+    """Mimics the Xtts.load_checkpoint -> get_compatible_checkpoint_state_dict hook"""
+
+    def get_compatible_checkpoint_state_dict(self, model_path):
+        self.unpickled = True
+        return torch.load(model_path, weights_only=True)["model"]
+
+    def load_checkpoint(self, config, checkpoint_dir=None, eval=True):
+        self.load_state_dict(self.get_compatible_checkpoint_state_dict(os.path.join(checkpoint_dir, "model.pth")))
+
+def test_xtts_checkpoint_goes_through_the_cache(tmp_path):
+    source = _checkpoint(tmp_path)
+    cache = WeightCache(tmp_path / "cache")
+    expected = torch.load(source, weights_only=True)["model"]["embedding.weight"]
+
+    for attempt in range(2):
+        model = _FakeXtts()
+        load_xtts_checkpoint(model, None, tmp_path, cache, "xtts", eval=True)
+        assert torch.equal(model.embedding.weight, expected)
+        assert getattr(model, "unpickled", False) == (attempt == 0)
+        # The hook is removed again
+        assert "get_compatible_checkpoint_state_dict" not in vars(model)
@@ -0,0 +1,78 @@
+# tests/test_xtts_pipeline.py
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+import torch
+import torch.nn.functional as F
+from src.core.xtts_pipeline import PipelinedVocoder
+
+SAMPLES_PER_FRAME = 4
+
+def _causal_vocoder(latents):
+    """Toy vocoder with a 4-frame left receptive field, SAMPLES_PER_FRAME samples per frame"""
+    signal = latents.sum(-1)  # (1, frames)
+    kernel = torch.tensor([[[0.1, 0.2, 0.3, 0.4]]])
+    smoothed = F.conv1d(F.pad(signal.unsqueeze(1), (3, 0)), kernel).squeeze(1)
+    return smoothed.repeat_interleave(SAMPLES_PER_FRAME, dim=-1)
+
+def _frames(count, delay=0.0):
+    generator = torch.Generator().manual_seed(0)
+    for _ in range(count):
+        if delay:
+            time.sleep(delay)
+        yield torch.randn(1, 8, generator=generator)
+
+def test_pipelined_output_matches_full_decode():
+    expected = _causal_vocoder(torch.cat(list(_frames(53)), dim=0).unsqueeze(0)).numpy().reshape(-1)
+    pipeline = PipelinedVocoder(chunk_frames=10, context_frames=6, overlap_samples=6)
+    actual = pipeline.synthesize(_frames(53), _causal_vocoder)
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=1e-5)
+
+def test_vocoder_overlaps_with_generation():
+    timings = {}
+
+    def frames():
+        yield from _frames(40, delay=0.01)
+        timings["gpt_done"] = time.time()
+
+    def slow_vocoder(latents):
+        time.sleep(0.05)
+        return _causal_vocoder(latents)
+
+    pipeline = PipelinedVocoder(chunk_frames=10, context_frames=4, overlap_samples=4)
+    start_time = time.time()
+    chunks = []
+    for chunk in pipeline.stream(frames(), slow_vocoder):
+        timings.setdefault("first_chunk", time.time())
+        chunks.append(chunk)
+    elapsed = time.time() - start_time
+
+    assert timings["first_chunk"] < timings["gpt_done"]
+    # Sequential execution would take ~0.4s GPT + ~0.2s vocoder
+    assert elapsed < 0.55
+    assert sum(len(c) for c in chunks) == 40 * SAMPLES_PER_FRAME
+
+def test_gpt_stage_errors_reach_the_consumer():
+    def failing_frames():
+        yield from _frames(5)
+        raise RuntimeError("gpt failed")
+
+    pipeline = PipelinedVocoder(chunk_frames=2, context_frames=2, overlap_samples=2)
+    with pytest.raises(RuntimeError, match="gpt failed"):
+        pipeline.synthesize(failing_frames(), _causal_vocoder)
+
+def test_vocoder_errors_stop_the_gpt_stage():
+    def failing_vocoder(latents):
+        raise RuntimeError("vocoder failed")
+
+    pipeline = PipelinedVocoder(chunk_frames=1, context_frames=0, overlap_samples=0, max_pending_chunks=2)
+    start_time = time.monotonic()
+    with pytest.raises(RuntimeError, match="vocoder failed"):
+        pipeline.synthesize(_frames(10), failing_vocoder)
+    assert time.monotonic() - start_time < 1
+    assert not any(t.name == "xtts-gpt-stage" for t in threading.enumerate())